@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Batch Extraction
+================
+Runs ForensicExtractor over many SDAX project roots; every project still gets
+its own full_design.json.
+
+Snapshots of a design (and designs built from the same libraries) ship
+largely the same ``cache/`` symbols (discrete##capacitor, standard##...,
+orcadlib##titleblockansilarge) and style files. Before any project is
+extracted, every symbol and style file of every project is hashed, and each
+distinct content is parsed once on the worker pool. The projects are then
+extracted on the same pool, each seeded with the parsed symbols and styles
+it uses (ForensicExtractor ``parsed_files``), so symbol and style parsing
+scales with the unique bytes of the batch rather than the total.
+
+Files are hashed by (path, size, mtime_ns), like symbol_library.py
+fingerprints the cache: a path listed by several projects is read once, and
+with --parse-cache the hashes are kept in the cache, so files unchanged
+since an earlier batch are not read at all.
+
+Each project's console output goes to a log file next to its output.
+
+With --file-timeout (or --file-memory-mb) the shared symbol/style parse and
+each project's page and symbol parses run in isolated workers under that
+budget; files that exceed it are skipped and listed in the project's
+statistics as degraded, so one bad file costs at most its budget rather
+than stalling the batch.
+
+With --parse-cache the shared symbol parse and every project load symbols,
+blocks and pages parsed by earlier runs from that cache directory (see
+parse_cache.py) and add the ones they parse. With --incremental each
+project only re-extracts the blocks changed since its previous output (see
+ForensicExtractor.plan_incremental).
+
+Usage: python batch_extract.py ROOT [ROOT ...] [--workers N] [--output-dir DIR]
+"""
+
+import argparse
+import contextlib
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache_pac import read_source
+from forensic_extractor import (
+    DEFAULT_PARSE_CACHE_BYTES, ForensicExtractor, content_key, open_parse_cache,
+)
+from isolated_pool import IsolatedPool, process_context
+from phase_scheduler import PhaseScheduler
+
+# A file to parse: (kind, path, symbol_key); symbol_key is None for styles
+FileTask = Tuple[str, Path, Optional[str]]
+
+# A file's (path, size, mtime_ns); a cache.pac member takes cache.pac's
+Fingerprint = Tuple[str, int, int]
+
+
+def _fingerprint(path: Path) -> Fingerprint:
+    """(path, size, mtime_ns) of a symbol or style file; raises OSError."""
+    st = os.stat(path.parent if path.parent.suffix == '.pac' else path)
+    return str(path), st.st_size, st.st_mtime_ns
+
+
+def _read_file(task: FileTask) -> Tuple[Optional[Tuple[str, str]], int, Optional[str]]:
+    """
+    (parsed_files key, size, None) of a symbol or style file, or
+    (None, 0, error) if it cannot be read.
+    """
+    kind, path, _ = task
+    try:
+        data = read_source(path)
+    except OSError as e:
+        return None, 0, f'{type(e).__name__}: {e}'
+    if kind == 'style':
+        # Styles are keyed by their decoded text, as in load_styles()
+        data = data.decode('utf-8', errors='ignore').encode('utf-8')
+    return (kind, content_key(data)), len(data), None
+
+
+def _fingerprint_cache_key(cache, kind: str, fingerprint: Fingerprint) -> str:
+    """Parse cache key of the content key hashed for ``fingerprint``."""
+    return cache.key('file_key', '\0'.join(map(str, fingerprint)), kind)
+
+
+def _parse_file(task: FileTask) -> Tuple[Any, Optional[str]]:
+    """Parse one symbol or style file: (parsed, None), or (None, error)."""
+    kind, path, symbol_key = task
+    try:
+        content = read_source(path).decode('utf-8', errors='ignore')
+        if kind == 'symbol':
+            return ForensicExtractor._parse_symbol_graphics(content, symbol_key), None
+        return ForensicExtractor._parse_style_file(content), None
+    except Exception as e:
+        return None, str(e)
+
+
+def extract_project(root: Path, output_path: Path, parsed_files: Dict[Tuple[str, str], Any],
+                     options: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract one project in a worker process; returns its summary."""
+    started = time.time()
+    log_path = output_path.with_suffix('.log')
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+            parse_cache = None
+            if options.get('parse_cache'):
+                parse_cache = open_parse_cache(
+                    options['parse_cache'],
+                    options.get('parse_cache_bytes', DEFAULT_PARSE_CACHE_BYTES))
+            extractor = ForensicExtractor(
+                root, mmap_pages=options['mmap'], parsed_files=parsed_files,
+                file_timeout=options.get('file_timeout'), file_memory=options.get('file_memory'),
+                file_retries=options.get('file_retries', 1), parse_cache=parse_cache,
+                incremental=options.get('incremental', False),
+                cache_pac=options.get('cache_pac', False))
+            scheduler = PhaseScheduler(extractor.phases(
+                io_threads=options['io_threads'], xcon_net_labels=options['xcon_net_labels'],
+                output_path=str(output_path)))
+            ok = scheduler.run(workers=options['phase_threads'])
+            degraded = len(extractor.degraded_files)
+        error = None if ok else 'validation failed'
+    except Exception as e:
+        ok, error, degraded = False, f'{type(e).__name__}: {e}', 0
+    return {
+        'root': str(root),
+        'output': str(output_path),
+        'log': str(log_path),
+        'ok': ok,
+        'error': error,
+        'degraded_files': degraded,
+        'seconds': round(time.time() - started, 2),
+    }
+
+
+def _output_paths(roots: List[Path], output_dir: Optional[Path]) -> List[Path]:
+    """<root>/full_design.json, or <output_dir>/<project>/full_design.json."""
+    if output_dir is None:
+        return [root / 'full_design.json' for root in roots]
+    paths = []
+    used = set()
+    for root in roots:
+        name = root.name
+        n = 2
+        while name in used:
+            name = f'{root.name}_{n}'
+            n += 1
+        used.add(name)
+        paths.append(output_dir / name / 'full_design.json')
+    return paths
+
+
+def run_batch(roots: List[Path], workers: int = os.cpu_count() or 1,
+              output_dir: Optional[Path] = None, io_threads: int = 1,
+              mmap_pages: bool = False, xcon_net_labels: bool = False,
+              phase_threads: int = 1, file_timeout: Optional[float] = None,
+              file_memory: Optional[int] = None, file_retries: int = 1,
+              parse_cache: Optional[Path] = None,
+              parse_cache_bytes: int = DEFAULT_PARSE_CACHE_BYTES,
+              incremental: bool = False, cache_pac: bool = False) -> List[Dict[str, Any]]:
+    """
+    Extract every project in ``roots`` on ``workers`` processes, parsing each
+    distinct symbol and style file once. Returns one summary per project,
+    in ``roots`` order.
+
+    file_timeout, file_memory and file_retries budget each file parse (see
+    ForensicExtractor). parse_cache is a parse cache directory shared by the
+    batch and later runs; incremental re-extracts only changed blocks.
+    cache_pac reads every project's cache symbols and styles from its
+    cache.pac (projects without an unpacked cache/ always do).
+    """
+    print("=" * 60)
+    print(f"BATCH EXTRACTION: {len(roots)} projects, {workers} workers")
+    print("=" * 60)
+
+    # Every symbol and style file of every project, by content
+    project_tasks: List[List[FileTask]] = []
+    for root in roots:
+        extractor = ForensicExtractor(root, cache_pac=cache_pac)
+        tasks = [('symbol', path, key) for path, key in extractor._symbol_files()]
+        tasks += [('style', path, None) for path in extractor._style_files()]
+        project_tasks.append(tasks)
+
+    # Only files with a new fingerprint are read and hashed; the others take
+    # the key hashed for that fingerprint in this batch or, with a parse
+    # cache, an earlier one. A file that cannot be read (a broken link, no
+    # permission) is not parsed here; its project fails to read it too and
+    # lists it as degraded
+    cache = open_parse_cache(parse_cache, parse_cache_bytes) if parse_cache else None
+    all_tasks = [task for tasks in project_tasks for task in tasks]
+    fingerprints: List[Optional[Fingerprint]] = []
+    hashed: Dict[Fingerprint, Tuple[Tuple[str, str], int]] = {}
+    to_read: Dict[Fingerprint, FileTask] = {}
+    for task in all_tasks:
+        try:
+            fingerprint = _fingerprint(task[1])
+        except OSError as e:
+            print(f"  [WARN] Cannot read {task[1]}: {type(e).__name__}: {e}")
+            fingerprint = None
+        fingerprints.append(fingerprint)
+        if fingerprint is None or fingerprint in hashed or fingerprint in to_read:
+            continue
+        known = cache.get('file_key', _fingerprint_cache_key(cache, task[0], fingerprint)) \
+            if cache is not None else None
+        if known is not None:
+            key, size = known.decode('ascii').split()
+            hashed[fingerprint] = (task[0], key), int(size)
+        else:
+            to_read[fingerprint] = task
+    with ThreadPoolExecutor(max_workers=io_threads) as pool:
+        for (fingerprint, task), (key, size, error) in zip(
+                to_read.items(), pool.map(_read_file, to_read.values())):
+            if key is None:
+                print(f"  [WARN] Cannot read {task[1]}: {error}")
+                continue
+            hashed[fingerprint] = key, size
+            if cache is not None:
+                cache.put('file_key', _fingerprint_cache_key(cache, task[0], fingerprint),
+                          f'{key[1]} {size}'.encode('ascii'))
+
+    keys = iter(hashed.get(fingerprint, (None, 0))[0] for fingerprint in fingerprints)
+    project_keys = [[next(keys) for _ in tasks] for tasks in project_tasks]
+    unique: Dict[Tuple[str, str], FileTask] = {}
+    unique_bytes = total_bytes = 0
+    for task, fingerprint in zip(all_tasks, fingerprints):
+        if fingerprint not in hashed:
+            continue
+        key, size = hashed[fingerprint]
+        total_bytes += size
+        if key not in unique:
+            unique[key] = task
+            unique_bytes += size
+    print(f"  Symbol/style files: {len(all_tasks)} ({total_bytes / 1e6:.1f} MB), "
+          f"read: {len(to_read)}, unique: {len(unique)} ({unique_bytes / 1e6:.1f} MB)")
+
+    # Symbols parsed by an earlier run come from the parse cache
+    parsed_files: Dict[Tuple[str, str], Any] = {}
+    cache_keys: Dict[Tuple[str, str], str] = {}
+    if cache is not None:
+        for key, (kind, _, symbol_key) in unique.items():
+            if kind != 'symbol':
+                continue
+            cache_key = cache_keys[key] = cache.key('symbol', key[1], symbol_key)
+            data = cache.get('symbol', cache_key)
+            try:
+                if data is not None:
+                    parsed_files[key] = pickle.loads(data)
+            except Exception:
+                pass
+        if parsed_files:
+            print(f"  Symbols from parse cache: {len(parsed_files)}")
+    to_parse = {key: task for key, task in unique.items() if key not in parsed_files}
+
+    # Parse each distinct file once; a file that fails (or runs out of its
+    # budget) is left to the projects, which parse it themselves and report it
+    with IsolatedPool(workers, timeout=file_timeout, max_memory=file_memory,
+                      retries=file_retries) as pool:
+        for key, outcome in zip(to_parse, pool.map(_parse_file, to_parse.values())):
+            if outcome.ok and outcome.value[1] is None:
+                parsed_files[key] = outcome.value[0]
+                if key in cache_keys:
+                    cache.put('symbol', cache_keys[key],
+                              pickle.dumps(outcome.value[0], pickle.HIGHEST_PROTOCOL))
+    print(f"  Parsed once: {len(parsed_files)} of {len(unique)}")
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(roots)
+    options = {'mmap': mmap_pages, 'io_threads': io_threads,
+               'xcon_net_labels': xcon_net_labels, 'phase_threads': phase_threads,
+               'file_timeout': file_timeout, 'file_memory': file_memory,
+               'file_retries': file_retries,
+               'parse_cache': str(parse_cache) if parse_cache else None,
+               'parse_cache_bytes': parse_cache_bytes, 'incremental': incremental,
+               'cache_pac': cache_pac}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=process_context()) as pool:
+        futures = {}
+        for i, (root, output_path) in enumerate(zip(roots, _output_paths(roots, output_dir))):
+            subset = {key: parsed_files[key] for key in project_keys[i] if key in parsed_files}
+            futures[pool.submit(extract_project, root, output_path, subset, options)] = i
+        for future in as_completed(futures):
+            summary = results[futures[future]] = future.result()
+            status = 'OK' if summary['ok'] else f"FAILED ({summary['error']})"
+            degraded = f", {summary['degraded_files']} degraded files" if summary['degraded_files'] else ''
+            print(f"  [{status}] {summary['root']} -> {summary['output']} "
+                  f"({summary['seconds']}s{degraded})")
+
+    failed = sum(1 for summary in results if not summary['ok'])
+    print(f"\n  Projects extracted: {len(roots) - failed} of {len(roots)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Extract full_design.json for many Cadence SDAX projects')
+    parser.add_argument('roots', nargs='+', type=Path, metavar='ROOT',
+                        help='project root (the directory holding worklib/ and cache/)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--output-dir', type=Path, metavar='DIR',
+                        help='write DIR/<project>/full_design.json instead of '
+                             '<root>/full_design.json')
+    parser.add_argument('--io-threads', type=int, default=1, metavar='N',
+                        help='threads for hashing and loading small files (default: 1)')
+    parser.add_argument('--mmap', action='store_true',
+                        help='scan page files as memory-mapped bytes instead of decoded text')
+    parser.add_argument('--xcon-net-labels', action='store_true',
+                        help='detect net labels by lookup against XCON net names')
+    parser.add_argument('--file-timeout', type=float, metavar='SECONDS',
+                        help='give up on a symbol, style or page file whose parse takes longer')
+    parser.add_argument('--file-memory-mb', type=int, metavar='MB',
+                        help='address space limit of each isolated parse worker')
+    parser.add_argument('--file-retries', type=int, default=1, metavar='N',
+                        help='retry a timed-out or crashed file parse N times (default: 1)')
+    parser.add_argument('--parse-cache', type=Path, metavar='DIR',
+                        help='keep parsed symbol, block and page files in DIR and load '
+                             'unchanged files from it on later runs')
+    parser.add_argument('--parse-cache-mb', type=int, default=DEFAULT_PARSE_CACHE_BYTES >> 20,
+                        metavar='MB', help='size limit of the parse cache (default: '
+                                           f'{DEFAULT_PARSE_CACHE_BYTES >> 20})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='re-extract only the blocks changed since each project\'s '
+                             'previous full_design.json')
+    parser.add_argument('--cache-pac', action='store_true',
+                        help='read cache symbols and styles from each project\'s cache.pac '
+                             'even where cache/ is unpacked')
+    args = parser.parse_args()
+
+    results = run_batch(args.roots, workers=args.workers, output_dir=args.output_dir,
+                        io_threads=args.io_threads, mmap_pages=args.mmap,
+                        xcon_net_labels=args.xcon_net_labels, file_timeout=args.file_timeout,
+                        file_memory=args.file_memory_mb << 20 if args.file_memory_mb else None,
+                        file_retries=args.file_retries, parse_cache=args.parse_cache,
+                        parse_cache_bytes=args.parse_cache_mb << 20,
+                        incremental=args.incremental, cache_pac=args.cache_pac)
+    return 0 if all(summary['ok'] for summary in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
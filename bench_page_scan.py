@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Page scan scaling benchmark
+===========================
+Times the shared page walk (PageWalker + the forensic_extractor consumers)
+on synthetic pathological pages of doubling size and checks that the run
+time grows linearly with the page size.
+
+The synthetic page repeats objects whose property records hold an LP
+without a CGTYPE and a transform without an origin, i.e. exactly the input
+where the old whole-page wire_pattern / transform_pattern regexes had no
+terminator to stop at and rescanned the rest of the page for every match.
+With --legacy those patterns are timed too (on the smaller sizes only).
+
+Usage: python bench_page_scan.py [--sizes 1000,2000,4000,8000] [--legacy]
+"""
+
+import argparse
+import re
+import sys
+import time
+
+from sdax_parser import PageWalker
+from forensic_extractor import (
+    GraphicsPositionConsumer, PlacementConsumer, TextConsumer, WireConsumer,
+)
+
+# One page object: a Tag 29 record with an LP but no CGTYPE and a transform
+# property but no < 45 /> coordinate block anywhere on the page
+PATHOLOGICAL_OBJECT = (
+    '< 29 />  <  < 14 />  < 14:1008807416042618881  />  < 0 />  < 0 />  '
+    '< 0 />  < 2 />  < 13 />  <  < 4 />  '
+    '< 40 />  < 2 />  <n LP n/>  < 1 />  < 43 />  <v 2.9591e+06,1.7145e+06;3.3909e+06,1.7145e+06 v/>   '
+    '< 40 />  < 8 />  <n rotation n/>  < 1 />  < 1 />  <v 0 v/>   '
+    '< 40 />  < 9 />  <n transform n/>  < 1 />  < 17 />  <v 1,0,0,0,1,0,0,0,1 v/>   '
+    '/>  />\n'
+)
+
+# Whole-page patterns the page phases used before the record-scoped walk
+LEGACY_PATTERNS = {
+    'wire_pattern': re.compile(
+        r'<n\s*LP\s*n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*([^v]+)\s*v/>'
+        r'[^<]*(?:<(?!n\s*CGTYPE)[^>]*>[^<]*)*'
+        r'<n\s*CGTYPE\s*n/>\s*<[^>]+>\s*<v\s*(\d+)\s*v/>',
+        re.DOTALL
+    ),
+    'transform_pattern': re.compile(
+        r'<n transform n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*([^v]+)\s*v/>.*?'
+        r'<\s*45\s*/>\s*<\s*<\s*(\d+)\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*(\d+)\s*/>\s*<\s*(-?\d+)\s*/>\s*/>',
+        re.DOTALL
+    ),
+}
+
+# Allowed growth of the per-object time from the smallest to the largest page
+LINEAR_TOLERANCE = 2.0
+
+
+def build_page(objects: int) -> str:
+    return '<version 13 />  < 4 />  <  ' + PATHOLOGICAL_OBJECT * objects + '/>\n'
+
+
+def best_time(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', default='1000,2000,4000,8000,16000',
+                        help='comma-separated object counts per page')
+    parser.add_argument('--legacy', action='store_true',
+                        help='also time the old whole-page regexes (sizes up to 1000)')
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',')]
+
+    walker = PageWalker()
+    walker.register('graphics', GraphicsPositionConsumer())
+    walker.register('wires', WireConsumer())
+    walker.register('placements', PlacementConsumer())
+    walker.register('text', TextConsumer())
+
+    print("="*60)
+    print("PAGE SCAN SCALING (pathological pages)")
+    print("="*60)
+
+    per_object = []
+    for objects in sizes:
+        page = build_page(objects)
+        elapsed = best_time(lambda: walker.walk(page))
+        per_object.append(elapsed / objects)
+        line = f"  {objects:>7} objects  {len(page) / 1e6:6.2f} MB  walk {elapsed:7.3f}s"
+
+        if args.legacy and objects <= 1000:
+            for name, pattern in LEGACY_PATTERNS.items():
+                legacy = best_time(lambda: sum(1 for _ in pattern.finditer(page)), repeat=1)
+                line += f"  {name} {legacy:7.3f}s"
+        print(line)
+
+    growth = per_object[-1] / per_object[0]
+    print(f"\n  Per-object time growth {sizes[0]} -> {sizes[-1]} objects: {growth:.2f}x")
+    if growth > LINEAR_TOLERANCE:
+        print(f"  [FAIL] Page walk is not linear in page size (limit {LINEAR_TOLERANCE:.1f}x)")
+        return 1
+    print("  [OK] Page walk is linear in page size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Packed Symbol Cache
+===================
+``cache.pac`` is a zip of the project's symbol cache, about 1350 entries:
+
+    cache/flatlib/<library>/<cell>/<view>/<cell>##<view>.ascii   (and .style)
+
+which System Capture unpacks to ``cache/<library>##<cell>##<view>.ascii``.
+CachePac reads the zip central directory once into an index of the symbol
+and style entries under their unpacked names (offset, sizes, CRC) and reads
+entries straight out of the archive, so a project can be extracted without
+an unpacked ``cache/`` directory.
+
+Files read from the archive are named ``<root>/cache.pac/<unpacked name>``:
+read_source() reads such a path from the archive and any other path from
+disk, in the extractor as in its worker processes. checksum() digests the
+central directory's CRCs, so a changed cache is noticed without reading the
+entries.
+"""
+
+import functools
+import hashlib
+import threading
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Entries indexed by their unpacked name
+_SUFFIXES = ('.ascii', '.style')
+
+
+def unpacked_name(entry_name: str) -> Optional[str]:
+    """``cache/<library>##<file>`` name of a flatlib symbol or style entry, else None."""
+    parts = entry_name.split('/')
+    if len(parts) != 6 or parts[:2] != ['cache', 'flatlib'] or not parts[5].endswith(_SUFFIXES):
+        return None
+    return f'{parts[2]}##{parts[5]}'
+
+
+class CachePac:
+    """
+    Index of the symbol and style entries of a cache.pac archive.
+
+    ``entries`` maps unpacked file names to their ZipInfo (header_offset,
+    file_size, CRC), in archive order. read() is safe to call from several
+    threads.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._zip = zipfile.ZipFile(self.path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, zipfile.ZipInfo] = {}
+        for info in self._zip.infolist():
+            name = unpacked_name(info.filename)
+            if name is not None:
+                self.entries[name] = info
+
+    def names(self, suffix: str) -> List[str]:
+        """Unpacked names of the entries ending in ``suffix``, in archive order."""
+        return [name for name in self.entries if name.endswith(suffix)]
+
+    def read(self, name: str) -> bytes:
+        """Contents of entry ``name`` (CRC-checked by zipfile); KeyError if absent."""
+        info = self.entries[name]
+        with self._lock:
+            return self._zip.read(info)
+
+    def crc(self, name: str) -> int:
+        return self.entries[name].CRC
+
+    def checksum(self) -> str:
+        """Digest of the names, sizes and CRCs of every entry in the archive."""
+        digest = hashlib.sha1()
+        for info in self._zip.infolist():
+            digest.update(f'{info.filename}\0{info.file_size}\0{info.CRC}\n'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+@functools.lru_cache(maxsize=8)
+def _open(path: Path, size: int, mtime_ns: int) -> CachePac:
+    return CachePac(path)
+
+
+def open_cache_pac(path) -> CachePac:
+    """CachePac of ``path``, shared while the archive is unchanged."""
+    path = Path(path)
+    st = path.stat()
+    return _open(path, st.st_size, st.st_mtime_ns)
+
+
+def read_source(path) -> bytes:
+    """Bytes of a source file: from cache.pac for ``<root>/cache.pac/<name>``, else from disk."""
+    path = Path(path)
+    if path.parent.suffix == '.pac':
+        try:
+            return open_cache_pac(path.parent).read(path.name)
+        except KeyError:
+            raise FileNotFoundError(f'{path.name} not in {path.parent}') from None
+    return path.read_bytes()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Distributed Extraction
+======================
+Coordinator/worker mode for ForensicExtractor over a JobQueue directory on a
+shared file system; no broker is needed.
+
+    python distributed_extract.py coordinator QUEUE ROOT [ROOT ...] [--unit project|page]
+    python distributed_extract.py worker QUEUE
+
+Project units (default): one job per project. The worker that claims it runs
+the whole extraction and writes the project's full_design.json, so project
+roots and output paths must be the same on every host.
+
+Page units: the coordinator runs each project's phases itself, but its page
+scan phase (1p) puts one job per page_file_*.ascii on the queue. Workers walk
+the pages and return the page scans, and the coordinator assembles
+full_design.json from them exactly as a local --jobs run would. A page whose
+job fails on every attempt is walked by the coordinator, unless a file
+budget (--file-timeout, --file-memory-mb) is set: workers then walk each page
+in an isolated process under that budget, and a page that fails on every
+attempt is recorded as degraded instead.
+
+The coordinator drops each job's result from the queue once it has read
+it. Rerunning an interrupted run (same --run-id) reuses the jobs that had
+finished; a page job's id carries a hash of the page and its walk options,
+so a page edited since is walked again.
+
+Workers run until stopped; ``--local-workers N`` starts N worker processes
+on the coordinator's machine (stopped again at the end), which is enough to
+run the whole flow against a local directory.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Union
+
+from batch_extract import extract_project
+from forensic_extractor import (
+    DEFAULT_PARSE_CACHE_BYTES, DegradedFile, ForensicExtractor, PageWalkRunner,
+    build_page_walker, open_parse_cache, page_walk_pool, walk_pages_with,
+)
+from isolated_pool import IsolatedPool
+from job_queue import Heartbeat, JobQueue, worker_id
+from page_store import PageStore
+from phase_scheduler import PhaseScheduler
+from sdax_parser import PageWalker
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+# Page walkers by net-name set; a worker keeps one per set it has seen
+_walkers: Dict[Optional[FrozenSet[str]], PageWalker] = {}
+# Isolated page walk pools by (net names, mmap, timeout, memory), for budgeted jobs
+_page_pools: Dict[tuple, IsolatedPool] = {}
+
+
+def _run_isolated_page_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    names = payload.get('net_names')
+    key = (frozenset(names) if names is not None else None, payload['mmap'],
+           payload['file_timeout'], payload['file_memory'])
+    pool = _page_pools.get(key)
+    if pool is None:
+        # Retries are the queue's (max_attempts), not the pool's
+        pool = _page_pools[key] = page_walk_pool(
+            set(names) if names is not None else None, payload['mmap'], 1,
+            timeout=payload['file_timeout'], max_memory=payload['file_memory'], retries=0)
+    scan = walk_pages_with(pool, [Path(payload['path'])])[0]
+    if isinstance(scan, DegradedFile):
+        raise RuntimeError(scan.reason)
+    if scan is None:
+        raise RuntimeError('page walk failed')
+    return scan
+
+
+def _run_page_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    if payload.get('file_timeout') or payload.get('file_memory'):
+        return _run_isolated_page_job(payload)
+    names = payload.get('net_names')
+    key = frozenset(names) if names is not None else None
+    walker = _walkers.get(key)
+    if walker is None:
+        walker = _walkers[key] = build_page_walker(set(names) if names is not None else None)
+    store = PageStore(max_bytes=0)
+    path = Path(payload['path'])
+    content = store.map(path) if payload['mmap'] else store.text(path)
+    return walker.walk(content)
+
+
+def _run_project_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return extract_project(Path(payload['root']), Path(payload['output']), {}, payload['options'])
+
+
+JOB_KINDS = {
+    'page': _run_page_job,
+    'project': _run_project_job,
+}
+
+
+def run_worker(queue_dir: Path, lease_seconds: float = 60.0, poll_seconds: float = 0.5,
+               idle_exit: Optional[float] = None) -> int:
+    """
+    Claim and run jobs until the queue is stopped (or, with ``idle_exit``,
+    until no job has turned up for that many seconds). Returns the number
+    of jobs completed.
+    """
+    queue = JobQueue(queue_dir, lease_seconds=lease_seconds)
+    me = worker_id()
+    completed = 0
+    idle_since = time.time()
+    print(f"Worker {me} on {queue_dir}")
+    while True:
+        claimed = queue.claim(me)
+        if claimed is None:
+            if queue.stopped() or (idle_exit is not None and time.time() - idle_since > idle_exit):
+                return completed
+            time.sleep(poll_seconds)
+            continue
+
+        job_id, payload = claimed
+        with Heartbeat(queue, job_id):
+            try:
+                result = JOB_KINDS[payload['kind']](payload)
+            except Exception as e:
+                print(f"  [WARN] {job_id} failed: {e}")
+                traceback.print_exc()
+                queue.fail(job_id, f'{type(e).__name__}: {e}')
+                idle_since = time.time()
+                continue
+        queue.complete(job_id, result)
+        completed += 1
+        idle_since = time.time()
+
+
+# =============================================================================
+# COORDINATOR
+# =============================================================================
+
+def queue_page_walker(queue: JobQueue, job_prefix: str, file_timeout: Optional[float] = None,
+                      file_memory: Optional[int] = None) -> PageWalkRunner:
+    """
+    ForensicExtractor.scan_pages() backend that walks pages on queue workers.
+    With a file budget, workers walk each page in an isolated process and a
+    page that fails every attempt comes back as a DegradedFile.
+    """
+    budgeted = bool(file_timeout or file_memory)
+
+    def walk_pages(page_files: List[Path], net_names: Optional[Set[str]],
+                   mmap_pages: bool) -> List[Union[Dict[str, Any], DegradedFile, None]]:
+        names = sorted(net_names) if net_names is not None else None
+        job_ids = []
+        for page_file in page_files:
+            payload = {'kind': 'page', 'path': str(page_file), 'mmap': mmap_pages,
+                       'net_names': names, 'file_timeout': file_timeout,
+                       'file_memory': file_memory}
+            job_id = f'{job_prefix}-{page_file.parent.parent.name}-{page_file.stem}-' \
+                     f'{_page_job_digest(page_file, payload)}'
+            queue.put(job_id, payload)
+            job_ids.append(job_id)
+        queue.wait(job_ids, progress=lambda done, total: print(f"  Pages done: {done}/{total}"))
+
+        scans = []
+        for job_id in job_ids:
+            if queue.has_result(job_id):
+                scans.append(queue.result(job_id))
+                continue
+            errors = queue.errors(job_id)
+            print(f"  [WARN] {job_id} failed: {'; '.join(errors)}")
+            scans.append(DegradedFile('; '.join(errors), len(errors)) if budgeted else None)
+        for job_id in job_ids:
+            queue.forget(job_id)
+        return scans
+    return walk_pages
+
+
+def _page_job_digest(page_file: Path, payload: Dict[str, Any]) -> str:
+    """Hash of a page and its walk options, so an edited page gets a new job."""
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8'))
+    digest.update(page_file.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _output_path(root: Path, output_dir: Optional[Path]) -> Path:
+    if output_dir is None:
+        return root / 'full_design.json'
+    return output_dir / root.name / 'full_design.json'
+
+
+def run_coordinator(queue_dir: Path, roots: List[Path], unit: str = 'project',
+                    output_dir: Optional[Path] = None, run_id: Optional[str] = None,
+                    local_workers: int = 0, lease_seconds: float = 60.0,
+                    stop_workers: bool = False, options: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Queue the projects (or their pages) in ``roots`` and wait for them;
+    True if every project's full_design.json was written.
+    """
+    options = dict({'mmap': False, 'io_threads': 1, 'xcon_net_labels': False,
+                    'phase_threads': 1, 'file_timeout': None, 'file_memory': None,
+                    'file_retries': 1, 'parse_cache': None,
+                    'parse_cache_bytes': DEFAULT_PARSE_CACHE_BYTES,
+                    'incremental': False, 'cache_pac': False}, **(options or {}))
+    run_id = run_id or time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}'
+    roots = [root.resolve() for root in roots]
+    queue = JobQueue(queue_dir, lease_seconds=lease_seconds)
+    queue.clear_stop()
+
+    workers = [subprocess.Popen([sys.executable, str(Path(__file__).resolve()), 'worker',
+                                 str(queue_dir), '--lease', str(lease_seconds)])
+               for _ in range(local_workers)]
+    print("=" * 60)
+    print(f"DISTRIBUTED EXTRACTION: {len(roots)} projects by {unit}, run {run_id}")
+    print("=" * 60)
+    try:
+        if unit == 'project':
+            ok = _coordinate_projects(queue, roots, run_id, output_dir, options)
+        else:
+            ok = _coordinate_pages(queue, roots, run_id, output_dir, options)
+    finally:
+        if stop_workers:
+            queue.stop()
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+    print(f"\n  Queue: {queue.counts()}")
+    return ok
+
+
+def _coordinate_projects(queue: JobQueue, roots: List[Path], run_id: str,
+                         output_dir: Optional[Path], options: Dict[str, Any]) -> bool:
+    job_ids = []
+    for i, root in enumerate(roots):
+        job_id = f'{run_id}-{i:04d}-project'
+        output = _output_path(root, output_dir).resolve()
+        queue.put(job_id, {'kind': 'project', 'root': str(root), 'output': str(output),
+                           'options': options})
+        job_ids.append(job_id)
+    queue.wait(job_ids, progress=lambda done, total: print(f"  Projects done: {done}/{total}"))
+
+    ok = True
+    for root, job_id in zip(roots, job_ids):
+        if queue.has_result(job_id):
+            summary = queue.result(job_id)
+            status = 'OK' if summary['ok'] else f"FAILED ({summary['error']})"
+            print(f"  [{status}] {root} -> {summary['output']} ({summary['seconds']}s)")
+            ok = ok and summary['ok']
+        else:
+            print(f"  [FAILED] {root}: {'; '.join(queue.errors(job_id))}")
+            ok = False
+        queue.forget(job_id)
+    return ok
+
+
+def _coordinate_pages(queue: JobQueue, roots: List[Path], run_id: str,
+                      output_dir: Optional[Path], options: Dict[str, Any]) -> bool:
+    ok = True
+    for i, root in enumerate(roots):
+        output = _output_path(root, output_dir)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        parse_cache = None
+        if options['parse_cache']:
+            parse_cache = open_parse_cache(options['parse_cache'], options['parse_cache_bytes'])
+        extractor = ForensicExtractor(
+            root, mmap_pages=options['mmap'], file_timeout=options['file_timeout'],
+            file_memory=options['file_memory'], file_retries=options['file_retries'],
+            parse_cache=parse_cache, incremental=options['incremental'],
+            cache_pac=options['cache_pac'])
+        walk_pages = queue_page_walker(queue, f'{run_id}-{i:04d}', options['file_timeout'],
+                                       options['file_memory'])
+        scheduler = PhaseScheduler(extractor.phases(
+            io_threads=options['io_threads'], xcon_net_labels=options['xcon_net_labels'],
+            output_path=str(output), walk_pages=walk_pages))
+        project_ok = scheduler.run(workers=options['phase_threads'])
+        print(f"  [{'OK' if project_ok else 'FAILED'}] {root} -> {output}")
+        ok = ok and project_ok
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Extract full_design.json over a shared-directory job queue')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    coordinator = commands.add_parser('coordinator', help='queue projects and assemble their output')
+    coordinator.add_argument('queue', type=Path, help='queue directory (shared by all hosts)')
+    coordinator.add_argument('roots', nargs='+', type=Path, metavar='ROOT', help='project root')
+    coordinator.add_argument('--unit', choices=('project', 'page'), default='project',
+                             help='one job per project, or per page file (default: project)')
+    coordinator.add_argument('--output-dir', type=Path, metavar='DIR',
+                             help='write DIR/<project>/full_design.json instead of '
+                                  '<root>/full_design.json')
+    coordinator.add_argument('--run-id', help='job name prefix (default: timestamp and pid); '
+                                              'rerunning an interrupted run\'s id reuses its '
+                                              'finished jobs')
+    coordinator.add_argument('--local-workers', type=int, default=0, metavar='N',
+                             help='also run N workers on this machine')
+    coordinator.add_argument('--stop-workers', action='store_true',
+                             help='tell all workers to exit when the run is done')
+    coordinator.add_argument('--lease', type=float, default=60.0, metavar='SECONDS',
+                             help='requeue a job whose worker missed heartbeats this long')
+    coordinator.add_argument('--mmap', action='store_true',
+                             help='scan page files as memory-mapped bytes instead of decoded text')
+    coordinator.add_argument('--xcon-net-labels', action='store_true',
+                             help='detect net labels by lookup against XCON net names')
+    coordinator.add_argument('--file-timeout', type=float, metavar='SECONDS',
+                             help='give up on a page or symbol file whose parse takes longer')
+    coordinator.add_argument('--file-memory-mb', type=int, metavar='MB',
+                             help='address space limit of each isolated parse worker')
+    coordinator.add_argument('--parse-cache', metavar='DIR',
+                             help='parse cache directory (shared by all hosts); project jobs '
+                                  'and the coordinator load unchanged files from it')
+    coordinator.add_argument('--parse-cache-mb', type=int,
+                             default=DEFAULT_PARSE_CACHE_BYTES >> 20, metavar='MB',
+                             help='size limit of the parse cache (default: '
+                                  f'{DEFAULT_PARSE_CACHE_BYTES >> 20})')
+    coordinator.add_argument('--incremental', action='store_true',
+                             help='re-extract only the blocks changed since each project\'s '
+                                  'previous full_design.json')
+    coordinator.add_argument('--cache-pac', action='store_true',
+                             help='read cache symbols and styles from each project\'s cache.pac '
+                                  'even where cache/ is unpacked')
+
+    worker = commands.add_parser('worker', help='claim and run jobs')
+    worker.add_argument('queue', type=Path, help='queue directory (shared by all hosts)')
+    worker.add_argument('--lease', type=float, default=60.0, metavar='SECONDS',
+                        help='lease length; heartbeats are sent every third of it')
+    worker.add_argument('--idle-exit', type=float, metavar='SECONDS',
+                        help='exit after this long without a job')
+    args = parser.parse_args()
+
+    if args.command == 'worker':
+        run_worker(args.queue, lease_seconds=args.lease, idle_exit=args.idle_exit)
+        return 0
+    ok = run_coordinator(args.queue, args.roots, unit=args.unit, output_dir=args.output_dir,
+                         run_id=args.run_id, local_workers=args.local_workers,
+                         lease_seconds=args.lease, stop_workers=args.stop_workers,
+                         options={'mmap': args.mmap, 'xcon_net_labels': args.xcon_net_labels,
+                                  'file_timeout': args.file_timeout,
+                                  'file_memory': args.file_memory_mb << 20
+                                  if args.file_memory_mb else None,
+                                  'parse_cache': args.parse_cache,
+                                  'parse_cache_bytes': args.parse_cache_mb << 20,
+                                  'incremental': args.incremental,
+                                  'cache_pac': args.cache_pac})
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
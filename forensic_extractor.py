@@ -15,15 +15,36 @@ Date: 2025-11-28
 """
 
 import os
+import pickle
+import argparse
+import functools
+import hashlib
 import json
 import re
+import threading
+import zipfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Callable, Iterable, Optional, Set, Tuple, Union
+from itertools import islice
 import html.parser
 from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+
+from cache_pac import open_cache_pac, read_source
+from isolated_pool import IsolatedPool
+from parse_cache import DEFAULT_MAX_BYTES as DEFAULT_PARSE_CACHE_BYTES, ParseCache, version_of
+from page_store import DEFAULT_READ_AHEAD, DEFAULT_READ_AHEAD_BYTES, PageStore
+from phase_scheduler import Phase, PhaseOrderError, PhaseScheduler
+from scan_columns import PackedScan, pack_scan, scan_from_bytes, scan_to_bytes, unpack_scan
+from symbol_library import SymbolLibrary
+from sdax_parser import (
+    OffsetIndex, Pattern, PageWalker, PropertyIndex, RecordTree, TokenConsumer,
+    as_text, previous_token, read_shape, read_tokens,
+    TOK_ATOM, TOK_CLOSE, TOK_OPEN, TOK_VALUE,
+)
 
 
 class TOCHTMLParser(HTMLParser):
@@ -61,6 +82,677 @@ class TOCHTMLParser(HTMLParser):
         return ' '.join(self.current_data)
 
 
+# =============================================================================
+# RICH TEXT
+# Annotations are Qt rich-text HTML documents. Only the text and the font
+# that applies to it are needed, so they are pulled out with a few regexes
+# rather than a full HTMLParser pass.
+# =============================================================================
+
+_STYLED_TAG_RE = re.compile(r'<(body|p|span)\b[^>]*?\sstyle="([^"]*)"')
+_FONT_SIZE_RE = re.compile(r'font-size:\s*(\d+(?:\.\d+)?)pt')
+_FONT_WEIGHT_RE = re.compile(r'font-weight:\s*(\d+)')
+_PARAGRAPH_TEXT_RE = re.compile(r'>([^<]+)</p>')
+_SPAN_TEXT_RE = re.compile(r'<span[^>]*>([^<]+)</span>')
+
+
+def parse_rich_text(html: str) -> Optional[Dict[str, Any]]:
+    """
+    Text and font of a Qt rich-text blob.
+
+    The text is the first paragraph's own text, or failing that the last
+    span's text (``<span style="...">100 Ohm LVDS</span></p></body></html>``).
+    font_size (pt) and font_weight ('bold' for CSS weight >= 600, else
+    'normal') come from the innermost body/p/span style before the text that
+    sets them, and are None if nothing does. Returns None when there is no
+    text.
+    """
+    m = _PARAGRAPH_TEXT_RE.search(html)
+    if m is None:
+        m = _SPAN_TEXT_RE.search(html, max(0, html.rfind('<span')))
+    if m is None:
+        return None
+    text = m.group(1).strip()
+    if not text:
+        return None
+
+    font_size = font_weight = None
+    for tag in _STYLED_TAG_RE.finditer(html, 0, m.end(1)):
+        size = _FONT_SIZE_RE.search(tag.group(2))
+        weight = _FONT_WEIGHT_RE.search(tag.group(2))
+        if size:
+            font_size = float(size.group(1))
+        if weight:
+            font_weight = 'bold' if int(weight.group(1)) >= 600 else 'normal'
+    return {'text': text, 'font_size': font_size, 'font_weight': font_weight}
+
+
+# =============================================================================
+# PAGE FILE CONSUMERS
+# Each page_file_*.ascii is walked once by a PageWalker; these consumers turn
+# the trigger tokens they registered into raw records for the page phases.
+# ``content`` is either the decoded page or its memory-mapped bytes, so the
+# context regexes are dual Patterns and kept text fields go through as_text().
+# Every record carries the page offset it was found at ('offset'), which the
+# page phases turn into stable element IDs and sequence indices.
+# =============================================================================
+
+_UINT = re.compile(r'\d+')
+_INT = re.compile(r'-?\d+')
+
+# Tokens following a Tag 45 atom: < < 0 />  < X />  < 0 />  < Y />  />
+TAG45_SHAPE = (
+    (TOK_OPEN, None), (TOK_ATOM, _UINT), (TOK_ATOM, _INT),
+    (TOK_ATOM, _UINT), (TOK_ATOM, _INT), (TOK_CLOSE, None),
+)
+
+
+def _record_properties(records: RecordTree, pos: int) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Property bags for the property token at ``pos``: the record holding it
+    (LP, rotation, transform, just) and the bag holding its object's zValue.
+
+    Most objects keep zValue in that same record; graphics (Tag 8) objects
+    keep it in a separate Tag 34 record a few levels up.
+    """
+    record = records.record_at(pos)
+    if record is None:
+        return {}, {}
+    props = record.properties()
+    if 'zValue' in props:
+        return props, props
+    for ancestor in islice(record.ancestors(), 3):
+        if ancestor.tag == 8:
+            for bag in ancestor.find(34):
+                return props, bag.properties()
+            break
+    return props, {}
+
+
+def _int_property(props: Dict[str, str], name: str, default: int) -> int:
+    value = props.get(name, '')
+    return int(value) if _INT.fullmatch(value) else default
+
+
+# Property value parsers for PropertyIndex lookups; None drops the entry
+def _parse_int(value: str) -> Optional[int]:
+    return int(value) if _INT.fullmatch(value) else None
+
+
+def _parse_uint(value: str) -> Optional[int]:
+    return int(value) if _UINT.fullmatch(value) else None
+
+
+def _parse_word(value: str) -> Optional[str]:
+    return value if re.fullmatch(r'\w+', value) else None
+
+
+def _parse_text(value: str) -> Optional[str]:
+    # Values containing 'v' were never matched by the ([^v]+) value patterns
+    return None if 'v' in value else value.strip()
+
+
+class GraphicsPositionConsumer(TokenConsumer):
+    """
+    Graphics positions: < GRAPHICS_ID />  < 45 />  <  < 0 />  < X />  < 0 />  < Y />
+    The 18-digit graphics_id is followed by coordinates in a < 45 /> block.
+    """
+
+    triggers = {'graphics_id': r'< \d{18} />'}
+    SHAPE = (
+        (TOK_ATOM, re.compile('45')), (TOK_OPEN, None), (TOK_ATOM, re.compile('0')),
+        (TOK_ATOM, _INT), (TOK_ATOM, re.compile('0')), (TOK_ATOM, _INT),
+    )
+
+    def begin_page(self, content, records: RecordTree) -> None:
+        super().begin_page(content, records)
+        self.positions: List[Tuple[str, int, int, int]] = []
+
+    def on_token(self, trigger: str, start: int, end: int) -> None:
+        tokens = read_shape(self.content, end, self.SHAPE)
+        if tokens:
+            gid = as_text(self.content[start:end][2:-3])
+            self.positions.append((gid, int(tokens[3][1]), int(tokens[5][1]), start))
+
+    def end_page(self) -> List[Tuple[str, int, int, int]]:
+        return self.positions
+
+
+class WireConsumer(TokenConsumer):
+    """
+    Wire segments: an LP property (coordinates X1,Y1;X2,Y2) and the CGTYPE
+    property of the same property record. Nothing outside that record is
+    consulted, so a page with a missing CGTYPE costs no more than one lookup
+    per LP.
+    """
+
+    triggers = {'lp': r'<n\s*LP\s*n/>'}
+
+    # Pattern: < TAG /> < < TABLE_NUM /> < 37 /> < Y />
+    STYLE_TAG_RE = Pattern(r'<\s*(\d+)\s*/>\s*<\s*<\s*(\d+)\s*/>\s*<\s*37\s*/>\s*<\s*\d+\s*/>')
+
+    def begin_page(self, content, records: RecordTree) -> None:
+        super().begin_page(content, records)
+        self.wires: List[Dict] = []
+
+    def on_token(self, trigger: str, start: int, end: int) -> None:
+        tokens = read_tokens(self.content, end, 3)
+        if not (len(tokens) == 3 and tokens[0][0] == TOK_ATOM and tokens[1][0] == TOK_ATOM
+                and tokens[2][0] == TOK_VALUE and tokens[2][1] and 'v' not in tokens[2][1]):
+            return
+
+        # CGTYPE, rotation and transform sit next to LP in the wire's property
+        # record (CGTYPE usually before it)
+        props, object_props = _record_properties(self.records, start)
+        cgtype = props.get('CGTYPE', '')
+        if not _UINT.fullmatch(cgtype):
+            return
+        self._add_wire(start, tokens[2][1], int(cgtype), props, object_props)
+
+    def _add_wire(self, start: int, lp_coords: str, cgtype: int,
+                  props: Dict[str, str], object_props: Dict[str, str]) -> None:
+        content = self.content
+
+        # Extract style_id and table number from the block context
+        tag_match = self.STYLE_TAG_RE.search(content, max(0, start - 300), start)
+        style_id = int(tag_match.group(1)) if tag_match else 0
+        table_num = int(tag_match.group(2)) if tag_match else 1  # default to table 1
+
+        # Parse LP coordinates: "X1,Y1;X2,Y2"
+        try:
+            points = []
+            for pt_str in lp_coords.split(';'):
+                coords = pt_str.split(',')
+                if len(coords) >= 2:
+                    points.append({'x': int(float(coords[0])), 'y': int(float(coords[1]))})
+            if len(points) < 2:
+                return
+        except (ValueError, IndexError):
+            return
+
+        self.wires.append({
+            'offset': start,
+            'points': points,
+            'cgtype': cgtype,
+            'style_id': style_id,
+            'table_num': table_num,
+            'rotation': _int_property(props, 'rotation', 0),
+            'transform_str': props.get('transform', '1,0,0,0,1,0,0,0,1').strip(),
+            'z_value': _int_property(object_props, 'zValue', 10000),
+        })
+
+    def end_page(self) -> List[Dict]:
+        return self.wires
+
+
+class PlacementConsumer(TokenConsumer):
+    """
+    Instance placements: a transform property and the origin of the object
+    whose property record holds it, the object's own < 45 /> coordinate
+    block:
+
+        < 29 />  <  ...  < 44 /> <bounds />  < 45 /> <origin />  < 13 /> <props />  />
+
+    The origin is looked up among the object record's children only, never
+    past the end of the object, and rotation, zValue and name are read from
+    the transform's own property record.
+
+    Only component (Tag 12) and port/power symbol (Tag 7) objects are
+    placements; text (Tag 31), graphics and wires carry transforms too.
+    """
+
+    triggers = {'transform': r'<n transform n/>'}
+    OBJECT_TAGS = (7, 12)
+
+    def begin_page(self, content, records: RecordTree) -> None:
+        super().begin_page(content, records)
+        self.placements: List[Dict] = []
+
+    def on_token(self, trigger: str, start: int, end: int) -> None:
+        tokens = read_tokens(self.content, end, 3)
+        if not (len(tokens) == 3 and tokens[0][0] == TOK_ATOM and tokens[1][0] == TOK_ATOM
+                and tokens[2][0] == TOK_VALUE and tokens[2][1] and 'v' not in tokens[2][1]):
+            return
+        transform_str = tokens[2][1]
+
+        bag = self.records.record_at(start)
+        obj = bag.parent if bag is not None else None
+        if obj is None or obj.tag not in self.OBJECT_TAGS:
+            return
+        # Rotation, zValue and name come from the transform's own property
+        # record, like a wire's
+        props, object_props = _record_properties(self.records, start)
+        origin = None
+        for child in obj.find(45):
+            origin = read_shape(self.content, child.start, TAG45_SHAPE)
+            if origin:
+                break
+        if not origin:
+            return
+        z_value = _parse_uint(object_props.get('zValue', ''))
+        name = _parse_text(props['name']) if 'name' in props else None
+
+        self.placements.append({
+            'offset': start,
+            'transform_str': transform_str,
+            'x': int(origin[2][1]),
+            'y': int(origin[4][1]),
+            'rotation': _int_property(props, 'rotation', 0),
+            'z_value': z_value if z_value is not None else 10000,
+            'instance_name': name,
+        })
+
+    def end_page(self) -> List[Dict]:
+        return self.placements
+
+
+class TextConsumer(TokenConsumer):
+    """
+    Text in SDAX page files comes in several forms:
+    1. Net labels in Tag 29 - signal names like P0_USB_DN, VCC, GND
+    2. HTML text blocks - rich text in GRAPHICS_BLOCK_CHILD_TEXT
+    3. Inline HTML text embedded in Tag 29 blocks
+    4. Pin numbers and simple labels (single chars/numbers) in Tag 31
+    """
+
+    # Signal/net names: < LENGTH /> < NET_NAME />
+    NET_NAME_PATTERN = (
+        r'P\d+_[A-Z0-9_]+|VCC[A-Z0-9_]*|GND[A-Z0-9_]*|PS_[A-Z0-9_]+|'
+        r'CLK[A-Z0-9_]*|RST[A-Z0-9_]*|EN[A-Z0-9_]*|INT[A-Z0-9_]*|'
+        r'SDA[A-Z0-9_]*|SCL[A-Z0-9_]*|MISO[A-Z0-9_]*|MOSI[A-Z0-9_]*|'
+        r'TX[A-Z0-9_]*|RX[A-Z0-9_]*|[A-Z][A-Z0-9]*_[A-Z0-9_]+'
+    )
+
+    # Example: <span style=" font-size:10pt; font-weight:600;">100 Ohm LVDS</span></p></body></html>
+    INLINE_HTML_RE = Pattern(r'<span[^>]*>([^<]+)</span></p></body></html>\s*/>')
+
+    triggers = {
+        'net_name': r'<\s*(?=[A-Z])(?:' + NET_NAME_PATTERN + r')\s*/>',
+        'html_block': r'<n\s+GRAPHICS_BLOCK_CHILD_TEXT\s+n/>',
+        'inline_html': INLINE_HTML_RE.pattern.replace('([^<]+)', '[^<]+'),
+        'pin_label': r'<\s*31\s*/>',
+    }
+
+    # With known net names: any atom containing a letter, or a bus name such
+    # as < DSP_XID<3..0> />, is a candidate and is classified by set lookup
+    NET_CANDIDATE_TRIGGER = r'<\s*(?:(?=[^<>/\s]*[A-Za-z])[^<>/\s]+|[A-Za-z0-9_]+<[0-9.:]+>)\s*/>'
+
+    # System/internal label types to skip
+    SKIP_LABELS = {
+        'CGTYPE', 'LP', 'MSB', 'LSB', 'PROP_WIDTH', 'COMMENT_BODY',
+        'GRAPHICS_BLOCK_ID', 'GRAPHICS_BLOCK_NAME', 'BODY_TYPE',
+        'HDL_PORT', 'HDL_POWER', 'NC_PORT', 'PATH', 'LOCATION', 'VALUE',
+        'IMPLEMENTATION', 'IMPLEMENTATION_TYPE', 'PSPICETEMPLATE',
+        'ORGNAME', 'ORGADDR1', 'ORGADDR2', 'ORGADDR3', 'REVCODE',
+        'PAGE_NUMBER', 'PAGE_COUNT', 'PAGE_SIZE', 'PAGE_CREATE_DATE',
+        'CAP_NAME', 'OFFPAGE', 'DOC', 'VHDL_PORT', 'VHDL_MODE',
+        'CDS_NET_ID', 'HDL_TAP', 'VOLTAGE', 'MFG_PART_NO', 'MFG',
+        'JEDEC_TYPE', 'DATASHEET', 'ASI_MODEL', 'ROHS',
+        'CDS_LIBRARY_PHYSICAL_ID', 'CDS_LIBRARY_ID', 'CDS_ASSOC_NET_ID_STR',
+        'zeronull', 'default', 'PN', 'BN', 'MPN',
+    }
+
+    TAG45_RE = Pattern(
+        r'<\s*45\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*/>'
+    )
+
+    # < 31 />  <  < n />  < n />  < n />  < LENGTH />  < TEXT />
+    #   < 44 />  <  < 45 /> <...> />  < 45 /> <...> />  />  < 45 /> <...> />
+    PIN_LABEL_SHAPE = (
+        (TOK_OPEN, None), (TOK_ATOM, _UINT), (TOK_ATOM, _UINT), (TOK_ATOM, _UINT),
+        (TOK_ATOM, _UINT), (TOK_ATOM, re.compile(r'[A-Z0-9]')),
+        (TOK_ATOM, re.compile('44')), (TOK_OPEN, None),
+        (TOK_ATOM, re.compile('45')), *TAG45_SHAPE,
+        (TOK_ATOM, re.compile('45')), *TAG45_SHAPE,
+        (TOK_CLOSE, None),
+        (TOK_ATOM, re.compile('45')), *TAG45_SHAPE,
+    )
+
+    def __init__(self, net_names: Optional[Set[str]] = None):
+        # net_names: every XCON net name plus bus base names (DSP_XID for
+        # DSP_XID<3..0>). When given, net labels are the page atoms found in
+        # it instead of NET_NAME_PATTERN matches minus SKIP_LABELS.
+        self.net_names = net_names
+        if net_names is not None:
+            self.triggers = dict(self.triggers, net_name=self.NET_CANDIDATE_TRIGGER)
+        # parse_rich_text() results by HTML blob; the same annotation blobs
+        # repeat across pages and blocks
+        self._rich_text: Dict[Any, Optional[Dict[str, Any]]] = {}
+
+    def _parse_rich_text(self, html) -> Optional[Dict[str, Any]]:
+        """Memoized parse_rich_text(); ``html`` may be str or raw bytes."""
+        if html not in self._rich_text:
+            self._rich_text[html] = parse_rich_text(as_text(html))
+        return self._rich_text[html]
+
+    def begin_page(self, content, records: RecordTree) -> None:
+        super().begin_page(content, records)
+        self.net_labels: List[Dict] = []
+        self.html_blocks: List[Dict] = []
+        self.inline_html: List[Dict] = []
+        self.pin_labels: List[Dict] = []
+        self._pin_resume = 0
+        self._positions: Optional[OffsetIndex] = None
+        self._label_positions: Optional[OffsetIndex] = None
+
+    def _position_index(self) -> Tuple[OffsetIndex, OffsetIndex]:
+        """
+        Every Tag 45 coordinate block of the page, and the subset that are
+        real positions rather than small offsets or bounding-box zeros.
+        Built once per page, on the first text that needs a position.
+        """
+        if self._positions is None:
+            entries = [(m.start(), m.end(), (int(m.group(1)), int(m.group(2))))
+                       for m in self.TAG45_RE.finditer(self.content)]
+            self._positions = OffsetIndex(entries)
+            self._label_positions = OffsetIndex(
+                [e for e in entries if abs(e[2][0]) > 1000 or abs(e[2][1]) > 1000])
+        return self._positions, self._label_positions
+
+    def on_token(self, trigger: str, start: int, end: int) -> None:
+        if trigger == 'net_name':
+            self._on_net_name(start, end)
+        elif trigger == 'html_block':
+            self._on_html_block(start, end)
+        elif trigger == 'inline_html':
+            self._on_inline_html(start, end)
+        elif trigger == 'pin_label':
+            self._on_pin_label(start, end)
+
+    def _on_net_name(self, start: int, end: int) -> None:
+        length_token = previous_token(self.content, start)
+        if length_token is None or length_token[0] != TOK_ATOM or not _UINT.fullmatch(length_token[1]):
+            return
+        text = as_text(self.content[start:end][1:-2]).strip()
+
+        if self.net_names is not None:
+            # Known nets only; a bus label is looked up by its base name
+            if text.partition('<')[0] not in self.net_names:
+                return
+        elif text in self.SKIP_LABELS:
+            # Skip internal names
+            return
+
+        # Get context around this match to find position/rotation
+        # Use a wider window to capture nearby rotation/justification tags
+        content = self.content
+        ctx_start = max(0, length_token[2] - 1200)
+        ctx_end = min(len(content), end + 1200)
+
+        # Take the LAST valid position in the context (closest to the text),
+        # skipping zeros from bounding boxes
+        best = self._position_index()[1].last_within(ctx_start, ctx_end)
+        if best is None:
+            return
+        best_x, best_y = best
+
+        props = self.records.property_index()
+        rotation = props.index('rotation', _parse_int, atoms=2).first_within(ctx_start, ctx_end)
+        justification = props.index('just', _parse_uint, atoms=1).first_within(ctx_start, ctx_end)
+
+        self.net_labels.append({
+            'offset': start,
+            'text': text,
+            'x': best_x,
+            'y': best_y,
+            'rotation': rotation if rotation is not None else 0,
+            'justification': justification if justification is not None else 0,
+        })
+
+    def _on_html_block(self, start: int, end: int) -> None:
+        tokens = read_tokens(self.content, end, 3)
+        if not (len(tokens) == 3 and tokens[0][0] == TOK_ATOM and _UINT.fullmatch(tokens[0][1])
+                and tokens[1][0] == TOK_ATOM and _UINT.fullmatch(tokens[1][1])
+                and tokens[2][0] == TOK_VALUE):
+            return
+
+        # Extract plain text and font from HTML
+        rich_text = self._parse_rich_text(tokens[2][1])
+        if rich_text is None:
+            return
+
+        # Take last position in the preceding context
+        position = self._position_index()[0].last_within(max(0, start - 500), start)
+        if position is None:
+            return
+        self.html_blocks.append(dict(rich_text, offset=start, x=position[0], y=position[1]))
+
+    def _on_inline_html(self, start: int, end: int) -> None:
+        # The whole rich-text document, so body-level fonts apply too
+        doctype = '<!DOCTYPE' if isinstance(self.content, str) else b'<!DOCTYPE'
+        doc_start = self.content.rfind(doctype, max(0, start - 4000), start)
+        rich_text = self._parse_rich_text(self.content[doc_start if doc_start != -1 else start:end])
+        if rich_text is None:
+            return
+
+        # Find the LAST Tag 45 position before this text
+        position = self._position_index()[0].last_within(max(0, start - 1000), start)
+        if position is None:
+            return
+        x, y = position
+
+        # Skip positions that are zero (likely offsets, not actual positions)
+        if abs(x) < 1000 and abs(y) < 1000:
+            return
+        self.inline_html.append(dict(rich_text, offset=start, x=x, y=y))
+
+    def _on_pin_label(self, start: int, end: int) -> None:
+        if start < self._pin_resume:
+            return
+        tokens = read_shape(self.content, end, self.PIN_LABEL_SHAPE)
+        if not tokens:
+            return
+        self._pin_resume = tokens[-1][3]
+        # Use the last Tag 45 position (actual position, not offset)
+        self.pin_labels.append({
+            'offset': start,
+            'text': tokens[5][1],
+            'x': int(tokens[-4][1]),
+            'y': int(tokens[-2][1]),
+        })
+
+    def end_page(self) -> Dict[str, List[Dict]]:
+        return {
+            'net_labels': self.net_labels,
+            'html_blocks': self.html_blocks,
+            'inline_html': self.inline_html,
+            'pin_labels': self.pin_labels,
+        }
+
+
+def build_page_walker(net_names: Optional[Set[str]] = None) -> PageWalker:
+    """The page walker shared by the page phases (see TextConsumer for net_names)."""
+    walker = PageWalker()
+    walker.register('graphics', GraphicsPositionConsumer())
+    walker.register('wires', WireConsumer())
+    walker.register('placements', PlacementConsumer())
+    walker.register('text', TextConsumer(net_names=net_names))
+    return walker
+
+
+def empty_page_scan() -> Dict[str, Any]:
+    """Walk result of a page with nothing on it; stands in for a degraded page."""
+    return {
+        'graphics': [],
+        'wires': [],
+        'placements': [],
+        'text': {'net_labels': [], 'html_blocks': [], 'inline_html': [], 'pin_labels': []},
+    }
+
+
+# =============================================================================
+# PAGE WORKERS
+# With --jobs N (or a per-file time/memory budget) the page walks run in
+# isolated worker processes (isolated_pool.py); each worker builds its own
+# walker once and hands each page's results back as typed columns in shared
+# memory (scan_columns.py) rather than as pickled records.
+# =============================================================================
+
+class DegradedFile:
+    """
+    A file given up on after its worker timed out, crashed or ran out of
+    memory on every attempt. Page walk backends return it in place of a
+    scan; the page is then treated as empty rather than walked again here.
+    """
+
+    __slots__ = ('reason', 'attempts')
+
+    def __init__(self, reason: str, attempts: int = 1):
+        self.reason = reason
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f'DegradedFile({self.reason!r}, attempts={self.attempts})'
+
+
+_worker_walker: Optional[PageWalker] = None
+_worker_store: Optional[PageStore] = None
+_worker_mmap = False
+
+
+def _init_page_worker(net_names: Optional[Set[str]], mmap_pages: bool) -> None:
+    global _worker_walker, _worker_store, _worker_mmap
+    _worker_walker = build_page_walker(net_names)
+    # Nothing is reused within a worker, so nothing is kept
+    _worker_store = PageStore(max_bytes=0)
+    _worker_mmap = mmap_pages
+
+
+def _walk_page_worker(page_file: Path) -> Union[PackedScan, Dict[str, Any], None]:
+    """Walk one page; None on failure (the phase re-walks it and reports)."""
+    try:
+        if _worker_mmap:
+            content = _worker_store.map(page_file)
+        else:
+            content = _worker_store.text(page_file)
+        return pack_scan(_worker_walker.walk(content))
+    except Exception:
+        return None
+
+
+# Page walk backend for ForensicExtractor.scan_pages():
+# (page_files, net_names, mmap_pages) -> one scan, None (failed: the phase
+# walks the page again and reports) or DegradedFile per page file
+PageWalkRunner = Callable[[List[Path], Optional[Set[str]], bool],
+                          Iterable[Union[Dict[str, Any], DegradedFile, None]]]
+
+
+def page_walk_pool(net_names: Optional[Set[str]], mmap_pages: bool, jobs: int,
+                   timeout: Optional[float] = None, max_memory: Optional[int] = None,
+                   retries: int = 1) -> IsolatedPool:
+    """
+    Pool of ``jobs`` page walk workers, each page within ``timeout`` seconds
+    and ``max_memory`` bytes per worker (see IsolatedPool).
+    """
+    return IsolatedPool(jobs, initializer=_init_page_worker, initargs=(net_names, mmap_pages),
+                        timeout=timeout, max_memory=max_memory, retries=retries)
+
+
+def walk_pages_with(pool: IsolatedPool,
+                    page_files: List[Path]) -> List[Union[Dict[str, Any], DegradedFile, None]]:
+    """Walk ``page_files`` on a page_walk_pool(): one PageWalkRunner result per page."""
+    scans = []
+    for outcome in pool.map(_walk_page_worker, page_files):
+        if not outcome.ok:
+            scans.append(DegradedFile(outcome.error, outcome.attempts))
+            continue
+        try:
+            scans.append(unpack_scan(outcome.value))
+        except Exception:
+            # Left to the phase, like a walk that failed in the worker
+            scans.append(None)
+    return scans
+
+
+def walk_pages_in_pool(page_files: List[Path], net_names: Optional[Set[str]],
+                       mmap_pages: bool, jobs: int, timeout: Optional[float] = None,
+                       max_memory: Optional[int] = None,
+                       retries: int = 1) -> List[Union[Dict[str, Any], DegradedFile, None]]:
+    """Walk ``page_files`` in ``jobs`` local worker processes (see page_walk_pool)."""
+    with page_walk_pool(net_names, mmap_pages, jobs, timeout, max_memory, retries) as pool:
+        return walk_pages_with(pool, page_files)
+
+
+# =============================================================================
+# SYMBOL WORKERS
+# Cache symbols are independent of each other; with --jobs N (or a per-file
+# budget) they are parsed in isolated worker processes and only the parsed
+# symbol records come back.
+# =============================================================================
+
+def _parse_symbol_worker(symbol: Tuple[Path, str]) -> Tuple[Optional[Dict], Optional[str]]:
+    """Parse one cache symbol: (symbol_data, None), or (None, error) on failure."""
+    ascii_file, symbol_key = symbol
+    try:
+        content = read_source(ascii_file).decode('utf-8', errors='ignore')
+        return ForensicExtractor._parse_symbol_graphics(content, symbol_key), None
+    except Exception as e:
+        return None, str(e)
+
+
+# =============================================================================
+# FILE LOADERS
+# dx.json, json, xcon and style files are small but numerous; on a network
+# share each open has real latency. prefetch_files() runs these loaders on a
+# thread pool and the phases then take the parsed payloads in their own order.
+# =============================================================================
+
+def content_key(data: bytes) -> str:
+    """Content hash identifying a parsed file in ForensicExtractor.parsed_files."""
+    return hashlib.sha1(data).hexdigest()
+
+
+# Parse cache entries hold the output of the parsers in these modules
+PARSER_SOURCES = tuple(Path(__file__).with_name(name)
+                       for name in ('forensic_extractor.py', 'sdax_parser.py', 'scan_columns.py'))
+
+
+def open_parse_cache(directory, max_bytes: int = DEFAULT_PARSE_CACHE_BYTES) -> ParseCache:
+    """Parse cache in ``directory`` for this version of the parsers."""
+    return ParseCache(directory, version_of(PARSER_SOURCES), max_bytes)
+
+
+def cache_source(root_dir, use_pac: bool = False) -> Path:
+    """
+    Where the cache symbols and styles of ``root_dir`` are read from: the
+    unpacked cache/ directory, or cache.pac with ``use_pac`` or when there is
+    no cache/ (see cache_pac.py).
+    """
+    root_dir = Path(root_dir)
+    pac = root_dir / 'cache.pac'
+    if (use_pac or not (root_dir / 'cache').is_dir()) and pac.is_file():
+        return pac
+    return root_dir / 'cache'
+
+
+def open_symbol_library(path, root_dir, use_pac: bool = False) -> SymbolLibrary:
+    """Compiled symbol library at ``path`` for the cache of ``root_dir``."""
+    source = cache_source(root_dir, use_pac).name
+    return SymbolLibrary(path, root_dir, f'{version_of(PARSER_SOURCES)}:{source}')
+
+
+def incremental_state_path(output_path) -> Path:
+    """State file an --incremental run keeps next to its output."""
+    return Path(output_path).with_suffix('.incremental.json')
+
+
+def _as_json(value: Any) -> Any:
+    """``value`` as it reads back from the exported JSON."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def _load_json_file(path: Path) -> Any:
+    return json.loads(path.read_bytes().decode('utf-8'))
+
+
+def _load_xcon_file(path: Path) -> ET.Element:
+    return ET.fromstring(path.read_bytes())
+
+
+def _load_style_file(path: Path) -> str:
+    return read_source(path).decode('utf-8', errors='ignore')
+
+
 class ForensicExtractor:
     """
     Extracts and aggregates design data from Cadence SDAX project files.
@@ -81,6 +773,12 @@ class ForensicExtractor:
         65570: 'table',         # Table/label container
     }
 
+    # Draw-order layers within a page's sequence_index range
+    SEQUENCE_LAYERS = ('wire', 'dx_instance', 'instance', 'netlabel', 'richtext',
+                       'htmltext', 'pinlabel', 'refdes', 'value')
+    SEQUENCE_LAYER_SPAN = 10**9   # sequence indices per layer (page offsets)
+    SEQUENCE_PAGE_SPAN = 10**10   # sequence indices per page
+
     # Page size definitions (ANSI standard)
     PAGE_SIZES = {
         'A': {'width': 11000, 'height': 8500, 'unit': 'mils'},   # ANSI A (8.5x11)
@@ -98,10 +796,45 @@ class ForensicExtractor:
     # Instance ID pattern in cpath: \IXXXXXXX\
     INSTANCE_ID_PATTERN = re.compile(r'\\I(\d+)\\')
 
-    def __init__(self, root_dir: str):
-        """Initialize extractor with root directory path."""
+    def __init__(self, root_dir: str, mmap_pages: bool = False,
+                 parsed_files: Optional[Dict[Tuple[str, str], Any]] = None,
+                 read_ahead: int = 0,
+                 read_ahead_bytes: int = DEFAULT_READ_AHEAD_BYTES,
+                 file_timeout: Optional[float] = None, file_memory: Optional[int] = None,
+                 file_retries: int = 1, parse_cache: Optional[ParseCache] = None,
+                 incremental: bool = False, symbol_library: Optional[SymbolLibrary] = None,
+                 cache_pac: bool = False):
+        """
+        Initialize extractor with root directory path.
+
+        parsed_files maps (kind, content_key) to the parsed symbol ('symbol')
+        or style file ('style'); passing the same dict to several extractors
+        (see batch_extract.py) parses each distinct file once.
+
+        read_ahead is how many page, symbol and XCON files are read ahead of
+        the one being parsed, within read_ahead_bytes (0 reads on demand).
+
+        file_timeout (seconds) and file_memory (bytes per worker) budget each
+        page walk and symbol parse; with either set they run in isolated
+        worker processes even with one job. A file whose worker times out or
+        dies file_retries + 1 times is reported in statistics as degraded.
+
+        parse_cache (see open_parse_cache()) keeps parsed page, block and
+        symbol files across runs; unchanged files are loaded from it.
+
+        incremental re-extracts only the page layer of blocks changed since
+        the previous output (see plan_incremental()).
+
+        symbol_library (see open_symbol_library()) holds the parsed cache
+        symbols and styles; while it matches the cache they are loaded from
+        it instead of parsed, and a stale library is rebuilt after the run.
+
+        cache_pac reads the cache symbols and styles from cache.pac even
+        where an unpacked cache/ exists (see cache_source()).
+        """
         self.root_dir = Path(root_dir)
         self.worklib_dir = self.root_dir / 'worklib'
+        self.cache_dir = cache_source(self.root_dir, cache_pac)
 
         # File lists
         self.json_files: List[Path] = []
@@ -141,9 +874,58 @@ class ForensicExtractor:
         self.grid_config: Dict = {}  # Grid/snap configuration
         self.grid_config: Dict = {}  # Grid/snap configuration
 
-        # Counters for element IDs
-        self._element_counter = 0
-        self._sequence_counter = 0
+        # Element IDs and sequence indices are derived from each primitive's
+        # source record (see _element_id / _sequence_index)
+        self._element_ids: Set[str] = set()
+        self._sequence_indices: Set[int] = set()
+        self._page_ranks: Optional[Dict[Tuple[str, str], int]] = None
+        # graphics_id -> page offset of its < 45 /> block
+        self._graphics_offsets: Dict[str, int] = {}
+
+        # Parsed transform matrices by transform string (nearly all identity)
+        self._transform_cache: Dict[str, Dict] = {}
+
+        # Shared single-pass page walk: every page_file_*.ascii is tokenized once
+        # and its records handed to the wire/placement/text/graphics phases
+        self._page_walker = build_page_walker()
+        self._scan_variant = ''
+        self._net_names: Optional[Set[str]] = None
+        self._page_scans: Dict[Path, Dict[str, Any]] = {}
+        # Page phases may run concurrently; the walker keeps per-page state
+        self._scan_lock = threading.Lock()
+        # Files fetched ahead by prefetch_files(): path -> (payload, error)
+        self._prefetched: Dict[Path, Tuple[Any, Optional[Exception]]] = {}
+
+        # Read-once store for page/block/symbol/style files shared by all phases.
+        # With mmap_pages the page walk runs over memory-mapped bytes and only
+        # the fields it keeps are decoded.
+        self.page_store = PageStore(reader=read_source)
+        self.mmap_pages = mmap_pages
+        self.parsed_files = parsed_files if parsed_files is not None else {}
+        self.read_ahead = read_ahead
+        self.read_ahead_bytes = read_ahead_bytes
+        self.file_timeout = file_timeout
+        self.file_memory = file_memory
+        self.file_retries = file_retries
+        self.isolate_files = file_timeout is not None or file_memory is not None
+        self.parse_cache = parse_cache
+        # Incremental runs: blocks whose page primitives and graphics positions
+        # come from the previous output, keyed by (phase group, block)
+        self.incremental = incremental
+        self.unchanged_blocks: Set[str] = set()
+        self._block_fingerprints: Dict[str, str] = {}
+        self._previous_primitives: Dict[Tuple[str, str], List[Dict]] = {}
+        self._previous_graphics: Dict[str, List[list]] = {}
+        # Graphics positions by block, in page order, for the incremental state
+        self._block_graphics: Dict[str, List[list]] = defaultdict(list)
+        # Parsed cache symbols and styles by file name, for the symbol library;
+        # dirty once a file had to be parsed
+        self.symbol_library = symbol_library
+        self._library_symbols: Dict[str, Dict] = {}
+        self._library_styles: Dict[str, Dict] = {}
+        self._library_dirty = False
+        # Files that could not be (fully) parsed: relative path -> record
+        self.degraded_files: Dict[str, Dict[str, Any]] = {}
 
         # Statistics
         self.stats = {
@@ -174,6 +956,86 @@ class ForensicExtractor:
         # Reverse mapping: TOC block name -> filesystem block name
         self.BLOCK_ALIASES_REVERSE = {v: k for k, v in self.BLOCK_ALIASES.items()}
 
+    def phases(self, jobs: int = 1, io_threads: int = 1, xcon_net_labels: bool = False,
+               output_path: str = 'full_design.json',
+               walk_pages: Optional[PageWalkRunner] = None) -> List[Phase]:
+        """
+        The extraction phases with the state each one reads and produces, for
+        PhaseScheduler.
+
+        ``requires`` lists state a phase cannot run without (pulled into
+        partial runs); ``after`` only orders it behind optional phases and
+        behind the phases appending primitives before it, which keeps the
+        primitives list in its usual order. Optional phases (prefetch,
+        net_names, incremental, scan_pages) are only included when enabled;
+        scan_pages runs with ``jobs`` > 1, a ``walk_pages`` backend or
+        read-ahead (see scan_pages()). Page phases come after net_names and
+        scan_pages so every page is walked with the final walker, and after
+        incremental so they know which blocks to take from the previous output.
+        """
+        page_walk = ('net_names', 'unchanged_blocks', 'page_scans')
+        phases = [
+            Phase('discover', self.discover_signal_files, provides=['signal_files']),
+        ]
+        if io_threads > 1:
+            phases.append(Phase('prefetch', lambda: self.prefetch_files(io_threads),
+                                requires=['signal_files'], provides=['prefetched']))
+        if xcon_net_labels:
+            phases.append(Phase('net_names', self.load_xcon_net_names,
+                                requires=['signal_files'], after=['prefetched'],
+                                provides=['net_names']))
+        if self.incremental:
+            phases.append(Phase('incremental', lambda: self.plan_incremental(output_path),
+                                requires=['styles'], after=['net_names'],
+                                provides=['unchanged_blocks']))
+        if jobs > 1 or walk_pages is not None or self.read_ahead > 0 or self.isolate_files:
+            phases.append(Phase('scan_pages', lambda: self.scan_pages(jobs, walk_pages),
+                                after=['net_names', 'unchanged_blocks'], provides=['page_scans']))
+        phases += [
+            Phase('symbol_pins', self.load_symbol_pin_numbers),
+            Phase('dx_instances', self.load_dx_json_instances,
+                  requires=['signal_files'], after=['prefetched'], provides=['dx_instances']),
+            Phase('instance_graphics', self.build_instance_to_graphics_mapping,
+                  provides=['instance_to_graphics']),
+            Phase('pages', self.extract_pages, provides=['page_mapping']),
+            Phase('graphics_positions', self.extract_graphics_positions_from_pages,
+                  requires=['page_mapping'], after=page_walk, provides=['graphics_positions']),
+            Phase('link_positions', self.link_instance_positions,
+                  requires=['instance_to_graphics', 'graphics_positions'],
+                  provides=['instance_positions']),
+            Phase('styles', self.load_styles, after=['prefetched'], provides=['styles']),
+            Phase('grid', self.extract_grid_config, provides=['grid_config']),
+            Phase('symbols', lambda: self.extract_symbol_graphics(jobs),
+                  provides=['symbol_graphics']),
+            Phase('wires', self.extract_wire_segments,
+                  requires=['page_mapping', 'styles'], after=page_walk,
+                  provides=['wire_primitives']),
+            Phase('placements', self.extract_instance_placements,
+                  requires=['page_mapping', 'dx_instances', 'instance_positions'],
+                  after=page_walk + ('wire_primitives',), provides=['placement_primitives']),
+            Phase('text', self.extract_text_primitives,
+                  requires=['page_mapping', 'dx_instances', 'instance_positions', 'symbol_graphics'],
+                  after=page_walk + ('wire_primitives', 'placement_primitives'),
+                  provides=['text_primitives']),
+            Phase('components', self.extract_components,
+                  requires=['signal_files'], after=['prefetched'], provides=['components']),
+            Phase('nets', self.extract_nets,
+                  requires=['signal_files', 'components'], after=['prefetched', 'net_names'],
+                  provides=['nets']),
+            Phase('hierarchy', self.build_hierarchy, requires=['components'], provides=['hierarchy']),
+            Phase('validate', self.validate,
+                  requires=['dx_instances', 'instance_to_graphics', 'graphics_positions',
+                            'instance_positions', 'page_mapping', 'styles', 'grid_config',
+                            'symbol_graphics', 'wire_primitives', 'placement_primitives',
+                            'text_primitives', 'components', 'nets', 'hierarchy'],
+                  provides=['validation']),
+            Phase('export', lambda: self.export(output_path), requires=['validation']),
+        ]
+        if self.symbol_library is not None:
+            phases.append(Phase('symbol_library', self.save_symbol_library,
+                                requires=['symbol_graphics', 'styles']))
+        return phases
+
     def discover_signal_files(self) -> None:
         """Phase 1: Discover JSON, DX.JSON, and XCON signal files in worklib."""
         print("\n" + "="*60)
@@ -208,6 +1070,86 @@ class ForensicExtractor:
         print(f"  Total DX.JSON files: {len(self.dx_json_files)}")
         print(f"  Total XCON files: {len(self.xcon_files)}")
 
+    def _style_files(self) -> List[Path]:
+        """Every .style file: the cache's, then worklib (tbl_1 and sym_*)."""
+        style_files = self._cache_files('.style')
+        if self.worklib_dir.exists():
+            style_files.extend(self.worklib_dir.rglob('*.style'))
+        return style_files
+
+    def prefetch_files(self, threads: int) -> None:
+        """
+        Phase 1l: Fetch and decode the dx.json, json, xcon and style files on
+        ``threads`` threads.
+
+        Only the reading and parsing is concurrent: the payloads are kept per
+        path and the phases consume them in their usual order through
+        _load_file(), so the output is identical to a sequential run. A file
+        that fails to load keeps its error, which the phase reports as before.
+        """
+        print("\n" + "="*60)
+        print(f"PHASE 1l: CONCURRENT FILE LOADING ({threads} threads)")
+        print("="*60)
+
+        loads = [(f, _load_json_file) for f in self.dx_json_files + self.json_files]
+        loads += [(f, _load_xcon_file) for f in self.xcon_files]
+        loads += [(f, _load_style_file) for f in self._style_files()]
+
+        def fetch(load):
+            path, loader = load
+            try:
+                return loader(path), None
+            except Exception as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for (path, _), result in zip(loads, pool.map(fetch, loads)):
+                self._prefetched[path] = result
+
+        failed = sum(1 for _, error in self._prefetched.values() if error is not None)
+        print(f"  Files loaded: {len(loads) - failed} of {len(loads)}")
+
+    def _load_file(self, path: Path, loader, keep: bool = False) -> Any:
+        """
+        Payload of ``path`` from prefetch_files(), or ``loader(path)`` if it
+        was not prefetched. A prefetch error is raised here, in the phase.
+        The entry is released unless ``keep`` (another phase reads it too).
+        """
+        entry = self._prefetched.get(path) if keep else self._prefetched.pop(path, None)
+        if entry is None:
+            return loader(path)
+        payload, error = entry
+        if error is not None:
+            raise error
+        return payload
+
+    def _read_ahead(self, paths: List[Path], kind: str = 'text') -> Iterable[Path]:
+        """
+        ``paths`` in order, with the page store reading the next ones in the
+        background while the caller parses the current one (see
+        PageStore.read_ahead). Files already fetched by prefetch_files() are
+        not read again.
+        """
+        if self.read_ahead <= 0:
+            return paths
+        ahead = [path for path in paths if path not in self._prefetched]
+        if not ahead:
+            return paths
+
+        def ordered():
+            reads = self.page_store.read_ahead(ahead, kind, depth=self.read_ahead,
+                                               max_bytes=self.read_ahead_bytes)
+            pending = set(ahead)
+            for path in paths:
+                if path in pending:
+                    next(reads)
+                yield path
+        return ordered()
+
+    def _load_xcon(self, path: Path) -> ET.Element:
+        """XCON tree from the page store's bytes (read ahead by the XCON phases)."""
+        return ET.fromstring(self.page_store.raw(path))
+
     def load_symbol_pin_numbers(self) -> None:
         """Load symbol pin numbers from cache."""
         print("\n" + "="*60)
@@ -224,8 +1166,7 @@ class ForensicExtractor:
 
         for dx_file in self.dx_json_files:
             try:
-                with open(dx_file, 'r') as f:
-                    data = json.load(f)
+                data = self._load_file(dx_file, _load_json_file)
 
                 instances = data.get('instances', [])
                 loaded_count = 0
@@ -276,6 +1217,46 @@ class ForensicExtractor:
         print(f"\n  Total DX instances loaded: {len(self.dx_instances)}")
         print(f"  Instances with symbol_cache_key: {with_key}")
 
+    def load_xcon_net_names(self) -> None:
+        """
+        Phase 1a: Collect net names from the XCON files ahead of the page walk.
+
+        Net-label text on the pages is then classified with a set lookup
+        against the real net names (and bus base names) instead of the
+        NET_NAME_PATTERN heuristic, which also matches property and part
+        names. Must run before the first page file is scanned.
+        """
+        print("\n" + "="*60)
+        print("PHASE 1a: XCON NET NAMES")
+        print("="*60)
+
+        if self._page_scans:
+            print("  [WARN] Page files already scanned; net names not applied")
+            return
+
+        net_names: Set[str] = set()
+        for xcon_file in self._read_ahead(self.xcon_files, 'raw'):
+            try:
+                root = self._load_file(xcon_file, self._load_xcon, keep=True)
+            except ET.ParseError as e:
+                print(f"  [WARN] Failed to parse XCON: {xcon_file.name} - {e}")
+                self._degrade(xcon_file, 'net_names', f'ParseError: {e}')
+                continue
+            for net in root.iter():
+                if net.tag.rsplit('}', 1)[-1] != 'net':
+                    continue
+                for child in net:
+                    if child.tag.rsplit('}', 1)[-1] == 'name' and child.text:
+                        net_names.add(child.text)
+                        # Bus base name: DSP_XID<3..0> -> DSP_XID
+                        net_names.add(child.text.partition('<')[0])
+
+        self._net_names = net_names
+        self._page_walker = build_page_walker(net_names)
+        # Page walks with net names are cached apart from the default ones
+        self._scan_variant = content_key('\n'.join(sorted(net_names)).encode('utf-8'))
+        print(f"  Net names (incl. bus base names): {len(net_names)}")
+
     def build_instance_to_graphics_mapping(self) -> None:
         """Build mapping from instance_id to graphics_id using block.ascii files."""
         print("\n" + "="*60)
@@ -292,14 +1273,8 @@ class ForensicExtractor:
                 continue
 
             try:
-                content = block_ascii.read_text(errors='ignore')
-
-                # Format in block.ascii: < 5 /> I167231504 1 864692227966763070
-                # This is: < 5 /> instance_id page_num graphics_id (with spaces around angle brackets)
-                # Page numbers can be 1-8 so use \d+ for the page number field
-                for match in re.finditer(r'< 5 /> (I\d+) \d+ (\d+)', content):
-                    inst_id = match.group(1)
-                    graphics_id = match.group(2)
+                for inst_id, graphics_id in self._cached_parse('block', block_ascii,
+                                                               self._parse_block_graphics):
                     self.instance_to_graphics[inst_id] = graphics_id
 
             except Exception as e:
@@ -307,6 +1282,316 @@ class ForensicExtractor:
 
         print(f"  Total instance->graphics mappings: {len(self.instance_to_graphics)}")
 
+    def _parse_block_graphics(self, block_ascii: Path) -> List[Tuple[str, str]]:
+        """(instance_id, graphics_id) pairs of a block .ascii file."""
+        content = self.page_store.text(block_ascii)
+
+        # Format in block.ascii: < 5 /> I167231504 1 864692227966763070
+        # This is: < 5 /> instance_id page_num graphics_id (with spaces around angle brackets)
+        # Page numbers can be 1-8 so use \d+ for the page number field
+        return [(match.group(1), match.group(2))
+                for match in re.finditer(r'< 5 /> (I\d+) \d+ (\d+)', content)]
+
+    def _cached_parse(self, kind: str, path: Path, parse: Callable[[Path], Any],
+                      encode: Callable[[Any], Optional[bytes]] = None,
+                      decode: Callable[[bytes], Any] = pickle.loads, variant: str = '') -> Any:
+        """
+        ``parse(path)``, or its records from the parse cache when a file with
+        the same content was parsed before by the same parser version.
+        Records are pickled unless ``encode``/``decode`` are given (encode
+        may return None for records that are not to be cached).
+        """
+        if self.parse_cache is None:
+            return parse(path)
+        key = self._parse_cache_key(kind, path, variant)
+        data = self.parse_cache.get(kind, key)
+        if data is not None:
+            try:
+                return decode(data)
+            except Exception:
+                # Unreadable entry: parse again and overwrite it
+                pass
+        records = parse(path)
+        data = encode(records) if encode is not None else pickle.dumps(records, pickle.HIGHEST_PROTOCOL)
+        if data is not None:
+            self.parse_cache.put(kind, key, data)
+        return records
+
+    def _parse_cache_key(self, kind: str, path: Path, variant: str = '') -> str:
+        """Parse cache key of a file; page maps are hashed in place with --mmap."""
+        if kind == 'page' and self.mmap_pages:
+            data = self.page_store.map(path)
+        else:
+            data = self.page_store.raw(path)
+        return self.parse_cache.key(kind, content_key(data), variant)
+
+    def _page_files(self) -> List[Path]:
+        """Every page_file_*.ascii, in the order the page phases visit them."""
+        page_files = []
+        for block_dir in self.worklib_dir.iterdir():
+            if not block_dir.is_dir() or block_dir.name in self.IGNORE_DIRS:
+                continue
+            tbl_dir = block_dir / 'tbl_1'
+            if tbl_dir.exists():
+                page_files.extend(tbl_dir.glob('page_file_*.ascii'))
+        return page_files
+
+    # Page primitives spliced per block in incremental runs, by the phase
+    # that produces them; primitives built from dx.json instances (refdes
+    # placements and labels) are always rebuilt
+    INCREMENTAL_GROUPS = ('wires', 'placements', 'text')
+
+    @staticmethod
+    def _primitive_group(primitive: Dict) -> Optional[str]:
+        """Page phase that produced ``primitive`` (INCREMENTAL_GROUPS), or None."""
+        if primitive['type'] == 'line':
+            return 'wires'
+        if primitive['type'] == 'instance':
+            return None if 'refdes' in primitive else 'placements'
+        if primitive['shape_type'] in ('refdes_label', 'value_label'):
+            return None
+        return 'text'
+
+    def _block_fingerprint(self, block_dir: Path) -> str:
+        """
+        Hash of a block's files: names, sizes and mtimes, plus the contents of
+        its master.tag and (for the top design's variant) schchecksum.dat.
+        """
+        digest = hashlib.sha1()
+        for path in sorted(block_dir.rglob('*')):
+            if not path.is_file():
+                continue
+            st = path.stat()
+            digest.update(f'{path.relative_to(block_dir).as_posix()}\0{st.st_size}\0'
+                          f'{st.st_mtime_ns}\n'.encode('utf-8'))
+            if path.name in ('master.tag', 'schchecksum.dat'):
+                digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    def plan_incremental(self, output_path: str) -> None:
+        """
+        Phase 1i: Find the blocks changed since the previous output.
+
+        The previous run left full_design.json and its state file (see
+        incremental_state_path()) with a fingerprint per block. Blocks whose
+        fingerprint still matches are not walked again: the page phases take
+        their wires, page placements, page text and graphics positions from
+        the previous output. Everything else (dx.json/json/xcon netlist,
+        styles, symbols, refdes placements and labels) is cheap and merged
+        across blocks, so it is rebuilt in full.
+
+        Every block is re-extracted when the previous output and state do not
+        belong together, the parser version or net-label set changed, pages
+        were added or removed (draw-order ranks shift) or the styles changed
+        (wires of any block may fall back to a shared style name).
+        """
+        print("\n" + "="*60)
+        print("PHASE 1i: INCREMENTAL PLAN")
+        print("="*60)
+
+        block_dirs = [d for d in self.worklib_dir.iterdir()
+                      if d.is_dir() and d.name not in self.IGNORE_DIRS]
+        self._block_fingerprints = {d.name: self._block_fingerprint(d) for d in block_dirs}
+        page_files = sorted(p.relative_to(self.root_dir).as_posix() for p in self._page_files())
+
+        state_path = incremental_state_path(output_path)
+        try:
+            with open(state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            with open(output_path, encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  No previous state ({type(e).__name__}); extracting every block")
+            return
+
+        reason = None
+        if state.get('extraction_date') != previous.get('extraction_date'):
+            reason = f"{output_path} was written by another run"
+        elif state.get('parser_version') != version_of(PARSER_SOURCES):
+            reason = "the extractor changed"
+        elif state.get('scan_variant') != self._scan_variant:
+            reason = "the net-label set changed"
+        elif state.get('page_files') != page_files:
+            reason = "page files were added or removed"
+        elif (_as_json(self.styles) != previous.get('styles')
+              or _as_json(getattr(self, 'style_tables', {})) != previous.get('style_tables')):
+            reason = "styles changed"
+        if reason is not None:
+            print(f"  Extracting every block: {reason}")
+            return
+
+        previous_blocks = state.get('blocks', {})
+        self.unchanged_blocks = {
+            name for name, fingerprint in self._block_fingerprints.items()
+            if previous_blocks.get(name, {}).get('fingerprint') == fingerprint}
+        for name in self.unchanged_blocks:
+            self._previous_graphics[name] = previous_blocks[name].get('graphics', [])
+        for primitive in previous.get('primitives', []):
+            group = self._primitive_group(primitive)
+            if group is not None and primitive['block'] in self.unchanged_blocks:
+                self._previous_primitives.setdefault((group, primitive['block']), []).append(primitive)
+
+        # Pages of unchanged blocks are not walked again; keep their records
+        for entry in previous.get('statistics', {}).get('degraded_files') or []:
+            parts = entry['file'].split('/')
+            if (len(parts) == 4 and parts[0] == 'worklib' and parts[1] in self.unchanged_blocks
+                    and parts[3].startswith('page_file_')):
+                self.degraded_files[entry['file']] = entry
+
+        changed = sorted(set(self._block_fingerprints) - self.unchanged_blocks)
+        print(f"  Unchanged blocks: {len(self.unchanged_blocks)} of {len(self._block_fingerprints)}")
+        print(f"  Re-extracting: {', '.join(changed) if changed else '(none)'}")
+
+    def _kept_primitives(self, group: str, block_name: str) -> List[Dict]:
+        """An unchanged block's ``group`` primitives from the previous output, counted in stats."""
+        kept = self._previous_primitives.get((group, block_name), [])
+        for primitive in kept:
+            self.stats['primitives_by_type'][primitive['type']] += 1
+            if group == 'wires':
+                self.stats['primitives_by_shape_type'][primitive['shape_type']] += 1
+        return kept
+
+    def _write_incremental_state(self, output_path: str, extraction_date: str) -> None:
+        """Fingerprints and graphics positions of every block, for the next incremental run."""
+        state = {
+            'extraction_date': extraction_date,
+            'parser_version': version_of(PARSER_SOURCES),
+            'scan_variant': self._scan_variant,
+            'page_files': sorted(p.relative_to(self.root_dir).as_posix()
+                                 for p in self._page_files()),
+            'blocks': {
+                name: {'fingerprint': fingerprint, 'graphics': self._block_graphics.get(name, [])}
+                for name, fingerprint in self._block_fingerprints.items()
+            },
+        }
+        state_path = incremental_state_path(output_path)
+        tmp_path = state_path.with_name(state_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def scan_pages(self, jobs: int, walk_pages: Optional[PageWalkRunner] = None) -> None:
+        """
+        Phase 1p: Walk every page file up front in ``jobs`` worker processes.
+
+        The results fill the same per-file cache _scan_page() serves the page
+        phases from; the phases still visit pages and build primitives in
+        their own order in this process, so the output is identical to a
+        single-process run. A page whose walk fails in a worker is left to
+        the phase, which walks it again and reports the error as before; a
+        page whose worker timed out or died (DegradedFile) is recorded as
+        degraded and treated as empty.
+
+        ``walk_pages(page_files, net_names, mmap_pages)`` replaces the local
+        process pool (distributed_extract.py hands the pages to a job queue);
+        it returns one scan, None or DegradedFile per page file.
+
+        With one job and no file budget the pages are walked here, while the
+        page store reads the next ones ahead (read_ahead), so reads overlap
+        with the walk.
+        """
+        print("\n" + "="*60)
+        if walk_pages is None and (jobs > 1 or self.isolate_files):
+            budget = f", {self.file_timeout:g}s per page" if self.file_timeout else ""
+            print(f"PHASE 1p: PARALLEL PAGE SCAN ({jobs} jobs{budget})")
+            walk_pages = functools.partial(
+                walk_pages_in_pool, jobs=jobs, timeout=self.file_timeout,
+                max_memory=self.file_memory, retries=self.file_retries)
+        elif walk_pages is None:
+            print(f"PHASE 1p: PAGE SCAN (reading {self.read_ahead} ahead)")
+        else:
+            print("PHASE 1p: PAGE SCAN")
+        print("="*60)
+
+        page_files = [f for f in self._page_files() if f not in self._page_scans
+                      and f.parent.parent.name not in self.unchanged_blocks]
+        scanned = 0
+        if walk_pages is None:
+            kind = 'mmap' if self.mmap_pages else 'raw' if self.parse_cache is not None else 'text'
+            for page_file in self._read_ahead(page_files, kind):
+                try:
+                    self._scan_page(page_file)
+                    scanned += 1
+                except Exception:
+                    # Left to the page phases, which walk it again and report
+                    pass
+            print(f"  Pages scanned: {scanned} of {len(page_files)}")
+            return
+
+        # Pages in the parse cache are loaded here; only the rest go out
+        total = len(page_files)
+        cache_keys: Dict[Path, str] = {}
+        if self.parse_cache is not None:
+            to_walk = []
+            for page_file in page_files:
+                try:
+                    key = cache_keys[page_file] = self._parse_cache_key(
+                        'page', page_file, self._scan_variant)
+                    data = self.parse_cache.get('page', key)
+                    if data is not None:
+                        self._page_scans[page_file] = scan_from_bytes(data)
+                        scanned += 1
+                        continue
+                except Exception:
+                    pass
+                to_walk.append(page_file)
+            if scanned:
+                print(f"  Pages from parse cache: {scanned}")
+            page_files = to_walk
+
+        for page_file, scan in zip(page_files, walk_pages(page_files, self._net_names, self.mmap_pages)):
+            if isinstance(scan, DegradedFile):
+                self._degrade(page_file, 'scan_pages', scan.reason, scan.attempts)
+                self._page_scans[page_file] = empty_page_scan()
+            elif scan is not None:
+                self._page_scans[page_file] = scan
+                scanned += 1
+                if page_file in cache_keys:
+                    data = scan_to_bytes(scan)
+                    if data is not None:
+                        self.parse_cache.put('page', cache_keys[page_file], data)
+
+        print(f"  Pages scanned: {scanned} of {total}")
+
+    def _scan_page(self, page_file: Path) -> Dict[str, Any]:
+        """
+        Walk a page file once with every registered consumer.
+
+        Results are cached per file so each phase reuses the same walk instead
+        of re-reading and re-scanning the page (and in the parse cache, if
+        there is one, for later runs).
+        """
+        with self._scan_lock:
+            scan = self._page_scans.get(page_file)
+            if scan is None:
+                try:
+                    scan = self._cached_parse('page', page_file, self._walk_page, scan_to_bytes,
+                                              scan_from_bytes, self._scan_variant)
+                except Exception as e:
+                    self._degrade(page_file, 'scan_pages', f'{type(e).__name__}: {e}')
+                    raise
+                self._page_scans[page_file] = scan
+        return scan
+
+    def _walk_page(self, page_file: Path) -> Dict[str, Any]:
+        if self.mmap_pages:
+            content = self.page_store.map(page_file)
+        else:
+            content = self.page_store.text(page_file)
+        return self._page_walker.walk(content)
+
+    def _degrade(self, path: Path, phase: str, reason: str, attempts: int = 1) -> None:
+        """Record a file that could not be (fully) parsed; the first reason wins."""
+        try:
+            name = path.relative_to(self.root_dir).as_posix()
+        except ValueError:
+            name = str(path)
+        if name not in self.degraded_files:
+            print(f"  [WARN] Degraded: {name} ({reason})")
+            self.degraded_files[name] = {
+                'file': name, 'phase': phase, 'reason': reason, 'attempts': attempts,
+            }
+
     def extract_graphics_positions_from_pages(self) -> None:
         """Extract graphics positions from page files."""
         print("\n" + "="*60)
@@ -322,34 +1607,37 @@ class ForensicExtractor:
                 continue
 
             block_name = block_dir.name
+            if block_name in self.unchanged_blocks:
+                for gid, x, y, offset, page_file_name in self._previous_graphics.get(block_name, []):
+                    self._add_graphics_position(gid, x, y, offset, block_name, page_file_name)
+                continue
 
             for page_file in tbl_dir.glob('page_file_*.ascii'):
                 try:
-                    content = page_file.read_text(errors='ignore')
                     # Pattern: < GRAPHICS_ID /> < 45 /> < < 0 /> < X /> < 0 /> < Y /> />
                     # Example: < 864692227966763070 /> < 45 /> < < 0 /> < 1079500 /> < 0 /> < 647700 /> />
-                    # The 18-digit graphics_id is followed by coordinates in < 45 /> block
-                    pattern = r'< (\d{18}) />\s*<\s*45\s*/>\s*<\s*<\s*0\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*0\s*/>\s*<\s*(-?\d+)\s*/>'
-                    for match in re.finditer(pattern, content):
-                        gid = match.group(1)
-                        x = int(match.group(2))
-                        y = int(match.group(3))
-
-                        # Get page index
-                        page_idx = self._get_pdf_page_index(block_name, page_file.name)
-
-                        self.graphics_positions[gid] = {
-                            'x': x,
-                            'y': y,
-                            'page_file': page_file.name,
-                            'block': block_name,
-                            'page_index': page_idx
-                        }
+                    # Collected by GraphicsPositionConsumer during the shared page walk
+                    scan = self._scan_page(page_file)
+                    for gid, x, y, offset in scan['graphics']:
+                        self._add_graphics_position(gid, x, y, offset, block_name, page_file.name)
                 except Exception as e:
                     print(f"  Error processing {page_file}: {e}")
 
         print(f"  Total graphics positions: {len(self.graphics_positions)}")
 
+    def _add_graphics_position(self, gid: str, x: int, y: int, offset: int,
+                               block_name: str, page_file_name: str) -> None:
+        self._graphics_offsets[gid] = offset
+        self.graphics_positions[gid] = {
+            'x': x,
+            'y': y,
+            'page_file': page_file_name,
+            'block': block_name,
+            'page_index': self._get_pdf_page_index(block_name, page_file_name)
+        }
+        if self.incremental:
+            self._block_graphics[block_name].append([gid, x, y, offset, page_file_name])
+
     def link_instance_positions(self) -> None:
         """Link instance_id -> graphics_id -> position."""
         print("\n" + "="*60)
@@ -368,15 +1656,51 @@ class ForensicExtractor:
 
         print(f"  Linked {linked} instance positions")
 
-    def _generate_element_id(self, prefix: str = 'elem') -> str:
-        """Generate unique element ID for primitives."""
-        self._element_counter += 1
-        return f"{prefix}_{self._element_counter}"
+    def _element_id(self, prefix: str, block_name: str, page_file_name: str, key) -> str:
+        """
+        Stable element ID for a primitive: its kind, block, page number and
+        the page offset of the record it came from (the refdes for primitives
+        built from dx.json instances).
 
-    def _generate_sequence_id(self) -> int:
-        """Generate unique sequence ID."""
-        self._sequence_counter += 1
-        return self._sequence_counter
+        IDs do not depend on how many primitives other pages or phases
+        produced, so they stay the same across runs and --jobs settings.
+        """
+        page_match = re.search(r'page_file_(\d+)', page_file_name)
+        element_id = f"{prefix}_{block_name}_p{page_match.group(1) if page_match else 0}_{key}"
+        if element_id in self._element_ids:
+            # Same source record used twice
+            n = 2
+            while f"{element_id}_{n}" in self._element_ids:
+                n += 1
+            element_id = f"{element_id}_{n}"
+        self._element_ids.add(element_id)
+        return element_id
+
+    def _sequence_index(self, block_name: str, page_file_name: str, layer: str, order: int) -> int:
+        """
+        Draw-order index for a primitive.
+
+        Every page owns a range of SEQUENCE_PAGE_SPAN indices (pages ranked by
+        block and page number), split into one sub-range per SEQUENCE_LAYERS
+        entry; within a layer ``order`` (the source record's page offset)
+        keeps the page file's own order. Primitives sharing a source record
+        take the next free index after it.
+        """
+        if self._page_ranks is None:
+            def page_key(path: Path):
+                page_match = re.search(r'page_file_(\d+)', path.name)
+                return (path.parent.parent.name, int(page_match.group(1)) if page_match else 0)
+            ranked = sorted(self._page_files(), key=page_key)
+            self._page_ranks = {(p.parent.parent.name, p.name): i for i, p in enumerate(ranked)}
+
+        rank = self._page_ranks.get((block_name, page_file_name), len(self._page_ranks))
+        index = (rank * self.SEQUENCE_PAGE_SPAN
+                 + self.SEQUENCE_LAYERS.index(layer) * self.SEQUENCE_LAYER_SPAN
+                 + order)
+        while index in self._sequence_indices:
+            index += 1
+        self._sequence_indices.add(index)
+        return index
 
     def _extract_instance_id(self, cpath: str) -> str:
         """Extract instance ID from component path."""
@@ -428,13 +1752,15 @@ class ForensicExtractor:
 
         return ''
 
-    def _next_sequence_index(self) -> int:
-        """Get next sequence index for primitives."""
-        self._sequence_counter += 1
-        return self._sequence_counter
-
     def _parse_transform_matrix(self, transform_str: str) -> Dict:
-        """Parse transform matrix string into components."""
+        """Parse transform matrix string into components (memoized per string)."""
+        cached = self._transform_cache.get(transform_str)
+        if cached is None:
+            cached = self._transform_cache[transform_str] = self._compute_transform_matrix(transform_str)
+        # Each primitive gets its own dict
+        return dict(cached)
+
+    def _compute_transform_matrix(self, transform_str: str) -> Dict:
         # Transform format: "a b c d tx ty" (6 values)
         # Represents: | a  b  0 |
         #             | c  d  0 |
@@ -481,8 +1807,8 @@ class ForensicExtractor:
         """
         Phase G1: Extract page information and build page mapping.
 
-        CRITICAL: This MUST run BEFORE extract_graphics_positions_from_pages()
-        because it builds the page_mapping dictionary that _get_pdf_page_index() needs!
+        CRITICAL: Every phase that calls _get_pdf_page_index() needs the
+        page_mapping built here; they declare it as a requirement in phases().
 
         Builds a mapping: (block_name, page_uid) -> pdf_page_number
         This allows primitives extracted from block page files to be correctly
@@ -651,9 +1977,9 @@ class ForensicExtractor:
         page_file = self.worklib_dir / 'brain_board' / 'tbl_1' / 'page_file_1.ascii'
         if page_file.exists():
             try:
-                # Read just the beginning for config data
-                with open(page_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read(50000)  # Read first 50KB
+                # Only the beginning holds config data; the page itself is
+                # shared with the page phases through the store
+                content = self.page_store.text(page_file)[:50000]  # First 50KB
 
                 # Look for grid properties
                 grid_x = re.search(r'<n gridX n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*(\d+)\s*v/>', content)
@@ -685,12 +2011,25 @@ class ForensicExtractor:
         print("="*60)
 
         style_count = 0
+        cache_dir = self.cache_dir
+        library = self.symbol_library if self.symbol_library is not None and self.symbol_library.load() else None
 
         def load_style_file(style_file):
             nonlocal style_count
             try:
-                content = style_file.read_text(encoding='utf-8', errors='ignore')
-                parsed_styles = self._parse_style_file(content)
+                in_cache = self.symbol_library is not None and style_file.parent == cache_dir
+                parsed_styles = library.styles.get(style_file.name) if library is not None and in_cache else None
+                if parsed_styles is None:
+                    content = self._load_file(style_file, self.page_store.text)
+                    # Shared by content, like symbols (see extract_symbol_graphics)
+                    key = ('style', content_key(content.encode('utf-8')))
+                    parsed_styles = self.parsed_files.get(key)
+                    if parsed_styles is None:
+                        parsed_styles = self.parsed_files[key] = self._parse_style_file(content)
+                    if in_cache:
+                        self._library_dirty = True
+                if in_cache:
+                    self._library_styles[style_file.name] = parsed_styles
 
                 for style_name, style_data in parsed_styles.items():
                     # Use file-qualified style name for uniqueness
@@ -703,20 +2042,13 @@ class ForensicExtractor:
                 style_count += 1
             except Exception as e:
                 print(f"  [WARN] Failed to parse {style_file}: {e}")
+                self._degrade(style_file, 'styles', f'{type(e).__name__}: {e}')
 
-        # Existing cache styles
-        cache_dir = self.root_dir / 'cache'
-        if cache_dir.exists():
-            for style_file in cache_dir.glob('*.style'):
-                load_style_file(style_file)
-        else:
+        # Existing cache styles, then per-block style files in worklib
+        if not self.cache_dir.exists():
             print(f"  [WARN] Cache directory not found")
-
-        # NEW: also scan worklib for per-block style files (both tbl_1 and sym_*)
-        worklib_dir = self.root_dir / 'worklib'
-        if worklib_dir.exists():
-            for style_file in worklib_dir.rglob('*.style'):
-                load_style_file(style_file)
+        for style_file in self._style_files():
+            load_style_file(style_file)
 
         # Parse style lookup tables from each block's main ASCII to map numeric id -> style name
         # IMPORTANT: There are multiple style tables; the second number (X) in the wire header
@@ -724,7 +2056,7 @@ class ForensicExtractor:
         # Example entry: "< 12 /> 1 4 Style5" ==> table 1, id 4 -> Style5
         self.style_tables = {}
         table_pattern = re.compile(r'<\s*12\s*/>\s*(\d+)\s+(\d+)\s+(Style\S+)')
-        for block_dir in worklib_dir.iterdir():
+        for block_dir in self.worklib_dir.iterdir():
             if not block_dir.is_dir() or block_dir.name in self.IGNORE_DIRS:
                 continue
             tbl_dir = block_dir / 'tbl_1'
@@ -732,7 +2064,7 @@ class ForensicExtractor:
             if not ascii_file.exists():
                 continue
             try:
-                text = ascii_file.read_text(errors='ignore')
+                text = self.page_store.text(ascii_file)
                 tables: Dict[int, Dict[int, str]] = {}
                 for m in table_pattern.finditer(text):
                     table_num = int(m.group(1))
@@ -748,7 +2080,8 @@ class ForensicExtractor:
         print(f"  - Total styles loaded: {len(self.styles)}")
         print(f"  - Style tables parsed: {len(getattr(self, 'style_tables', {}))}")
 
-    def _parse_style_file(self, content: str) -> Dict[str, Dict]:
+    @staticmethod
+    def _parse_style_file(content: str) -> Dict[str, Dict]:
         """
         Parse a .style file and extract all style definitions.
 
@@ -864,6 +2197,12 @@ class ForensicExtractor:
             if not tbl_dir.exists():
                 continue
 
+            if block_dir.name in self.unchanged_blocks:
+                wires = self._kept_primitives('wires', block_dir.name)
+                wire_count += len(wires)
+                self.primitives.extend(wires)
+                continue
+
             for page_file in tbl_dir.glob('page_file_*.ascii'):
                 try:
                     wires = self._extract_wires_from_page_file(page_file, block_dir.name)
@@ -881,7 +2220,7 @@ class ForensicExtractor:
         wires = []
 
         try:
-            content = page_file.read_text(encoding='utf-8', errors='ignore')
+            scan = self._scan_page(page_file)
         except Exception as e:
             return wires
 
@@ -891,67 +2230,16 @@ class ForensicExtractor:
             page_idx_match = re.search(r'page_file_(\d+)\.ascii', page_file.name)
             page_index = int(page_idx_match.group(1)) if page_idx_match else 0
 
-        # Efficient pattern: find LP + CGTYPE pairs first (original working pattern)
-        # Then extract style_id from the block context afterward
-        wire_pattern = re.compile(
-            r'<n\s*LP\s*n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*([^v]+)\s*v/>'  # LP coordinates
-            r'[^<]*(?:<(?!n\s*CGTYPE)[^>]*>[^<]*)*'  # non-greedy skip to CGTYPE (efficient)
-            r'<n\s*CGTYPE\s*n/>\s*<[^>]+>\s*<v\s*(\d+)\s*v/>',  # CGTYPE value
-            re.DOTALL
-        )
-
-        # Also need to capture associated properties like rotation, transform, zValue
-        for match in wire_pattern.finditer(content):
-            lp_coords = match.group(1).strip()
-            cgtype = int(match.group(2))
-
-            # Extract style_id and table number from the block context
-            # Pattern: < TAG /> < < TABLE_NUM /> < 37 /> < Y />
-            block_start = max(0, match.start() - 300)
-            context_before = content[block_start:match.start()]
-            tag_match = re.search(
-                r'<\s*(\d+)\s*/>\s*<\s*<\s*(\d+)\s*/>\s*<\s*37\s*/>\s*<\s*\d+\s*/>',
-                context_before
-            )
-            style_id = int(tag_match.group(1)) if tag_match else 0
-            table_num = int(tag_match.group(2)) if tag_match else 1  # default to table 1
-
-            # Parse LP coordinates: "X1,Y1;X2,Y2"
-            try:
-                points_str = lp_coords.split(';')
-                points = []
-                for pt_str in points_str:
-                    coords = pt_str.split(',')
-                    if len(coords) >= 2:
-                        x = float(coords[0])
-                        y = float(coords[1])
-                        points.append({'x': int(x), 'y': int(y)})
-
-                if len(points) < 2:
-                    continue
-            except (ValueError, IndexError):
-                continue
-
-            # Look for rotation near this match
-            rotation_match = re.search(
-                r'<n rotation n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*(-?\d+)\s*v/>',
-                content[max(0, match.start()-500):match.end()+500]
-            )
-            rotation = int(rotation_match.group(1)) if rotation_match else 0
-
-            # Look for transform near this match
-            transform_match = re.search(
-                r'<n transform n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*([^v]+)\s*v/>',
-                content[max(0, match.start()-500):match.end()+500]
-            )
-            transform_str = transform_match.group(1).strip() if transform_match else '1,0,0,0,1,0,0,0,1'
-
-            # Look for zValue near this match
-            zvalue_match = re.search(
-                r'<n zValue n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*(\d+)\s*v/>',
-                content[max(0, match.start()-500):match.end()+500]
-            )
-            z_value = int(zvalue_match.group(1)) if zvalue_match else 10000
+        # LP + CGTYPE pairs, with rotation/transform/zValue and the style tag,
+        # were collected by WireConsumer during the shared page walk
+        for record in scan['wires']:
+            cgtype = record['cgtype']
+            style_id = record['style_id']
+            table_num = record['table_num']
+            points = record['points']
+            rotation = record['rotation']
+            transform_str = record['transform_str']
+            z_value = record['z_value']
 
             # Resolve style name and definition
             style_name = None
@@ -980,8 +2268,8 @@ class ForensicExtractor:
                 })
 
             # Create wire primitive
-            element_id = self._generate_element_id('wire')
-            sequence_idx = self._next_sequence_index()
+            element_id = self._element_id('wire', block_name, page_file.name, record['offset'])
+            sequence_idx = self._sequence_index(block_name, page_file.name, 'wire', record['offset'])
             shape_type = self.CGTYPE_MAP.get(cgtype, 'unknown')
 
             wire = {
@@ -1008,7 +2296,7 @@ class ForensicExtractor:
 
         return wires
 
-    def extract_symbol_graphics(self) -> None:
+    def extract_symbol_graphics(self, jobs: int = 1) -> None:
         """
         Phase G3: Extract symbol graphics from cache files.
 
@@ -1021,19 +2309,179 @@ class ForensicExtractor:
         This satisfies Critical Requirements:
         - #6: Hierarchical Symbol Dependencies
         - #7: Implicit/Hidden Pins
+
+        With ``jobs`` > 1 (or a file budget) the symbols are parsed in that
+        many isolated worker processes; results are merged in cache file
+        order, so symbol_graphics is the same as a single-process run.
+        Symbols that fail to parse are recorded as degraded.
         """
         print("\n" + "="*60)
         print("PHASE G3: SYMBOL GRAPHICS EXTRACTION")
         print("="*60)
 
-        cache_dir = self.root_dir / 'cache'
-        if not cache_dir.exists():
+        if not self.cache_dir.exists():
             print(f"  [WARN] Cache directory not found")
             return
+        if self.cache_dir.is_file():
+            print(f"  Reading cache symbols from {self.cache_dir.name}")
+
+        # Parsed symbols are shared by content (parsed_files): a symbol file
+        # seen before, in this project or in another one of a batch, is not
+        # parsed again. Files with the same content are parsed once.
+        symbols = self._symbol_files()
+        results: Dict[int, Tuple[Optional[Dict], Optional[str]]] = {}
+        pending: Dict[Tuple[str, str], List[int]] = {}
+        unread = list(range(len(symbols)))
+
+        # The symbol library first: while it matches the cache, its symbols
+        # need neither reading nor hashing
+        library = self.symbol_library
+        if library is not None and library.load():
+            unread = []
+            for i, (ascii_file, _) in enumerate(symbols):
+                if ascii_file.name in library.symbols:
+                    results[i] = (library.symbols[ascii_file.name], None)
+                else:
+                    unread.append(i)
+            print(f"  Symbols from symbol library: {len(symbols) - len(unread)}")
+
+        files = self._read_ahead([symbols[i][0] for i in unread], 'raw')
+        for i, _ in zip(unread, files):
+            ascii_file, symbol_key = symbols[i]
+            try:
+                key = ('symbol', content_key(self.page_store.raw(ascii_file)))
+            except OSError as e:
+                results[i] = (None, str(e))
+                self._degrade(ascii_file, 'symbols', f'{type(e).__name__}: {e}')
+                continue
+            if key in self.parsed_files:
+                results[i] = (self.parsed_files[key], None)
+            else:
+                pending.setdefault(key, []).append(i)
+
+        to_parse = [(key, symbols[indices[0]]) for key, indices in pending.items()]
+        if len(to_parse) < len(unread):
+            print(f"  Symbols already parsed (same content): {len(unread) - len(to_parse)}")
+
+        # Then the parse cache, for symbols an earlier run parsed
+        cache_keys: Dict[Tuple[str, str], str] = {}
+        if self.parse_cache is not None and to_parse:
+            misses = []
+            for key, (ascii_file, symbol_key) in to_parse:
+                cache_key = cache_keys[key] = self.parse_cache.key('symbol', key[1], symbol_key)
+                data = self.parse_cache.get('symbol', cache_key)
+                try:
+                    symbol_data = pickle.loads(data) if data is not None else None
+                except Exception:
+                    symbol_data = None
+                if symbol_data is None:
+                    misses.append((key, (ascii_file, symbol_key)))
+                    continue
+                self.parsed_files[key] = symbol_data
+                for i in pending[key]:
+                    results[i] = (symbol_data, None)
+            if len(misses) < len(to_parse):
+                print(f"  Symbols from parse cache: {len(to_parse) - len(misses)}")
+            to_parse = misses
+        attempts: Dict[Tuple[str, str], int] = {}
+        if (jobs > 1 and len(to_parse) > 1) or (self.isolate_files and to_parse):
+            print(f"  Parsing {len(to_parse)} symbols in {jobs} worker processes")
+            with IsolatedPool(jobs, timeout=self.file_timeout, max_memory=self.file_memory,
+                              retries=self.file_retries) as pool:
+                outcomes = pool.map(_parse_symbol_worker, [symbol for _, symbol in to_parse])
+            parsed = []
+            for (key, _), outcome in zip(to_parse, outcomes):
+                parsed.append(outcome.value if outcome.ok else (None, outcome.error))
+                attempts[key] = outcome.attempts
+        else:
+            parsed = []
+            for _, (ascii_file, symbol_key) in to_parse:
+                try:
+                    content = self.page_store.text(ascii_file)
+                    parsed.append((self._parse_symbol_graphics(content, symbol_key), None))
+                except Exception as e:
+                    parsed.append((None, str(e)))
+
+        for (key, (ascii_file, _)), (symbol_data, error) in zip(to_parse, parsed):
+            if error is None:
+                self.parsed_files[key] = symbol_data
+                if key in cache_keys:
+                    self.parse_cache.put('symbol', cache_keys[key],
+                                         pickle.dumps(symbol_data, pickle.HIGHEST_PROTOCOL))
+            else:
+                self._degrade(ascii_file, 'symbols', error, attempts.get(key, 1))
+            for i in pending[key]:
+                results[i] = (symbol_data, error)
+
+        if library is not None:
+            if unread:
+                self._library_dirty = True
+            self._library_symbols = {symbols[i][0].name: results[i][0]
+                                     for i in range(len(symbols)) if results[i][1] is None}
 
         symbol_count = 0
+        for i, (ascii_file, symbol_key) in enumerate(symbols):
+            symbol_data, error = results[i]
+            if error is not None:
+                print(f"  [WARN] Failed to parse {ascii_file.name}: {error}")
+            elif symbol_data:
+                if symbol_data['symbol_key'] != symbol_key:
+                    # Same content under another library##name
+                    symbol_data = dict(symbol_data, symbol_key=symbol_key)
+                self.symbol_graphics[symbol_key] = symbol_data
+                symbol_count += 1
 
-        for ascii_file in cache_dir.glob('*.ascii'):
+        self.stats['symbol_graphics_loaded'] = symbol_count
+        print(f"  - Symbols extracted: {symbol_count}")
+
+    def save_symbol_library(self) -> None:
+        """
+        Phase G3b: Write the symbol library if any cache symbol or style file
+        had to be parsed (the library was missing, stale or incomplete).
+        """
+        print("\n" + "="*60)
+        print("PHASE G3b: SYMBOL LIBRARY")
+        print("="*60)
+
+        library = self.symbol_library
+        if not self._library_dirty:
+            print(f"  Symbol library up to date: {library.path}")
+            return
+        try:
+            saved = library.save(self._library_symbols, self._library_styles)
+        except OSError as e:
+            print(f"  [WARN] Could not write symbol library {library.path}: {e}")
+            return
+        if saved:
+            print(f"  Symbol library rebuilt: {library.path} ({len(self._library_symbols)} symbols, "
+                  f"{len(self._library_styles)} style files)")
+        else:
+            print(f"  [WARN] Cache changed during the run; symbol library not written")
+
+    def _cache_files(self, suffix: str) -> List[Path]:
+        """
+        The cache's files ending in ``suffix``: cache/*<suffix>, or the
+        matching cache.pac entries as cache.pac/<name> (see cache_source()).
+
+        Both are listed in name order: several views of a cell share one
+        library##name symbol key and the last one listed wins, so directory
+        order would make the output depend on the file system.
+        """
+        if not self.cache_dir.exists():
+            return []
+        if self.cache_dir.is_dir():
+            return sorted(self.cache_dir.glob(f'*{suffix}'))
+        try:
+            pac = open_cache_pac(self.cache_dir)
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"  [WARN] Cannot read {self.cache_dir.name}: {e}")
+            return []
+        return [self.cache_dir / name for name in sorted(pac.names(suffix))]
+
+    def _symbol_files(self) -> List[Tuple[Path, str]]:
+        """Every cache symbol file (library##name##sym_1.ascii) with its library##name key."""
+        symbols = []
+        for ascii_file in self._cache_files('.ascii'):
             # Parse filename: library##name##sym_1.ascii
             parts = ascii_file.stem.split('##')
             if len(parts) < 2:
@@ -1041,23 +2489,11 @@ class ForensicExtractor:
 
             library = parts[0]
             symbol_name = parts[1]
-            symbol_key = f"{library}##{symbol_name}"
+            symbols.append((ascii_file, f"{library}##{symbol_name}"))
+        return symbols
 
-            try:
-                content = ascii_file.read_text(encoding='utf-8', errors='ignore')
-                symbol_data = self._parse_symbol_graphics(content, symbol_key)
-
-                if symbol_data:
-                    self.symbol_graphics[symbol_key] = symbol_data
-                    symbol_count += 1
-
-            except Exception as e:
-                print(f"  [WARN] Failed to parse {ascii_file.name}: {e}")
-
-        self.stats['symbol_graphics_loaded'] = symbol_count
-        print(f"  - Symbols extracted: {symbol_count}")
-
-    def _parse_symbol_graphics(self, content: str, symbol_key: str) -> Dict:
+    @staticmethod
+    def _parse_symbol_graphics(content: str, symbol_key: str) -> Dict:
         """
         Parse symbol graphics from cache .ascii content.
 
@@ -1083,6 +2519,10 @@ class ForensicExtractor:
           < 40 />  < 16 />  <n PIN_SIDE_DISPLAY n/>  < 1 />  < 6 />  <v Bottom v/>
           < 40 />  < 16 />  <n PIN_TYPE_DISPLAY n/>  < 1 />  < 6 />  <v Analog v/>
         """
+        # Named properties (V, just, rotation, PIN_*, ...) are looked up by
+        # offset instead of re-scanning windows of the file
+        props = PropertyIndex(content)
+
         symbol_data = {
             'symbol_key': symbol_key,
             'bounding_box': None,
@@ -1146,7 +2586,8 @@ class ForensicExtractor:
                 continue
 
             # Look for position coordinates (< 45 /> block after < 44 />)
-            pos_search = content[match.end():min(match.end()+500, len(content))]
+            window = (match.end(), min(match.end()+500, len(content)))
+            pos_search = content[window[0]:window[1]]
             pos_match = re.search(
                 r'<\s*45\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*/>',
                 pos_search
@@ -1155,19 +2596,19 @@ class ForensicExtractor:
             pos_y = int(pos_match.group(2)) if pos_match else 0
 
             # Look for default value: <n V n/> ... <v VALUE v/>
-            value_match = re.search(
-                r'<n\s+V\s+n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v\s*([^v]+)\s*v/>',
-                pos_search
-            )
-            default_value = value_match.group(1).strip() if value_match else ''
+            default_value = props.index('V', _parse_text, atoms=2).first_within(*window)
+            if default_value is None:
+                default_value = ''
 
             # Look for justification
-            just_match = re.search(r'<n\s+just\s+n/>\s*<\s*\d+\s*/>\s*<v\s*(\d+)\s*v/>', pos_search)
-            justification = int(just_match.group(1)) if just_match else 0
+            justification = props.index('just', _parse_uint, atoms=1).first_within(*window)
+            if justification is None:
+                justification = 0
 
             # Look for rotation
-            rot_match = re.search(r'<n\s+rotation\s+n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v\s*(-?\d+)\s*v/>', pos_search)
-            rotation = int(rot_match.group(1)) if rot_match else 0
+            rotation = props.index('rotation', _parse_int, atoms=2).first_within(*window)
+            if rotation is None:
+                rotation = 0
 
             # Look for style reference
             style_match = re.search(r'<\s*\d+\s*/>\s*<\s*(Style\d+)\s*/>', pos_search)
@@ -1200,31 +2641,25 @@ class ForensicExtractor:
         # EXTRACT PINS (Tag 19 containers + PIN_SIDE_DISPLAY properties)
         # =====================================================================
         # Pin properties are at the end of Tag 19 blocks
-        pin_side_pattern = re.compile(
-            r'<n\s+PIN_SIDE_DISPLAY\s+n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v\s*(\w+)\s*v/>',
-            re.DOTALL
-        )
-        pin_type_pattern = re.compile(
-            r'<n\s+PIN_TYPE_DISPLAY\s+n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v\s*(\w+)\s*v/>',
-            re.DOTALL
-        )
+        pin_sides = props.index('PIN_SIDE_DISPLAY', _parse_word, atoms=2)
 
         # Find all PIN_SIDE_DISPLAY occurrences - each represents a pin
-        for side_match in pin_side_pattern.finditer(content):
-            pin_side = side_match.group(1)
-
+        for side_start, side_end, pin_side in zip(pin_sides.starts, pin_sides.ends, pin_sides.values):
             # Look for PIN_TYPE_DISPLAY nearby
-            search_area = content[max(0, side_match.start()-200):side_match.end()+200]
-            type_match = pin_type_pattern.search(search_area)
-            pin_type = type_match.group(1) if type_match else 'Unknown'
+            search_area = (max(0, side_start-200), side_end+200)
+            pin_type = props.index('PIN_TYPE_DISPLAY', _parse_word, atoms=2).first_within(*search_area)
+            if pin_type is None:
+                pin_type = 'Unknown'
 
             # Look for PN (pin number) property
-            pn_match = re.search(r'<n\s+PN\s+n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v\s*([^v]+)\s*v/>', search_area)
-            pin_number = pn_match.group(1).strip() if pn_match else '?'
+            pin_number = props.index('PN', _parse_text, atoms=2).first_within(*search_area)
+            if pin_number is None:
+                pin_number = '?'
 
             # Look for pin visibility
-            vis_match = re.search(r'<n\s+visibility\s+n/>\s*<\s*\d+\s*/>\s*<v\s*(\d+)\s*v/>', search_area)
-            visibility = int(vis_match.group(1)) if vis_match else 1
+            visibility = props.index('visibility', _parse_uint, atoms=1).first_within(*search_area)
+            if visibility is None:
+                visibility = 1
 
             pin = {
                 'side': pin_side,
@@ -1238,12 +2673,8 @@ class ForensicExtractor:
         # =====================================================================
         # EXTRACT BOUNDING BOX from CDS_LMAN_SYM_OUTLINE
         # =====================================================================
-        outline_match = re.search(
-            r'<n\s+CDS_LMAN_SYM_OUTLINE\s+n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v\s*([^v]+)\s*v/>',
-            content
-        )
-        if outline_match:
-            outline_str = outline_match.group(1).strip()
+        outline_str = props.index('CDS_LMAN_SYM_OUTLINE', _parse_text, atoms=2).first_within(0, len(content))
+        if outline_str is not None:
             try:
                 parts = [int(float(x)) for x in outline_str.split(',')]
                 if len(parts) == 4:
@@ -1317,8 +2748,12 @@ class ForensicExtractor:
                 page_idx_match = re.search(r'page_file_(\d+)\.ascii', page_file)
                 page_index = int(page_idx_match.group(1)) if page_idx_match else 0
 
-            element_id = self._generate_element_id('inst')
-            sequence_idx = self._next_sequence_index()
+            # Drawn in the order of the page record holding the instance's
+            # graphics position; several refdes can share one graphics ID
+            graphics_id = position['graphics_id']
+            element_id = self._element_id('inst', position['block'], page_file, refdes)
+            sequence_idx = self._sequence_index(position['block'], page_file, 'dx_instance',
+                                                self._graphics_offsets.get(graphics_id, 0))
 
             placement = {
                 'element_id': element_id,
@@ -1354,6 +2789,12 @@ class ForensicExtractor:
             if not tbl_dir.exists():
                 continue
 
+            if block_dir.name in self.unchanged_blocks:
+                placements = self._kept_primitives('placements', block_dir.name)
+                placement_count += len(placements)
+                self.primitives.extend(placements)
+                continue
+
             for page_file in tbl_dir.glob('page_file_*.ascii'):
                 try:
                     placements = self._extract_placements_from_page(page_file, block_dir.name)
@@ -1372,7 +2813,7 @@ class ForensicExtractor:
         placements = []
 
         try:
-            content = page_file.read_text(encoding='utf-8', errors='ignore')
+            scan = self._scan_page(page_file)
         except Exception:
             return placements
 
@@ -1382,49 +2823,21 @@ class ForensicExtractor:
             page_idx_match = re.search(r'page_file_(\d+)\.ascii', page_file.name)
             page_index = int(page_idx_match.group(1)) if page_idx_match else 0
 
-        # Pattern to find instance placements
-        # Instances are referenced via cellid or symbol reference with transform
-        # Looking for patterns with transform matrix and position
-
-        # Find all transform matrices with associated position data
-        # Pattern: transform + position (< 45 /> coordinate block)
-        transform_pattern = re.compile(
-            r'<n transform n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*([^v]+)\s*v/>.*?'
-            r'<\s*45\s*/>\s*<\s*<\s*(\d+)\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*(\d+)\s*/>\s*<\s*(-?\d+)\s*/>\s*/>',
-            re.DOTALL
-        )
-
-        for match in transform_pattern.finditer(content):
-            transform_str = match.group(1).strip()
-            x = int(match.group(3))
-            y = int(match.group(5))
-
-            # Look for associated rotation
-            rotation_match = re.search(
-                r'<n rotation n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*(-?\d+)\s*v/>',
-                content[max(0, match.start()-300):match.end()+300]
-            )
-            rotation = int(rotation_match.group(1)) if rotation_match else 0
-
-            # Look for zValue
-            z_match = re.search(
-                r'<n zValue n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*(\d+)\s*v/>',
-                content[max(0, match.start()-300):match.end()+300]
-            )
-            z_value = int(z_match.group(1)) if z_match else 10000
-
-            # Look for any associated name/refdes
-            name_match = re.search(
-                r'<n name n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*([^v]+)\s*v/>',
-                content[max(0, match.start()-500):match.end()+500]
-            )
-            instance_name = name_match.group(1).strip() if name_match else None
+        # Transform matrices with their following position (< 45 /> coordinate
+        # block), rotation, zValue and name were collected by PlacementConsumer
+        for record in scan['placements']:
+            transform_str = record['transform_str']
+            x = record['x']
+            y = record['y']
+            rotation = record['rotation']
+            z_value = record['z_value']
+            instance_name = record['instance_name']
 
             # Only create placement if it looks like a component instance
             # (not just internal graphics transforms)
             if transform_str != '1,0,0,0,1,0,0,0,1' or rotation != 0:
-                element_id = self._generate_element_id('inst')
-                sequence_idx = self._next_sequence_index()
+                element_id = self._element_id('inst', block_name, page_file.name, record['offset'])
+                sequence_idx = self._sequence_index(block_name, page_file.name, 'instance', record['offset'])
 
                 placement = {
                     'element_id': element_id,
@@ -1476,6 +2889,12 @@ class ForensicExtractor:
             if not tbl_dir.exists():
                 continue
 
+            if block_dir.name in self.unchanged_blocks:
+                texts = self._kept_primitives('text', block_dir.name)
+                text_count += len(texts)
+                self.primitives.extend(texts)
+                continue
+
             for page_file in tbl_dir.glob('page_file_*.ascii'):
                 try:
                     texts = self._extract_text_from_page(page_file, block_dir.name)
@@ -1514,6 +2933,7 @@ class ForensicExtractor:
             position = self.instance_positions.get(instance_id)
             if not position:
                 continue
+            graphics_id = position['graphics_id']
 
             inst_x = position.get('x', 0)
             inst_y = position.get('y', 0)
@@ -1536,8 +2956,9 @@ class ForensicExtractor:
                 abs_x = inst_x + loc_x
                 abs_y = inst_y + loc_y
 
-                element_id = self._generate_element_id('refdes')
-                sequence_idx = self._next_sequence_index()
+                element_id = self._element_id('refdes', position['block'], position['page_file'], refdes)
+                sequence_idx = self._sequence_index(position['block'], position['page_file'], 'refdes',
+                                                    self._graphics_offsets.get(graphics_id, 0))
 
                 text_prim = {
                     'element_id': element_id,
@@ -1589,8 +3010,9 @@ class ForensicExtractor:
                 abs_x = inst_x + val_x
                 abs_y = inst_y + val_y
 
-                element_id = self._generate_element_id('value')
-                sequence_idx = self._next_sequence_index()
+                element_id = self._element_id('value', position['block'], position['page_file'], refdes)
+                sequence_idx = self._sequence_index(position['block'], position['page_file'], 'value',
+                                                    self._graphics_offsets.get(graphics_id, 0))
 
                 text_prim = {
                     'element_id': element_id,
@@ -1639,11 +3061,13 @@ class ForensicExtractor:
         The key is finding text that has:
         - A visible text value (not internal metadata)
         - A coordinate position (< 45 /> block)
+
+        The raw matches are collected by TextConsumer during the shared page walk.
         """
         texts = []
 
         try:
-            content = page_file.read_text(encoding='utf-8', errors='ignore')
+            scan = self._scan_page(page_file)['text']
         except Exception:
             return texts
 
@@ -1661,21 +3085,6 @@ class ForensicExtractor:
             3: 'center',
         }
 
-        # System/internal label types to skip
-        SKIP_LABELS = {
-            'CGTYPE', 'LP', 'MSB', 'LSB', 'PROP_WIDTH', 'COMMENT_BODY',
-            'GRAPHICS_BLOCK_ID', 'GRAPHICS_BLOCK_NAME', 'BODY_TYPE',
-            'HDL_PORT', 'HDL_POWER', 'NC_PORT', 'PATH', 'LOCATION', 'VALUE',
-            'IMPLEMENTATION', 'IMPLEMENTATION_TYPE', 'PSPICETEMPLATE',
-            'ORGNAME', 'ORGADDR1', 'ORGADDR2', 'ORGADDR3', 'REVCODE',
-            'PAGE_NUMBER', 'PAGE_COUNT', 'PAGE_SIZE', 'PAGE_CREATE_DATE',
-            'CAP_NAME', 'OFFPAGE', 'DOC', 'VHDL_PORT', 'VHDL_MODE',
-            'CDS_NET_ID', 'HDL_TAP', 'VOLTAGE', 'MFG_PART_NO', 'MFG',
-            'JEDEC_TYPE', 'DATASHEET', 'ASI_MODEL', 'ROHS',
-            'CDS_LIBRARY_PHYSICAL_ID', 'CDS_LIBRARY_ID', 'CDS_ASSOC_NET_ID_STR',
-            'zeronull', 'default', 'PN', 'BN', 'MPN',
-        }
-
         # Avoid duplicates at the same position (but allow same text at different places)
         seen_texts = set()
 
@@ -1685,45 +3094,9 @@ class ForensicExtractor:
         # Position found in nearby < 45 /> blocks
         # =====================================================================
 
-        # Pattern to find signal/net names
-        net_name_pattern = re.compile(
-            r'<\s*(\d+)\s*/>\s*<\s*'
-            r'(P\d+_[A-Z0-9_]+|VCC[A-Z0-9_]*|GND[A-Z0-9_]*|PS_[A-Z0-9_]+|'
-            r'CLK[A-Z0-9_]*|RST[A-Z0-9_]*|EN[A-Z0-9_]*|INT[A-Z0-9_]*|'
-            r'SDA[A-Z0-9_]*|SCL[A-Z0-9_]*|MISO[A-Z0-9_]*|MOSI[A-Z0-9_]*|'
-            r'TX[A-Z0-9_]*|RX[A-Z0-9_]*|[A-Z][A-Z0-9]*_[A-Z0-9_]+)'
-            r'\s*/>'
-        )
-
-        for match in net_name_pattern.finditer(content):
-            text_len = int(match.group(1))
-            text = match.group(2).strip()
-
-            # Skip internal names
-            if text in SKIP_LABELS:
-                continue
-
-            # Get context around this match to find position/rotation
-            # Use a wider window to capture nearby rotation/justification tags
-            start = max(0, match.start() - 1200)
-            end = min(len(content), match.end() + 1200)
-            context = content[start:end]
-
-            # Find ALL Tag 45 positions in context
-            positions = list(re.finditer(
-                r'<\s*45\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*/>',
-                context
-            ))
-
-            # Filter for valid positions (not zeros from bounding boxes)
-            valid_pos = [(int(m.group(1)), int(m.group(2))) for m in positions
-                        if abs(int(m.group(1))) > 1000 or abs(int(m.group(2))) > 1000]
-
-            if not valid_pos:
-                continue
-
-            # Take the LAST valid position in the context (closest to the text)
-            best_x, best_y = valid_pos[-1]
+        for label in scan['net_labels']:
+            text = label['text']
+            best_x, best_y = label['x'], label['y']
 
             # Skip if already seen at this position
             pos_key = (text, best_x, best_y)
@@ -1731,15 +3104,11 @@ class ForensicExtractor:
                 continue
             seen_texts.add(pos_key)
 
-            # Look for rotation/justification in context
-            rot_match = re.search(r'<n\s+rotation\s+n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v\s*(-?\d+)\s*v/>', context)
-            rotation = int(rot_match.group(1)) if rot_match else 0
-
-            just_match = re.search(r'<n\s+just\s+n/>\s*<\s*\d+\s*/>\s*<v\s*(\d+)\s*v/>', context)
-            justification = int(just_match.group(1)) if just_match else 0
+            rotation = label['rotation']
+            justification = label['justification']
 
-            element_id = self._generate_element_id('netlabel')
-            sequence_idx = self._next_sequence_index()
+            element_id = self._element_id('netlabel', block_name, page_file.name, label['offset'])
+            sequence_idx = self._sequence_index(block_name, page_file.name, 'netlabel', label['offset'])
 
             text_prim = {
                 'element_id': element_id,
@@ -1771,44 +3140,15 @@ class ForensicExtractor:
         # These contain rich text content in HTML format
         # =====================================================================
 
-        html_text_pattern = re.compile(
-            r'<n\s+GRAPHICS_BLOCK_CHILD_TEXT\s+n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v\s*(.*?)\s*v/>',
-            re.DOTALL
-        )
-
-        for match in html_text_pattern.finditer(content):
-            html_content = match.group(1)
-
-            # Extract plain text from HTML
-            text_match = re.search(r'>([^<]+)</p>', html_content)
-            if not text_match:
-                continue
-
-            text = text_match.group(1).strip()
-            if not text:
-                continue
-
-            # Get context for position
-            start = max(0, match.start() - 500)
-            context = content[start:match.start()]
-
-            # Find position in preceding context
-            positions = re.findall(
-                r'<\s*45\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*/>',
-                context
-            )
-
-            if not positions:
-                continue
-
-            # Take last position before the text
-            x, y = int(positions[-1][0]), int(positions[-1][1])
+        for block in scan['html_blocks']:
+            text = block['text']
+            x, y = block['x'], block['y']
 
             # Use position-aware key for HTML text as well
             seen_texts.add((text, x, y))
 
-            element_id = self._generate_element_id('richtext')
-            sequence_idx = self._next_sequence_index()
+            element_id = self._element_id('richtext', block_name, page_file.name, block['offset'])
+            sequence_idx = self._sequence_index(block_name, page_file.name, 'richtext', block['offset'])
 
             text_prim = {
                 'element_id': element_id,
@@ -1827,6 +3167,10 @@ class ForensicExtractor:
                     'rotation': 0,
                     'justification': 1,
                 },
+                'style': {
+                    'font_size': block['font_size'],
+                    'font_weight': block['font_weight'] or 'normal',
+                },
                 'style_ref': 'Style1',
                 'z_value': 10000,
                 'semantic': 'annotation',
@@ -1841,42 +3185,14 @@ class ForensicExtractor:
         # These are rich text annotations NOT wrapped by GRAPHICS_BLOCK_CHILD_TEXT
         # =====================================================================
 
-        inline_html_pattern = re.compile(
-            r'<span[^>]*>([^<]+)</span></p></body></html>\s*/>'
-        )
-
-        for match in inline_html_pattern.finditer(content):
-            text = match.group(1).strip()
-
-            # Skip if empty or already seen
-            if not text:
-                continue
-
-            # Get larger context BEFORE the match to find the position
-            start = max(0, match.start() - 1000)
-            context = content[start:match.start()]
-
-            # Find the LAST Tag 45 position before this text
-            # Pattern: < 45 /> < < 0 /> < X /> < 0 /> < Y /> />
-            positions = re.findall(
-                r'<\s*45\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*/>',
-                context
-            )
-
-            if not positions:
-                continue
-
-            # Take the LAST position (closest to the text)
-            x, y = int(positions[-1][0]), int(positions[-1][1])
-
-            # Skip positions that are zero (likely offsets, not actual positions)
-            if abs(x) < 1000 and abs(y) < 1000:
-                continue
+        for inline in scan['inline_html']:
+            text = inline['text']
+            x, y = inline['x'], inline['y']
 
             seen_texts.add((text, x, y))
 
-            element_id = self._generate_element_id('htmltext')
-            sequence_idx = self._next_sequence_index()
+            element_id = self._element_id('htmltext', block_name, page_file.name, inline['offset'])
+            sequence_idx = self._sequence_index(block_name, page_file.name, 'htmltext', inline['offset'])
 
             text_prim = {
                 'element_id': element_id,
@@ -1896,8 +3212,8 @@ class ForensicExtractor:
                     'justification': 1,
                 },
                 'style': {
-                    'font_size': 10,
-                    'font_weight': 'bold',
+                    'font_size': inline['font_size'] or 10,
+                    'font_weight': inline['font_weight'] or 'bold',
                 },
                 'z_value': 10000,
                 'semantic': 'annotation',
@@ -1911,28 +3227,17 @@ class ForensicExtractor:
         # Format: < 31 /> < < ... /> < LENGTH /> < TEXT />
         # =====================================================================
 
-        # Find simple pin labels (1, 2, A, B, etc.)
-        pin_label_pattern = re.compile(
-            r'<\s*31\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(\d+)\s*/>\s*<\s*([A-Z0-9])\s*/>\s*'
-            r'<\s*44\s*/>\s*<\s*<\s*45\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*/>\s*'
-            r'<\s*45\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*/>\s*/>\s*'
-            r'<\s*45\s*/>\s*<\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*<\s*\d+\s*/>\s*<\s*(-?\d+)\s*/>\s*/>',
-            re.DOTALL
-        )
-
-        for match in pin_label_pattern.finditer(content):
-            text = match.group(3).strip()
-            # Use the last Tag 45 position (actual position, not offset)
-            x = int(match.group(8))
-            y = int(match.group(9))
+        for pin in scan['pin_labels']:
+            text = pin['text']
+            x, y = pin['x'], pin['y']
 
             pos_key = f"pin_{x}_{y}_{text}"
             if pos_key in seen_texts:
                 continue
             seen_texts.add(pos_key)
 
-            element_id = self._generate_element_id('pinlabel')
-            sequence_idx = self._next_sequence_index()
+            element_id = self._element_id('pinlabel', block_name, page_file.name, pin['offset'])
+            sequence_idx = self._sequence_index(block_name, page_file.name, 'pinlabel', pin['offset'])
 
             text_prim = {
                 'element_id': element_id,
@@ -1961,6 +3266,24 @@ class ForensicExtractor:
 
         return texts
 
+    def extract_components(self) -> None:
+        """Phase 2: Extract components from every JSON file."""
+        print("\n" + "="*60)
+        print("PHASE 2: COMPONENT EXTRACTION (JSON)")
+        print("="*60)
+        for json_file in self.json_files:
+            print(f"\nProcessing: {json_file.name}")
+            self.extract_components_from_json(json_file)
+
+    def extract_nets(self) -> None:
+        """Phase 3: Extract nets and connectivity from every XCON file."""
+        print("\n" + "="*60)
+        print("PHASE 3: NET & CONNECTIVITY EXTRACTION (XCON)")
+        print("="*60)
+        for xcon_file in self._read_ahead(self.xcon_files, 'raw'):
+            print(f"\nProcessing: {xcon_file.name}")
+            self.extract_nets_and_connectivity_from_xcon(xcon_file)
+
     def extract_components_from_json(self, json_path: Path) -> None:
         """
         Phase 2: Extract component instances from a JSON file.
@@ -1987,13 +3310,14 @@ class ForensicExtractor:
         block_name = json_path.parent.parent.name
 
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._load_file(json_path, _load_json_file)
         except json.JSONDecodeError as e:
             print(f"  [WARN] Failed to parse JSON: {json_path.name} - {e}")
+            self._degrade(json_path, 'components', f'JSONDecodeError: {e}')
             return
         except Exception as e:
             print(f"  [WARN] Error reading {json_path.name}: {e}")
+            self._degrade(json_path, 'components', f'{type(e).__name__}: {e}')
             return
 
         objects = data.get('objects', [])
@@ -2148,11 +3472,14 @@ class ForensicExtractor:
         block_name = xcon_path.parent.parent.name
 
         try:
-            tree = ET.parse(xcon_path)
-            root = tree.getroot()
+            root = self._load_file(xcon_path, self._load_xcon)
         except ET.ParseError as e:
             print(f"  [WARN] Failed to parse XCON: {xcon_path.name} - {e}")
+            self._degrade(xcon_path, 'nets', f'ParseError: {e}')
             return
+        finally:
+            # Only the tree is needed from here on
+            self.page_store.discard(xcon_path)
 
         # Handle XML namespace
         ns = {'cs': 'http://www.cadence.com/spb/csschema'}
@@ -2417,6 +3744,12 @@ class ForensicExtractor:
         print(f"  Total Connections: {self.stats['total_connections']}")
         print(f"  Blocks: {len(self.stats['blocks_processed'])}")
 
+        store = self.page_store.stats
+        self.stats['page_store'] = dict(store)
+        print(f"  Source files read: {store['files_read']} "
+              f"({store['bytes_read'] / 1e6:.1f} MB, {store['files_mapped']} mapped, "
+              f"{store['hits']} cache hits, {store['evictions']} evictions)")
+
         # Symbol graphics stats
         symbols_with_lines = sum(1 for s in self.symbol_graphics.values() if s.get('lines'))
         symbols_with_labels = sum(1 for s in self.symbol_graphics.values() if s.get('labels'))
@@ -2458,7 +3791,7 @@ class ForensicExtractor:
                 'id': net_data['id'],
                 'scope': net_data['scope'],
                 'direction': net_data['direction'],
-                'blocks': list(net_data['blocks']),
+                'blocks': sorted(net_data['blocks']),
                 'connections': net_data['connections']
             }
 
@@ -2546,6 +3879,8 @@ class ForensicExtractor:
                 'instances_with_positions': instances_with_positions,
                 'instance_to_graphics_mappings': len(self.instance_to_graphics),
                 'graphics_positions_found': len(self.graphics_positions),
+                # Files skipped or only partly parsed (timeouts, parse errors)
+                'degraded_files': sorted(self.degraded_files.values(), key=lambda d: d['file']),
             },
 
             # Pages (with element_ids for primitives on each page)
@@ -2573,10 +3908,17 @@ class ForensicExtractor:
             'nets': nets_export,
             'cells': self.cells
         }
+        # Persistent parse cache counters, only when there is a cache
+        if self.parse_cache is not None:
+            output['statistics']['parse_cache'] = self.parse_cache.summary()
 
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
+        # Write to file; readers (the viewer, watch mode) never see a partial one
+        tmp_path = f'{output_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(output, f, indent=2, default=str)
+        os.replace(tmp_path, output_path)
+        if self.incremental:
+            self._write_incremental_state(output_path, output['extraction_date'])
 
         file_size = os.path.getsize(output_path)
         print(f"  - Output file size: {file_size / 1024:.1f} KB")
@@ -2585,6 +3927,56 @@ class ForensicExtractor:
 
 def main():
     """Main entry point for forensic extraction."""
+    parser = argparse.ArgumentParser(description='Extract full_design.json from a Cadence SDAX project')
+    parser.add_argument('--mmap', action='store_true',
+                        help='scan page files as memory-mapped bytes instead of decoded text')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='walk page files and parse cache symbols in N worker '
+                             'processes (default: 1)')
+    parser.add_argument('--io-threads', type=int, default=1, metavar='N',
+                        help='load dx.json/json/xcon/style files on N threads '
+                             '(default: 1 loads them sequentially)')
+    parser.add_argument('--xcon-net-labels', action='store_true',
+                        help='detect net labels by lookup against XCON net names '
+                             'instead of the name-pattern heuristic')
+    parser.add_argument('--read-ahead', type=int, default=0, metavar='N',
+                        help=f'read up to N page/symbol/XCON files ahead of the parser '
+                             f'(default: 0 reads on demand, e.g. {DEFAULT_READ_AHEAD})')
+    parser.add_argument('--read-ahead-mb', type=int, default=DEFAULT_READ_AHEAD_BYTES >> 20,
+                        metavar='MB',
+                        help=f'memory for files read ahead but not yet parsed '
+                             f'(default: {DEFAULT_READ_AHEAD_BYTES >> 20})')
+    parser.add_argument('--file-timeout', type=float, metavar='SECONDS',
+                        help='give up on a page or symbol file whose parse takes longer '
+                             '(files are then parsed in isolated worker processes)')
+    parser.add_argument('--file-memory-mb', type=int, metavar='MB',
+                        help='address space limit of each isolated parse worker')
+    parser.add_argument('--file-retries', type=int, default=1, metavar='N',
+                        help='retry a timed-out or crashed file parse N times (default: 1)')
+    parser.add_argument('--parse-cache', metavar='DIR',
+                        help='keep parsed page, block and symbol files in DIR and load '
+                             'unchanged files from it on later runs')
+    parser.add_argument('--parse-cache-mb', type=int, default=DEFAULT_PARSE_CACHE_BYTES >> 20,
+                        metavar='MB',
+                        help=f'size limit of the parse cache, least recently used entries '
+                             f'go first (default: {DEFAULT_PARSE_CACHE_BYTES >> 20})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='re-extract only the blocks changed since the previous '
+                             'full_design.json (keeps full_design.incremental.json next to it)')
+    parser.add_argument('--cache-pac', action='store_true',
+                        help='read cache symbols and styles straight from cache.pac even '
+                             'where cache/ is unpacked (it is used anyway without cache/)')
+    parser.add_argument('--symbol-library', metavar='PATH',
+                        help='load parsed cache symbols and styles from the compiled library '
+                             'at PATH, rebuilding it when the cache changed')
+    parser.add_argument('--phase-threads', type=int, default=1, metavar='N',
+                        help='run independent phases on N threads (default: 1 runs '
+                             'them one after the other)')
+    parser.add_argument('--phases', metavar='NAME[,NAME...]',
+                        help='run only these phases and the phases they require, '
+                             'e.g. --phases symbols,styles (default: all, ending with export)')
+    args = parser.parse_args()
+
     print("="*60)
     print("CADENCE SDAX FORENSIC EXTRACTOR")
     print("="*60)
@@ -2592,82 +3984,31 @@ def main():
 
     # Initialize extractor
     root_dir = Path(__file__).parent
-    extractor = ForensicExtractor(root_dir)
-
-    # Phase 1: Discovery
-    extractor.discover_signal_files()
-
-    # Phase 1b: Load symbol pin numbers from cache
-    extractor.load_symbol_pin_numbers()
-
-    # Phase 1c: Load DX.JSON refdes data (CRITICAL - contains component labels!)
-    extractor.load_dx_json_instances()
-
-    # Phase 1d: Build instance_id -> graphics_id mapping from block.ascii files
-    extractor.build_instance_to_graphics_mapping()
-
-    # =========================================================================
-    # CRITICAL: extract_pages() MUST run BEFORE extract_graphics_positions_from_pages()
-    # because it builds the page_mapping dictionary that _get_pdf_page_index() needs!
-    # =========================================================================
-
-    # Phase G1: Extract pages/sheets - MUST RUN FIRST to build page_mapping!
-    extractor.extract_pages()
-
-    # Phase 1e: Extract graphics positions from page files (now uses page_mapping)
-    extractor.extract_graphics_positions_from_pages()
-
-    # Phase 1f: Link the full chain: refdes -> instance_id -> graphics_id -> position
-    extractor.link_instance_positions()
-
-    # =========================================================================
-    # GEOMETRIC LAYER EXTRACTION (continued)
-    # =========================================================================
-
-    # Phase G6: Load styles (before text extraction so fonts are available)
-    extractor.load_styles()
-
-    # Phase G7: Extract grid configuration
-    extractor.extract_grid_config()
-
-    # Phase G3: Extract symbol graphics from cache
-    extractor.extract_symbol_graphics()
-
-    # Phase G5: Extract wire segments
-    extractor.extract_wire_segments()
-
-    # Phase G4: Extract instance placements
-    extractor.extract_instance_placements()
-
-    # Phase G2b: Extract text primitives
-    extractor.extract_text_primitives()
-
-    # =========================================================================
-    # LOGICAL NETLIST EXTRACTION
-    # =========================================================================
-
-    # Phase 2: Extract components from JSON
-    print("\n" + "="*60)
-    print("PHASE 2: COMPONENT EXTRACTION (JSON)")
-    print("="*60)
-    for json_file in extractor.json_files:
-        print(f"\nProcessing: {json_file.name}")
-        extractor.extract_components_from_json(json_file)
-
-    # Phase 3: Extract nets and connectivity from XCON
-    print("\n" + "="*60)
-    print("PHASE 3: NET & CONNECTIVITY EXTRACTION (XCON)")
-    print("="*60)
-    for xcon_file in extractor.xcon_files:
-        print(f"\nProcessing: {xcon_file.name}")
-        extractor.extract_nets_and_connectivity_from_xcon(xcon_file)
-
-    # Phase 4: Build hierarchy
-    extractor.build_hierarchy()
-
-    # Phase 5: Validate and export
-    if extractor.validate():
-        extractor.export('full_design.json')
+    extractor = ForensicExtractor(
+        root_dir, mmap_pages=args.mmap, read_ahead=args.read_ahead,
+        read_ahead_bytes=args.read_ahead_mb << 20, file_timeout=args.file_timeout,
+        file_memory=args.file_memory_mb << 20 if args.file_memory_mb else None,
+        file_retries=args.file_retries,
+        parse_cache=open_parse_cache(args.parse_cache, args.parse_cache_mb << 20)
+        if args.parse_cache else None,
+        incremental=args.incremental,
+        symbol_library=open_symbol_library(args.symbol_library, root_dir, args.cache_pac)
+        if args.symbol_library else None,
+        cache_pac=args.cache_pac)
+
+    # Phases run in dependency order (see ForensicExtractor.phases); phases
+    # that do not depend on each other overlap on --phase-threads threads
+    try:
+        scheduler = PhaseScheduler(extractor.phases(
+            jobs=args.jobs, io_threads=args.io_threads,
+            xcon_net_labels=args.xcon_net_labels, output_path='full_design.json'))
+        targets = [name.strip() for name in args.phases.split(',')] if args.phases else None
+        ok = scheduler.run(targets, workers=args.phase_threads)
+    except PhaseOrderError as e:
+        print(f"  [ERROR] {e}")
+        return 2
+
+    if ok:
         print("\n" + "="*60)
         print("EXTRACTION COMPLETE")
         print("="*60)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Isolated File Workers
+=====================
+Process pool for per-file parsing (page walks, cache symbols) where one bad
+file must not hold up the run. Unlike ProcessPoolExecutor, where a hung task
+keeps its worker (and the map() waiting on it) forever and a crashed worker
+breaks the whole pool, IsolatedPool:
+
+- gives every task a wall-clock budget (``timeout``), counted from when its
+  worker is ready (started and initialized); a worker still busy when it
+  runs out is killed and replaced. Starting a worker has the same budget,
+  so a hung initializer times the task out too instead of blocking map(),
+- caps each worker's address space (``max_memory``, where the platform has
+  RLIMIT_AS); a task that hits the cap fails with MemoryError,
+- retries a task whose worker timed out or died up to ``retries`` times, on
+  a fresh worker,
+- returns one TaskResult per item saying what happened, in input order.
+
+An exception raised by the task itself is deterministic and is not retried.
+
+Workers are started by a fork server where the platform has one: the pool is
+used from phases running on threads, and forking a multi-threaded process is
+unsafe.
+"""
+
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:
+    # Windows: no memory cap
+    resource = None
+
+# Sent by a worker once it has started and run the initializer
+_READY = 'ready'
+
+# TaskResult statuses
+OK = 'ok'
+ERROR = 'error'
+MEMORY = 'memory'
+TIMEOUT = 'timeout'
+CRASHED = 'crashed'
+
+
+class TaskResult:
+    """
+    Outcome of one task: ``value`` when ``status`` is OK, else ``error``
+    describing why not. ``attempts`` counts the workers the task was sent to.
+    """
+
+    __slots__ = ('status', 'value', 'error', 'attempts')
+
+    def __init__(self, status: str, value: Any = None, error: Optional[str] = None,
+                 attempts: int = 1):
+        self.status = status
+        self.value = value
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+    def __repr__(self):
+        return f'TaskResult({self.status!r}, attempts={self.attempts})'
+
+
+def process_context():
+    """
+    Multiprocessing context for worker pools: a fork server where the platform
+    has one. A process that has started a fork server must not fork workers
+    of its own (they would inherit its fork server state), so every pool of
+    a run should come from here.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None
+    return multiprocessing.get_context(method)
+
+
+def _limit_memory(max_memory: int) -> None:
+    if resource is None or not hasattr(resource, 'RLIMIT_AS'):
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        max_memory = min(max_memory, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (max_memory, hard))
+
+
+def _worker_main(conn, initializer: Optional[Callable], initargs: tuple,
+                 max_memory: Optional[int]) -> None:
+    """Worker loop: receive (fn, item), send back (status, value or error)."""
+    if max_memory:
+        _limit_memory(max_memory)
+    if initializer is not None:
+        initializer(*initargs)
+    conn.send((_READY, None))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, item = task
+        try:
+            reply = (OK, fn(item))
+        except MemoryError:
+            reply = (MEMORY, 'MemoryError: worker memory limit reached')
+        except Exception as e:
+            reply = (ERROR, f'{type(e).__name__}: {e}')
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result (or no memory left to pickle it)
+            conn.send((ERROR, f'{type(e).__name__}: {e}'))
+
+
+class _Worker:
+    __slots__ = ('process', 'conn', 'ready')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+
+
+class IsolatedPool:
+    """Pool of ``workers`` killable worker processes (see module docstring)."""
+
+    def __init__(self, workers: int, initializer: Optional[Callable] = None,
+                 initargs: tuple = (), timeout: Optional[float] = None,
+                 max_memory: Optional[int] = None, retries: int = 1, mp_context=None):
+        self.workers = max(1, workers)
+        self.initializer = initializer
+        self.initargs = initargs
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.retries = retries
+        self._context = mp_context if mp_context is not None else process_context()
+        self._idle: List[_Worker] = []
+
+    def __enter__(self) -> 'IsolatedPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _start(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, daemon=True,
+            args=(child_conn, self.initializer, self.initargs, self.max_memory))
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _deadline(self, worker: _Worker) -> Optional[float]:
+        # Until READY this is the start-up deadline, then the task's
+        if not self.timeout:
+            return None
+        return time.monotonic() + self.timeout
+
+    @staticmethod
+    def _kill(worker: _Worker) -> None:
+        worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[TaskResult]:
+        """Run ``fn(item)`` for every item; one TaskResult per item, in order."""
+        items = list(items)
+        results: List[Optional[TaskResult]] = [None] * len(items)
+        attempts = [0] * len(items)
+        queue = deque(range(len(items)))
+        busy: Dict[Any, list] = {}   # conn -> [worker, index, deadline]
+
+        def retry_or_give_up(i: int, status: str, error: str) -> None:
+            if attempts[i] <= self.retries:
+                queue.append(i)
+            else:
+                results[i] = TaskResult(status, error=error, attempts=attempts[i])
+
+        while queue or busy:
+            while queue and len(busy) < self.workers:
+                worker = self._idle.pop() if self._idle else self._start()
+                i = queue.popleft()
+                attempts[i] += 1
+                try:
+                    worker.conn.send((fn, items[i]))
+                except (OSError, ValueError):
+                    # Worker died while idle
+                    self._kill(worker)
+                    attempts[i] -= 1
+                    queue.appendleft(i)
+                    continue
+                busy[worker.conn] = [worker, i, self._deadline(worker)]
+
+            deadlines = [deadline for _, _, deadline in busy.values() if deadline is not None]
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            for conn in wait(list(busy), timeout=wait_for):
+                worker, i, _ = busy[conn]
+                try:
+                    status, value = conn.recv()
+                except (EOFError, OSError):
+                    del busy[conn]
+                    worker.process.join(timeout=1)
+                    code = worker.process.exitcode
+                    self._kill(worker)
+                    retry_or_give_up(i, CRASHED, f'worker exited (code {code})')
+                    continue
+                if status == _READY:
+                    # The task is already in the pipe; its clock starts now
+                    worker.ready = True
+                    busy[conn][2] = self._deadline(worker)
+                    continue
+                del busy[conn]
+                self._idle.append(worker)
+                if status == OK:
+                    results[i] = TaskResult(OK, value, attempts=attempts[i])
+                else:
+                    results[i] = TaskResult(status, error=value, attempts=attempts[i])
+
+            now = time.monotonic()
+            for conn, (worker, i, deadline) in list(busy.items()):
+                if deadline is not None and now >= deadline:
+                    del busy[conn]
+                    self._kill(worker)
+                    if worker.ready:
+                        retry_or_give_up(i, TIMEOUT, f'no result after {self.timeout:g}s')
+                    else:
+                        retry_or_give_up(i, TIMEOUT, f'worker not started after {self.timeout:g}s')
+        return results
+
+    def close(self) -> None:
+        """Stop the idle workers."""
+        for worker in self._idle:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in self._idle:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+        self._idle.clear()
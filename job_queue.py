@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Filesystem Job Queue
+====================
+A job queue that lives in a plain directory, so extraction can be spread over
+several hosts sharing a file system (or several local processes) without a
+message broker.
+
+    <queue>/pending/<job>.json   waiting to be claimed
+    <queue>/leased/<job>.json    claimed by a worker; the mtime is the heartbeat
+    <queue>/results/<job>.pickle finished job's result
+    <queue>/failed/<job>.json    job that used up its attempts, with its errors
+    <queue>/STOP                 tells idle workers to exit
+
+A worker claims a job by renaming it from pending/ to leased/; the rename is
+atomic, so exactly one worker wins. While it works it touches the lease every
+few seconds. A lease that has not been touched for ``lease_seconds`` belongs
+to a dead or stuck worker: requeue_expired() moves the job back to pending/,
+or to failed/ once it has been claimed ``max_attempts`` times. Every file is
+written to a temporary name and renamed into place, so readers never see a
+partial file.
+
+Results are pickled: the queue directory must only be writable by the
+machines taking part in the run. Lease expiry compares file mtimes with the
+local clock, so hosts need roughly synchronized clocks (well within
+``lease_seconds``).
+"""
+
+import json
+import os
+import pickle
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Queue subdirectories
+_PENDING = 'pending'
+_LEASED = 'leased'
+_RESULTS = 'results'
+_FAILED = 'failed'
+_STOP = 'STOP'
+
+
+def worker_id() -> str:
+    """Identifier of this process for leases: host:pid."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f'.{path.name}.{worker_id()}.{threading.get_ident()}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    """A job file, or None if it has been moved away meanwhile."""
+    try:
+        return json.loads(path.read_bytes().decode('utf-8'))
+    except FileNotFoundError:
+        return None
+
+
+class JobQueue:
+    """
+    Directory-backed job queue with leases (see module docstring).
+
+    Job payloads are JSON objects; results are any picklable value.
+    """
+
+    def __init__(self, root, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.root = Path(root)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for name in (_PENDING, _LEASED, _RESULTS, _FAILED):
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, kind: str, job_id: str) -> Path:
+        suffix = '.pickle' if kind == _RESULTS else '.json'
+        return self.root / kind / f'{job_id}{suffix}'
+
+    # -- coordinator side -------------------------------------------------
+
+    def put(self, job_id: str, payload: Dict[str, Any]) -> None:
+        """Queue a job; a job that already has a result is left alone."""
+        if self.is_done(job_id):
+            return
+        job = {'id': job_id, 'payload': payload, 'attempts': 0, 'errors': []}
+        _write_atomic(self._path(_PENDING, job_id), json.dumps(job).encode('utf-8'))
+
+    def requeue_expired(self) -> int:
+        """Return jobs with stale leases to pending/ (or failed/); the number moved."""
+        moved = 0
+        now = time.time()
+        for lease in self.root.joinpath(_LEASED).glob('*.json'):
+            try:
+                if now - lease.stat().st_mtime <= self.lease_seconds:
+                    continue
+            except FileNotFoundError:
+                continue
+            job_id = lease.stem
+            if self.has_result(job_id):
+                lease.unlink(missing_ok=True)
+                continue
+            job = _read_json(lease)
+            if job is None:
+                continue
+            job['errors'].append(f"lease of {job.get('worker', '?')} expired")
+            self._retry_or_fail(lease, job)
+            moved += 1
+        return moved
+
+    def wait(self, job_ids: List[str], poll_seconds: float = 0.5,
+             progress=None) -> None:
+        """
+        Block until every job in ``job_ids`` has a result or has failed,
+        requeueing expired leases meanwhile. ``progress(done, total)`` is
+        called whenever the number of finished jobs changes.
+        """
+        remaining = set(job_ids)
+        reported = -1
+        while True:
+            remaining = {job_id for job_id in remaining if not self.is_done(job_id)}
+            done = len(job_ids) - len(remaining)
+            if progress is not None and done != reported:
+                progress(done, len(job_ids))
+                reported = done
+            if not remaining:
+                return
+            self.requeue_expired()
+            time.sleep(poll_seconds)
+
+    def result(self, job_id: str) -> Any:
+        with open(self._path(_RESULTS, job_id), 'rb') as f:
+            return pickle.load(f)
+
+    def errors(self, job_id: str) -> List[str]:
+        """Errors recorded for a failed job."""
+        job = _read_json(self._path(_FAILED, job_id))
+        return job['errors'] if job else []
+
+    def forget(self, job_id: str) -> None:
+        """Drop a finished job's result or failure record once it has been read."""
+        self._path(_RESULTS, job_id).unlink(missing_ok=True)
+        self._path(_FAILED, job_id).unlink(missing_ok=True)
+
+    def has_result(self, job_id: str) -> bool:
+        return self._path(_RESULTS, job_id).exists()
+
+    def is_done(self, job_id: str) -> bool:
+        return self.has_result(job_id) or self._path(_FAILED, job_id).exists()
+
+    def counts(self) -> Dict[str, int]:
+        return {name: sum(1 for _ in self.root.joinpath(name).glob(self._path(name, '*').name))
+                for name in (_PENDING, _LEASED, _RESULTS, _FAILED)}
+
+    def stop(self) -> None:
+        """Ask workers to exit once they are idle."""
+        _write_atomic(self.root / _STOP, b'')
+
+    def stopped(self) -> bool:
+        return (self.root / _STOP).exists()
+
+    def clear_stop(self) -> None:
+        (self.root / _STOP).unlink(missing_ok=True)
+
+    # -- worker side ------------------------------------------------------
+
+    def claim(self, worker: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Lease the next pending job: (job_id, payload), or None if there is none."""
+        for pending in sorted(self.root.joinpath(_PENDING).glob('*.json')):
+            job_id = pending.stem
+            lease = self._path(_LEASED, job_id)
+            try:
+                os.rename(pending, lease)
+            except FileNotFoundError:
+                # Claimed by another worker first
+                continue
+            try:
+                # The rename kept the pending file's mtime; start the lease now
+                os.utime(lease)
+            except FileNotFoundError:
+                continue
+            job = _read_json(lease)
+            if job is None:
+                continue
+            if self.has_result(job_id):
+                # Finished by a worker whose lease had expired
+                lease.unlink(missing_ok=True)
+                continue
+            job['worker'] = worker
+            job['attempts'] += 1
+            _write_atomic(lease, json.dumps(job).encode('utf-8'))
+            return job_id, job['payload']
+        return None
+
+    def heartbeat(self, job_id: str) -> bool:
+        """Renew a lease; False if it was lost (expired and requeued)."""
+        try:
+            os.utime(self._path(_LEASED, job_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, job_id: str, result: Any) -> None:
+        _write_atomic(self._path(_RESULTS, job_id), pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        self._path(_LEASED, job_id).unlink(missing_ok=True)
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Give a claimed job back after an error: retried, or failed after max_attempts."""
+        lease = self._path(_LEASED, job_id)
+        job = _read_json(lease)
+        if job is None:
+            return
+        job['errors'].append(f"{job.get('worker', '?')}: {error}")
+        self._retry_or_fail(lease, job)
+
+    def _retry_or_fail(self, lease: Path, job: Dict[str, Any]) -> None:
+        target = _FAILED if job['attempts'] >= self.max_attempts else _PENDING
+        _write_atomic(self._path(target, job['id']), json.dumps(job).encode('utf-8'))
+        lease.unlink(missing_ok=True)
+
+
+class Heartbeat:
+    """Context manager renewing a job's lease from a background thread."""
+
+    def __init__(self, queue: JobQueue, job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        interval = max(0.1, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            if not self.queue.heartbeat(self.job_id):
+                return
+
+    def __enter__(self) -> 'Heartbeat':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
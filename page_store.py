@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Read-Once Source File Store
+===========================
+Page, block and symbol ``.ascii`` files are consulted by several extraction
+phases (graphics positions, wires, placements, text, styles, grid config).
+PageStore reads each file from disk once and hands the same decoded text (or
+raw bytes) to every phase that asks for it.
+
+Page files can also be handed out as read-only memory maps: the scanners
+then run straight over the OS page cache without a decoded copy.
+
+Buffers are kept in least-recently-used order under a memory cap; when the
+cap is exceeded the oldest buffers are dropped and simply re-read if a later
+phase needs them again.
+
+A store may be shared by phases running on several threads: the cache is
+guarded by a lock, while files are read and decoded outside it.
+
+read_ahead() pipelines the reads of a list of files: background threads read
+the next few files into the store while the caller parses the current one,
+bounded by a file count and a byte budget.
+"""
+
+import mmap
+import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Tuple, Union
+
+# Default memory cap for cached buffers (bytes)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Default read_ahead() limits: files and bytes read but not yet consumed
+DEFAULT_READ_AHEAD = 4
+DEFAULT_READ_AHEAD_BYTES = 256 * 1024 * 1024
+
+# Cache entries are keyed by (path, kind) where kind is 'text', 'raw' or 'mmap'
+_TEXT = 'text'
+_RAW = 'raw'
+_MMAP = 'mmap'
+
+
+class PageStore:
+    """
+    LRU cache of source file contents shared by ForensicExtractor phases.
+
+    text() returns the file decoded as UTF-8 with undecodable bytes dropped
+    (the way every phase has always read SDAX files); raw() returns the bytes.
+    A file already held as raw bytes is decoded from memory instead of being
+    read again. map() returns a read-only mmap of the file.
+
+    Files are read with ``reader`` (default: from disk); map() always maps
+    the file on disk.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 reader: Callable[[Path], bytes] = Path.read_bytes):
+        self.max_bytes = max_bytes
+        self.reader = reader
+        self._entries: 'OrderedDict[Tuple[Path, str], Union[str, bytes]]' = OrderedDict()
+        self._sizes: Dict[Tuple[Path, str], int] = {}
+        self.bytes_held = 0
+        self._lock = threading.RLock()
+        self.stats = {
+            'files_read': 0,
+            'bytes_read': 0,
+            'files_mapped': 0,
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+    def __contains__(self, path) -> bool:
+        path = Path(path)
+        with self._lock:
+            return any((path, kind) in self._entries for kind in (_TEXT, _RAW, _MMAP))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def raw(self, path) -> bytes:
+        """Return the file's bytes, reading it from disk at most once while cached."""
+        path = Path(path)
+        with self._lock:
+            data = self._get((path, _RAW))
+        if data is None:
+            data = self._read(path)
+            with self._lock:
+                self._put((path, _RAW), data)
+        return data
+
+    def text(self, path) -> str:
+        """Return the file decoded as UTF-8 (errors ignored)."""
+        path = Path(path)
+        with self._lock:
+            text = self._get((path, _TEXT))
+            data = self._entries.get((path, _RAW)) if text is None else None
+        if text is None:
+            if data is None:
+                data = self._read(path)
+            text = data.decode('utf-8', errors='ignore')
+            with self._lock:
+                self._put((path, _TEXT), text)
+        return text
+
+    def map(self, path) -> Union[mmap.mmap, bytes]:
+        """
+        Return a read-only memory map of the file (``b''`` for an empty file,
+        which cannot be mapped). The map is closed once it is evicted and no
+        caller holds it any more.
+        """
+        path = Path(path)
+        with self._lock:
+            view = self._get((path, _MMAP))
+            if view is None:
+                with open(path, 'rb') as f:
+                    if path.stat().st_size:
+                        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    else:
+                        view = b''
+                self.stats['files_mapped'] += 1
+                self._put((path, _MMAP), view)
+        return view
+
+    def read_ahead(self, paths: Iterable, kind: str = _TEXT, depth: int = DEFAULT_READ_AHEAD,
+                   max_bytes: int = DEFAULT_READ_AHEAD_BYTES) -> Iterator[Path]:
+        """
+        Yield ``paths`` in order, each once it is loaded into the store, while
+        ``depth`` background threads load the files after it.
+
+        ``kind`` is the accessor the caller will use: 'text', 'raw' or 'mmap'
+        (for maps the kernel is asked to read the pages in ahead). At most
+        ``depth`` files, and no more than ``max_bytes`` of them (one file
+        always goes), are loaded but not yet yielded. Read errors are not
+        raised here: the caller's own text()/raw()/map() call reads the file
+        again and raises as usual.
+        """
+        paths = [Path(p) for p in paths]
+        loader = {_TEXT: self.text, _RAW: self.raw, _MMAP: self._map_ahead}[kind]
+
+        def load(path: Path) -> None:
+            try:
+                loader(path)
+            except Exception:
+                pass
+
+        sizes = []
+        for path in paths:
+            try:
+                sizes.append(path.stat().st_size)
+            except OSError:
+                sizes.append(0)
+
+        with ThreadPoolExecutor(max_workers=max(1, depth)) as pool:
+            in_flight = deque()
+            bytes_in_flight = 0
+            submitted = 0
+            for i, path in enumerate(paths):
+                while submitted < len(paths) and len(in_flight) < max(1, depth) and (
+                        not in_flight or bytes_in_flight + sizes[submitted] <= max_bytes):
+                    in_flight.append(pool.submit(load, paths[submitted]))
+                    bytes_in_flight += sizes[submitted]
+                    submitted += 1
+                in_flight.popleft().result()
+                bytes_in_flight -= sizes[i]
+                yield path
+
+    def _map_ahead(self, path: Path) -> None:
+        view = self.map(path)
+        if isinstance(view, mmap.mmap) and hasattr(mmap, 'MADV_WILLNEED'):
+            view.madvise(mmap.MADV_WILLNEED)
+
+    def discard(self, path) -> None:
+        """Drop any buffers held for ``path`` (e.g. after the file changed)."""
+        path = Path(path)
+        with self._lock:
+            for key in ((path, _TEXT), (path, _RAW), (path, _MMAP)):
+                if key in self._entries:
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes_held = 0
+
+    def _read(self, path: Path) -> bytes:
+        data = self.reader(path)
+        with self._lock:
+            self.stats['files_read'] += 1
+            self.stats['bytes_read'] += len(data)
+        return data
+
+    def _get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value) -> None:
+        # A map counts at its mapped length, everything else at its object size
+        size = len(value) if isinstance(value, mmap.mmap) else sys.getsizeof(value)
+        if size > self.max_bytes:
+            # Larger than the whole cap: hand it out without caching
+            return
+        if key in self._entries:
+            # Read by two threads at once; keep the newer copy
+            self._remove(key)
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.bytes_held += size
+        while self.bytes_held > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats['evictions'] += 1
+
+    def _remove(self, key) -> None:
+        del self._entries[key]
+        self.bytes_held -= self._sizes.pop(key)
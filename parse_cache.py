@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Persistent Parse Cache
+======================
+Nightly runs re-extract designs where only a page or two changed. The parse
+cache keeps each page, block and cache symbol file's parsed records on disk,
+keyed by the file's content hash and the parser version, so an unchanged
+file is loaded instead of parsed again.
+
+    <cache>/<kind>/<key[:2]>/<key>.bin   zlib-compressed parsed records
+
+The parser version is a hash of the parser sources (version_of()); editing
+the parsers changes every key, and entries of older versions simply age out.
+Entries are written to a temporary name and renamed into place, so several
+extractors (threads, batch workers, hosts on a shared directory) can use one
+cache; a reader never sees a partial entry.
+
+The cache is bounded by ``max_bytes``: a hit touches the entry's mtime, and
+when the total grows past the limit the least recently used entries are
+deleted until it is back under 90% of it.
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Default size limit of the cache directory (bytes)
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# Eviction stops once the cache is back under this fraction of max_bytes
+_EVICT_TO = 0.9
+
+
+def version_of(paths: Iterable) -> str:
+    """Parser version: hash of the source files that define the parsers."""
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed file records (see module docstring).
+
+    get()/put() take and return the encoded records (bytes); the caller
+    decides the encoding per kind. stats counts hits, misses, writes,
+    evictions and the bytes held.
+    """
+
+    def __init__(self, directory, version: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.version = version
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'bytes': 0,
+        }
+
+    def key(self, kind: str, content_key: str, variant: str = '') -> str:
+        """Entry key of a file: its content hash, the parser version and a variant."""
+        return hashlib.sha1(f'{self.version}:{kind}:{variant}:{content_key}'.encode()).hexdigest()
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.directory / kind / key[:2] / f'{key}.bin'
+
+    def get(self, kind: str, key: str) -> Optional[bytes]:
+        """The entry's records, or None on a miss (or an unreadable entry)."""
+        path = self._path(kind, key)
+        try:
+            data = zlib.decompress(path.read_bytes())
+            os.utime(path)
+        except (OSError, zlib.error):
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        with self._lock:
+            self.stats['hits'] += 1
+        return data
+
+    def put(self, kind: str, key: str, data: bytes) -> None:
+        path = self._path(kind, key)
+        compressed = zlib.compress(data, 1)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            tmp.write_bytes(compressed)
+            os.replace(tmp, path)
+        except OSError:
+            # A full or read-only cache only costs the next run a parse
+            return
+        with self._lock:
+            self.stats['writes'] += 1
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._bytes += len(compressed)
+            self.stats['bytes'] = self._bytes
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every entry."""
+        entries = []
+        for path in self.directory.glob('*/*/*.bin'):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        # Rescan: other processes may have added or evicted entries meanwhile
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes * _EVICT_TO:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats['evictions'] += 1
+        self._bytes = total
+        self.stats['bytes'] = total
+
+    def summary(self) -> Dict[str, int]:
+        """Counters for the output statistics."""
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in self._entries())
+                self.stats['bytes'] = self._bytes
+            return dict(self.stats)
@@ -21,6 +21,8 @@ from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.lib.colors import HexColor, black, white
 import re
 from pathlib import Path
+
+from cache_pac import read_source
 
 
 IC_BODY_FILL = '#404040'     # Dark gray for IC bodies
@@ -661,11 +663,16 @@ class SchematicPDFRenderer:
                 c.line(r1x, r1y, r2x, r2y)
 
     def _parse_titleblock_from_cache(self, symbol_key: str) -> Dict:
-        """Parse a titleblock symbol directly from cache if not in symbol_library."""
-        try:
-            path = Path("cache") / f"{symbol_key}##sym_1.ascii"
-            content = path.read_text(errors='ignore')
-        except Exception:
+        """Parse a titleblock symbol directly from cache (or cache.pac) if not in symbol_library."""
+        name = f"{symbol_key}##sym_1.ascii"
+        content = None
+        for path in (Path("cache") / name, Path("cache.pac") / name):
+            try:
+                content = read_source(path).decode('utf-8', errors='ignore')
+                break
+            except Exception:
+                continue
+        if content is None:
             return {}
 
         symbol = {'lines': [], 'labels': []}
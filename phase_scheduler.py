@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Dependency-Aware Phase Scheduler
+================================
+ForensicExtractor phases read and write shared extractor state, so the order
+they run in matters: the page mapping has to exist before graphics positions
+are assigned to pages, symbol graphics before refdes/value labels are placed,
+and so on. Instead of a hand-ordered main(), every phase declares
+
+- ``requires``: artifacts it needs; their phases always run first and are
+  pulled into partial runs,
+- ``after``:    artifacts it has to follow only if their phase runs at all
+  (optional phases such as the prefetch, or primitives appended in order),
+- ``provides``: artifacts it produces (each artifact has a single phase).
+
+PhaseScheduler turns the declarations into a DAG. plan() picks the phases a
+set of targets needs (every phase by default) in dependency order, check()
+rejects an explicit order that runs a phase before one it depends on, and
+run() executes a plan, starting every phase whose dependencies are done on a
+thread pool so that independent phases overlap. The console output of a
+phase run on the pool is held back until the phase finishes and then
+written in one piece, so overlapping phases never interleave their lines.
+"""
+
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class PhaseOrderError(ValueError):
+    """A phase table or phase order that violates the declared dependencies."""
+
+
+class Phase:
+    """
+    One extraction phase: ``run`` is called without arguments. A phase that
+    returns False fails the run; phases depending on it are not started.
+    """
+
+    __slots__ = ('name', 'run', 'requires', 'after', 'provides')
+
+    def __init__(self, name: str, run: Callable[[], Optional[bool]],
+                 requires: Iterable[str] = (), provides: Iterable[str] = (),
+                 after: Iterable[str] = ()):
+        self.name = name
+        self.run = run
+        self.requires: Tuple[str, ...] = tuple(requires)
+        self.provides: Tuple[str, ...] = tuple(provides)
+        self.after: Tuple[str, ...] = tuple(after)
+
+    def __repr__(self):
+        return f'Phase({self.name!r})'
+
+
+class _PhaseOutput:
+    """
+    sys.stdout while phases run on the pool: what a phase thread prints is
+    buffered per thread and written to ``stream`` when its phase finishes.
+    Other threads (a phase's own helper pools) write straight through.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            buffer.append(text)
+            return len(text)
+        with self._lock:
+            return self.stream.write(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def run(self, phase: Phase) -> Optional[bool]:
+        """Run ``phase`` in this thread, then write out everything it printed."""
+        self._local.buffer = []
+        try:
+            return phase.run()
+        finally:
+            text = ''.join(self._local.buffer)
+            self._local.buffer = None
+            with self._lock:
+                self.stream.write(text)
+                self.stream.flush()
+
+
+class PhaseScheduler:
+    """DAG of phases built from their requires/after/provides declarations."""
+
+    def __init__(self, phases: Iterable[Phase]):
+        self.phases: Dict[str, Phase] = {}
+        self._providers: Dict[str, str] = {}   # artifact -> phase name
+        for phase in phases:
+            if phase.name in self.phases:
+                raise PhaseOrderError(f"duplicate phase '{phase.name}'")
+            self.phases[phase.name] = phase
+            for artifact in phase.provides:
+                if artifact in self._providers:
+                    raise PhaseOrderError(
+                        f"'{artifact}' is provided by both '{self._providers[artifact]}' "
+                        f"and '{phase.name}'")
+                self._providers[artifact] = phase.name
+
+        for phase in self.phases.values():
+            for artifact in phase.requires:
+                if artifact not in self._providers:
+                    raise PhaseOrderError(
+                        f"phase '{phase.name}' requires '{artifact}', which no phase provides")
+
+        # Rejects cycles
+        self.plan()
+
+    def dependencies(self, name: str, selected: Optional[Set[str]] = None) -> Set[str]:
+        """Phases ``name`` waits for, among ``selected`` (default: all phases)."""
+        phase = self.phases[name]
+        deps = set()
+        for artifact in phase.requires + phase.after:
+            provider = self._providers.get(artifact)
+            if provider is not None and provider != name and (selected is None or provider in selected):
+                deps.add(provider)
+        return deps
+
+    def select(self, targets: Optional[Iterable[str]] = None) -> Set[str]:
+        """``targets`` and every phase they transitively require (default: all phases)."""
+        if targets is None:
+            return set(self.phases)
+        selected: Set[str] = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.phases:
+                raise PhaseOrderError(
+                    f"unknown phase '{name}' (phases: {', '.join(self.phases)})")
+            if name in selected:
+                continue
+            selected.add(name)
+            stack.extend(self._providers[artifact] for artifact in self.phases[name].requires)
+        return selected
+
+    def plan(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Phases needed for ``targets`` in an order that satisfies every
+        dependency; among phases that are ready, declaration order wins.
+        """
+        selected = self.select(targets)
+        deps = {name: self.dependencies(name, selected) for name in selected}
+        order: List[str] = []
+        done: Set[str] = set()
+        while len(order) < len(selected):
+            ready = [name for name in self.phases
+                     if name in selected and name not in done and deps[name] <= done]
+            if not ready:
+                stuck = sorted(selected - done)
+                raise PhaseOrderError(f"dependency cycle among phases: {', '.join(stuck)}")
+            order.append(ready[0])
+            done.add(ready[0])
+        return order
+
+    def check(self, order: List[str]) -> None:
+        """
+        Raise PhaseOrderError unless running ``order`` sequentially satisfies
+        every dependency: required phases are present, and every phase comes
+        after the phases it depends on.
+        """
+        position = {name: i for i, name in enumerate(order)}
+        for name in order:
+            if name not in self.phases:
+                raise PhaseOrderError(f"unknown phase '{name}'")
+            for artifact in self.phases[name].requires:
+                if self._providers[artifact] not in position:
+                    raise PhaseOrderError(
+                        f"phase '{name}' requires '{artifact}' from phase "
+                        f"'{self._providers[artifact]}', which is not in the order")
+            for dep in self.dependencies(name, set(position)):
+                if position[dep] > position[name]:
+                    raise PhaseOrderError(f"phase '{name}' must run after '{dep}'")
+
+    def run(self, targets: Optional[Iterable[str]] = None, workers: int = 1) -> bool:
+        """
+        Run the plan for ``targets`` on up to ``workers`` threads. With one
+        worker the phases run one after the other in plan() order; with more,
+        each phase's console output appears in one piece once it finishes.
+
+        Returns False as soon as a phase returns False (phases already
+        running are finished, nothing new is started). An exception raised
+        by a phase propagates once the running phases are done.
+        """
+        order = self.plan(targets)
+        if workers <= 1:
+            for name in order:
+                if self.phases[name].run() is False:
+                    return False
+            return True
+
+        selected = set(order)
+        deps = {name: self.dependencies(name, selected) for name in order}
+        pending = list(order)
+        done: Set[str] = set()
+        ok = True
+        output = sys.stdout = _PhaseOutput(sys.stdout)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                running = {}
+                while pending or running:
+                    if ok:
+                        for name in [n for n in pending if deps[n] <= done]:
+                            pending.remove(name)
+                            running[pool.submit(output.run, self.phases[name])] = name
+                    if not running:
+                        break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = running.pop(future)
+                        if future.result() is False:
+                            ok = False
+                        done.add(name)
+        finally:
+            sys.stdout = output.stream
+        return ok
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Columnar Page Scan Transport
+============================
+With --jobs N the page walks run in worker processes. A page scan is a few
+hundred small dicts and tuples (wire points, placements, labels); pickling
+them in the worker and rebuilding them from the pickle in the parent costs a
+good share of what the parallel walk saves.
+
+Instead, a worker packs the scan into typed columns in one
+multiprocessing.shared_memory segment:
+
+- integers (coordinates, offsets, style ids, rotations) as int64 arrays,
+- floats (font sizes) as float64 arrays, None as NaN,
+- strings (graphics ids, transforms, label text) as int32 ids into a string
+  table stored once per segment (the strings joined as UTF-8, plus each
+  one's end in characters), None as -1,
+- wire points as one flat x,y int64 array plus per-wire end offsets.
+
+Only a PackedScan handle (segment name and column layout) goes through the
+pool's pipe. The parent attaches to the segment (ScanColumns), reads the
+columns straight from it, rebuilds the scan the page phases expect and
+unlinks the segment.
+
+A scan that does not fit the schema (an unexpected field, an integer beyond
+int64) or a platform without shared memory falls back to the plain dict.
+
+scan_to_bytes() / scan_from_bytes() store the same columns in a bytes object
+(the parse cache keeps page scans that way).
+"""
+
+import math
+import pickle
+import struct
+from array import array
+from itertools import chain, repeat
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Record layouts of a PageWalker scan: (path into the scan, record shape, fields).
+# Field kinds: 'int', 'float' (or None), 'str' (or None), 'points' ([{'x', 'y'}, ...]).
+# Dict records are rebuilt with their keys in this order.
+SCAN_SCHEMA = (
+    (('graphics',), tuple, (
+        ('gid', 'str'), ('x', 'int'), ('y', 'int'), ('offset', 'int'))),
+    (('wires',), dict, (
+        ('offset', 'int'), ('points', 'points'), ('cgtype', 'int'), ('style_id', 'int'),
+        ('table_num', 'int'), ('rotation', 'int'), ('transform_str', 'str'),
+        ('z_value', 'int'))),
+    (('placements',), dict, (
+        ('offset', 'int'), ('transform_str', 'str'), ('x', 'int'), ('y', 'int'),
+        ('rotation', 'int'), ('z_value', 'int'), ('instance_name', 'str'))),
+    (('text', 'net_labels'), dict, (
+        ('offset', 'int'), ('text', 'str'), ('x', 'int'), ('y', 'int'),
+        ('rotation', 'int'), ('justification', 'int'))),
+    (('text', 'html_blocks'), dict, (
+        ('text', 'str'), ('font_size', 'float'), ('font_weight', 'str'),
+        ('offset', 'int'), ('x', 'int'), ('y', 'int'))),
+    (('text', 'inline_html'), dict, (
+        ('text', 'str'), ('font_size', 'float'), ('font_weight', 'str'),
+        ('offset', 'int'), ('x', 'int'), ('y', 'int'))),
+    (('text', 'pin_labels'), dict, (
+        ('offset', 'int'), ('text', 'str'), ('x', 'int'), ('y', 'int'))),
+)
+
+# Column key: (section path, field, part); part is '' except for the string
+# table ('strings' section) and the points end offsets ('ends')
+ColumnKey = Tuple[Tuple[str, ...], str, str]
+
+_STRINGS: Tuple[str, ...] = ('strings',)
+_ALIGN = 8
+
+
+class PackedScan:
+    """
+    Handle to a page scan packed into a shared memory segment: the segment
+    name, each column's (key, typecode, byte offset, item count) and each
+    section's record count. Small enough to pickle cheaply.
+    """
+
+    __slots__ = ('name', 'columns', 'counts')
+
+    def __init__(self, name: str, columns: List[Tuple[ColumnKey, str, int, int]],
+                 counts: Dict[Tuple[str, ...], int]):
+        self.name = name
+        self.columns = columns
+        self.counts = counts
+
+    def __getstate__(self):
+        return self.name, self.columns, self.counts
+
+    def __setstate__(self, state):
+        self.name, self.columns, self.counts = state
+
+    def __repr__(self):
+        return f'PackedScan({self.name!r})'
+
+
+# =============================================================================
+# WORKER SIDE
+# =============================================================================
+
+def _section(scan: Dict[str, Any], path: Tuple[str, ...]) -> List[Any]:
+    value = scan
+    for key in path:
+        value = value[key]
+    return value
+
+
+def _encode_columns(scan: Dict[str, Any]) -> Tuple[List[Tuple[ColumnKey, array]],
+                                                   Dict[Tuple[str, ...], int]]:
+    """
+    The scan as typed arrays. Raises KeyError, TypeError or OverflowError
+    (or ValueError) when it does not match SCAN_SCHEMA.
+    """
+    if set(scan) != {path[0] for path, _, _ in SCAN_SCHEMA} or \
+            set(scan['text']) != {path[1] for path, _, _ in SCAN_SCHEMA if len(path) > 1}:
+        raise KeyError('scan sections differ from SCAN_SCHEMA')
+
+    strings: Dict[str, int] = {}
+    columns: List[Tuple[ColumnKey, array]] = []
+    counts: Dict[Tuple[str, ...], int] = {}
+
+    def string_id(value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        if type(value) is not str:
+            raise TypeError(f'expected str, got {type(value).__name__}')
+        return strings.setdefault(value, len(strings))
+
+    for path, shape, fields in SCAN_SCHEMA:
+        records = _section(scan, path)
+        counts[path] = len(records)
+        names = [name for name, _ in fields]
+        for record in records:
+            if type(record) is not shape or len(record) != len(fields) or (
+                    shape is dict and list(record) != names):
+                raise KeyError(f'{"/".join(path)} record differs from SCAN_SCHEMA')
+
+        for i, (name, kind) in enumerate(fields):
+            values = [record[i] for record in records] if shape is tuple else \
+                [record[name] for record in records]
+            if kind == 'int':
+                if any(type(v) is not int for v in values):
+                    raise TypeError(f'{name}: expected int')
+                columns.append(((path, name, ''), array('q', values)))
+            elif kind == 'float':
+                if any(v is not None and type(v) is not float for v in values):
+                    raise TypeError(f'{name}: expected float')
+                columns.append(((path, name, ''),
+                                array('d', [math.nan if v is None else v for v in values])))
+            elif kind == 'str':
+                columns.append(((path, name, ''), array('i', [string_id(v) for v in values])))
+            else:
+                xy = array('q')
+                ends = array('q')
+                for points in values:
+                    for point in points:
+                        if len(point) != 2 or type(point['x']) is not int or type(point['y']) is not int:
+                            raise TypeError(f'{name}: expected {{x, y}} int points')
+                        xy.append(point['x'])
+                        xy.append(point['y'])
+                    ends.append(len(xy))
+                columns.append(((path, name, ''), xy))
+                columns.append(((path, name, 'ends'), ends))
+
+    ends = []
+    total = 0
+    for value in strings:
+        total += len(value)
+        ends.append(total)
+    columns.append(((_STRINGS, 'blob', ''), array('B', ''.join(strings).encode('utf-8'))))
+    columns.append(((_STRINGS, 'ends', ''), array('q', ends)))
+    return columns, counts
+
+
+def pack_scan(scan: Dict[str, Any]) -> Union[PackedScan, Dict[str, Any]]:
+    """
+    Pack a page scan into a new shared memory segment and return its handle;
+    the scan itself if it cannot be packed. The caller of unpack_scan()
+    owns (and unlinks) the segment.
+    """
+    try:
+        columns, counts = _encode_columns(scan)
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return scan
+
+    layout, size = _layout(columns)
+    try:
+        segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    except OSError:
+        return scan
+    try:
+        _write_columns(segment.buf, layout, columns)
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    segment.close()
+    return PackedScan(segment.name, layout, counts)
+
+
+def scan_to_bytes(scan: Dict[str, Any]) -> Optional[bytes]:
+    """
+    The scan's columns as one bytes object: header length, pickled layout
+    and record counts, then the column buffer. None if it cannot be packed.
+    """
+    try:
+        columns, counts = _encode_columns(scan)
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+    layout, size = _layout(columns)
+    header = pickle.dumps((layout, counts), pickle.HIGHEST_PROTOCOL)
+    start = -(-(8 + len(header)) // _ALIGN) * _ALIGN
+    data = bytearray(start + size)
+    struct.pack_into('<Q', data, 0, len(header))
+    data[8:8 + len(header)] = header
+    with memoryview(data) as view:
+        _write_columns(view[start:], layout, columns)
+    return bytes(data)
+
+
+def scan_from_bytes(data: bytes) -> Dict[str, Any]:
+    """The page scan stored by scan_to_bytes()."""
+    (header_size,) = struct.unpack_from('<Q', data)
+    layout, counts = pickle.loads(data[8:8 + header_size])
+    start = -(-(8 + header_size) // _ALIGN) * _ALIGN
+    with memoryview(data) as view:
+        columns = ScanColumns(PackedScan(None, layout, counts), view[start:])
+        try:
+            return columns.scan()
+        finally:
+            columns.close()
+
+
+def _layout(columns: List[Tuple[ColumnKey, array]]) -> Tuple[List[Tuple[ColumnKey, str, int, int]], int]:
+    """Each column's (key, typecode, byte offset, item count) and the buffer size."""
+    layout = []
+    size = 0
+    for key, column in columns:
+        layout.append((key, column.typecode, size, len(column)))
+        size += -(-len(column) * column.itemsize // _ALIGN) * _ALIGN
+    return layout, size
+
+
+def _write_columns(buffer, layout, columns: List[Tuple[ColumnKey, array]]) -> None:
+    for (_, _, offset, _), (_, column) in zip(layout, columns):
+        data = memoryview(column).cast('B')
+        buffer[offset:offset + len(data)] = data
+        data.release()
+
+
+# =============================================================================
+# PARENT SIDE
+# =============================================================================
+
+class ScanColumns:
+    """
+    A PackedScan attached in this process (or, with ``buffer``, columns laid
+    out the same way in any buffer). column() returns a typed memoryview
+    straight over the shared segment (no copy); records() and scan()
+    rebuild the page phases' records from the columns.
+
+    Use as a context manager; the views must not be used after close().
+    """
+
+    def __init__(self, packed: PackedScan, buffer=None):
+        self.packed = packed
+        self._segment = None
+        if buffer is None:
+            self._segment = shared_memory.SharedMemory(name=packed.name)
+            buffer = self._segment.buf
+        self._buffer = buffer
+        self._layout = {key: (typecode, offset, count)
+                        for key, typecode, offset, count in packed.columns}
+        self._views: List[memoryview] = []
+        self._strings: Optional[List[str]] = None
+
+    def __enter__(self) -> 'ScanColumns':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def column(self, path: Tuple[str, ...], field: str, part: str = '') -> memoryview:
+        typecode, offset, count = self._layout[(path, field, part)]
+        view = self._buffer[offset:offset + count * array(typecode).itemsize].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def strings(self) -> List[str]:
+        """The segment's string table; str columns hold indices into it."""
+        if self._strings is None:
+            joined = str(self.column(_STRINGS, 'blob'), 'utf-8')
+            ends = self.column(_STRINGS, 'ends').tolist()
+            self._strings = [joined[start:end] for start, end in zip(chain((0,), ends), ends)]
+        return self._strings
+
+    def records(self, path: Tuple[str, ...]) -> List[Any]:
+        """The records of one SCAN_SCHEMA section, as the page walker made them."""
+        shape, fields = next((shape, fields) for p, shape, fields in SCAN_SCHEMA if p == path)
+        columns = []
+        for name, kind in fields:
+            values = self.column(path, name).tolist()
+            if kind == 'float':
+                values = [None if math.isnan(v) else v for v in values]
+            elif kind == 'str':
+                strings = self.strings()
+                values = [None if i < 0 else strings[i] for i in values]
+            elif kind == 'points':
+                ends = self.column(path, name, 'ends').tolist()
+                values = [[{'x': values[i], 'y': values[i + 1]} for i in range(start, end, 2)]
+                          for start, end in zip(chain((0,), ends), ends)]
+            columns.append(values)
+
+        if not columns or not self.packed.counts[path]:
+            return []
+        if shape is tuple:
+            return list(zip(*columns))
+        names = [name for name, _ in fields]
+        return list(map(dict, map(zip, repeat(names), zip(*columns))))
+
+    def scan(self) -> Dict[str, Any]:
+        """The whole page scan, equal to what PageWalker.walk() returned."""
+        scan: Dict[str, Any] = {}
+        for path, _, _ in SCAN_SCHEMA:
+            target = scan
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = self.records(path)
+        return scan
+
+    def close(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self._buffer = None
+        if self._segment is not None:
+            self._segment.close()
+
+    def unlink(self) -> None:
+        self._segment.unlink()
+
+
+def unpack_scan(packed: Union[PackedScan, Dict[str, Any], None]) -> Optional[Dict[str, Any]]:
+    """
+    The page scan behind a pack_scan() result, freeing its segment. Plain
+    scans (and None) are passed through.
+    """
+    if not isinstance(packed, PackedScan):
+        return packed
+    columns = ScanColumns(packed)
+    try:
+        return columns.scan()
+    finally:
+        columns.close()
+        columns.unlink()
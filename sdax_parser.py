@@ -0,0 +1,752 @@
+#!/usr/bin/env python3
+"""
+SDAX Tagged Page Grammar
+========================
+Tokenizer for the Cadence SDAX ``.ascii`` page/symbol format.
+
+The format is a stream of angle-bracket tokens:
+
+    <version 13 />  < 4 />  <  <  < 1 />  < 55 />  ...  />  />
+    < 40 />  < 6 />  <n zValue n/>  < 1 />  < 5 />  <v 10000 v/>
+
+Token kinds:
+- OPEN   ``<``            starts a nested list
+- CLOSE  ``/>``           ends the innermost list
+- ATOM   ``< 45 />``      scalar (tag code, coordinate, identifier)
+- NAME   ``<n LP n/>``    property name
+- VALUE  ``<v ... v/>``   property value
+- STRING ``< <html>.. />`` length-prefixed atom whose payload contains ``<``
+           (Qt rich text, bus names such as ``DSP_XID<3..0>``)
+
+Payloads that contain ``<`` (Qt rich-text HTML) cannot be delimited by
+scanning for the closing bracket; they are always preceded by a length atom
+(``< 494 />  < <!DOCTYPE ... </html> />``) which is used to skip them exactly.
+
+RecordTree gives the nesting of a whole file: every list becomes a record
+with its tag code (the atom before it), byte span and parent, so "the
+rotation of this wire" is a lookup in the wire's property record instead of
+a regex over a fixed window of characters.
+
+Every scanner accepts either decoded text or a raw ``bytes``/``mmap`` buffer
+of the file (the format is pure ASCII). With a raw buffer the page is never
+decoded as a whole; only the text of the tokens and fields actually read is.
+
+Page phases do not tokenize every byte in Python. Each consumer registers the
+tokens that start the records it cares about; PageWalker compiles all of them
+into one scanner, walks each page once, and dispatches every trigger to its
+consumer. Consumers then read the neighbouring tokens with next_token() /
+read_tokens() / read_shape(), which only touch the bytes of the record
+itself.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+# Token kinds
+TOK_OPEN = 0
+TOK_CLOSE = 1
+TOK_ATOM = 2
+TOK_NAME = 3
+TOK_VALUE = 4
+TOK_STRING = 5
+
+# Token tuple layout: (kind, text, start, end)
+Token = Tuple[int, str, int, int]
+
+_TOKEN_BODY = (
+    r'<n\s+(?P<name>[^<]*?)\s+n/>'      # property name
+    r'|<v\s(?P<value>[^<]*?)\s*v/>'     # plain property value
+    r'|<\s*(?P<atom>[^<]*?)\s*/>'       # scalar atom
+    r'|(?P<lstr><v\s|<\s(?=<\S|[^<>/\s][^<>/]*<))'  # length-prefixed payload containing '<'
+    r'|(?P<open><)'
+    r'|(?P<close>/>)'
+)
+
+
+class Pattern:
+    """
+    A regex compiled for both ``str`` content and ``bytes``/``mmap`` buffers.
+
+    search/match/finditer/findall pick the variant matching the content they
+    are given, so the same scanner runs over decoded text or a mapped file.
+    Groups of a buffer match are ``bytes``; use as_text() on the ones kept.
+    """
+
+    __slots__ = ('pattern', 'text', 'binary')
+
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern = pattern
+        self.text = re.compile(pattern, flags)
+        self.binary = re.compile(pattern.encode('ascii'), flags)
+
+    def on(self, content) -> 're.Pattern':
+        return self.text if isinstance(content, str) else self.binary
+
+    def search(self, content, *span):
+        return self.on(content).search(content, *span)
+
+    def match(self, content, *span):
+        return self.on(content).match(content, *span)
+
+    def finditer(self, content, *span):
+        return self.on(content).finditer(content, *span)
+
+    def findall(self, content, *span):
+        return self.on(content).findall(content, *span)
+
+
+def as_text(value) -> str:
+    """Decode a field read from a raw buffer; text passes through unchanged."""
+    if isinstance(value, str):
+        return value
+    return bytes(value).decode('utf-8', errors='ignore')
+
+
+def _literal(content, text: str):
+    """``text`` in the same string type as ``content``."""
+    return text if isinstance(content, str) else text.encode('ascii')
+
+
+_TOKEN_RE = Pattern(_TOKEN_BODY)
+_NEXT_TOKEN_RE = Pattern(r'\s*(?:' + _TOKEN_BODY + r')')
+
+_LSTR_VALUE_END_RE = Pattern(r'\s*v/>')
+_LSTR_ATOM_END_RE = Pattern(r'\s*/>')
+_LAZY_VALUE_RE = Pattern(r'<v\s*(.*?)\s*v/>', re.DOTALL)
+_LAZY_ATOM_RE = Pattern(r'<\s*(.*?)\s*/>', re.DOTALL)
+
+_GROUP_KINDS = {
+    'name': TOK_NAME,
+    'value': TOK_VALUE,
+    'atom': TOK_ATOM,
+}
+
+
+def _read_length_prefixed(content, start: int, payload_start: int,
+                          prev: Optional[Token]) -> Token:
+    """
+    Read a value or atom whose payload contains ``<``, using the preceding
+    length atom ``prev``. Falls back to OPEN when there is no usable length.
+    """
+    is_value = content[start:start + 2] == _literal(content, '<v')
+
+    if prev is not None and prev[0] == TOK_ATOM and prev[1].isdigit():
+        length = int(prev[1])
+        end_re = _LSTR_VALUE_END_RE if is_value else _LSTR_ATOM_END_RE
+        end = end_re.match(content, payload_start + length)
+        if end:
+            text = as_text(content[payload_start:payload_start + length]).strip()
+            return (TOK_VALUE if is_value else TOK_STRING, text, start, end.end())
+
+    # No usable length prefix - fall back to the first terminator
+    # (e.g. ``< 19 />  < 19:REFSEL<2>!~:15:... />`` where 19 is a tag code)
+    if is_value:
+        lazy = _LAZY_VALUE_RE.match(content, start)
+        if lazy:
+            return (TOK_VALUE, as_text(lazy.group(1)), start, lazy.end())
+    elif content[payload_start:payload_start + 1] != _literal(content, '<'):
+        lazy = _LAZY_ATOM_RE.match(content, start)
+        if lazy:
+            return (TOK_STRING, as_text(lazy.group(1)), start, lazy.end())
+
+    # Not a string atom after all - this '<' opens a nested list
+    return (TOK_OPEN, '<', start, start + 1)
+
+
+def next_token(content, pos: int, prev: Optional[Token] = None,
+               endpos: Optional[int] = None) -> Optional[Token]:
+    """
+    Read the token starting at (or after whitespace from) ``pos``.
+
+    ``prev`` is the token immediately before ``pos`` and is only needed to
+    resolve length-prefixed payloads. Returns None at end of input or when the
+    text at ``pos`` is not a token.
+    """
+    if endpos is None:
+        endpos = len(content)
+    m = _NEXT_TOKEN_RE.match(content, pos, endpos)
+    if not m:
+        return None
+    group = m.lastgroup
+    kind = _GROUP_KINDS.get(group)
+    if kind is not None:
+        return (kind, as_text(m.group(group)), content.find(_literal(content, '<'), pos), m.end())
+    if group == 'open':
+        return (TOK_OPEN, '<', m.start(group), m.end())
+    if group == 'close':
+        return (TOK_CLOSE, '/>', m.start(group), m.end())
+    return _read_length_prefixed(content, m.start(group), m.end(), prev)
+
+
+def read_tokens(content, pos: int, count: int,
+                prev: Optional[Token] = None) -> List[Token]:
+    """Read up to ``count`` consecutive tokens starting at ``pos``."""
+    tokens: List[Token] = []
+    for _ in range(count):
+        token = next_token(content, pos, prev)
+        if token is None:
+            break
+        tokens.append(token)
+        pos = token[3]
+        prev = token
+    return tokens
+
+
+def previous_token(content, pos: int) -> Optional[Token]:
+    """
+    Return the token that ends immediately before ``pos`` (ignoring
+    whitespace), or None if there is none.
+    """
+    end = pos
+    while end > 0 and content[end - 1:end].isspace():
+        end -= 1
+    if end < 2 or content[end - 2:end] != _literal(content, '/>'):
+        return None
+    start = content.rfind(_literal(content, '<'), 0, end)
+    if start != -1:
+        m = _TOKEN_RE.match(content, start)
+        if m and m.end() == end and m.lastgroup in _GROUP_KINDS:
+            kind = _GROUP_KINDS[m.lastgroup]
+            return (kind, as_text(m.group(m.lastgroup)), start, end)
+    return (TOK_CLOSE, '/>', end - 2, end)
+
+
+# OPEN/CLOSE/ATOM shapes compiled to one regex (see _compile_shape), by shape
+_SHAPE_PATTERNS: Dict[Tuple, Optional['_ShapePattern']] = {}
+
+# An OPEN is a '<' that does not start an atom (no '/>' before the next '<')
+# or a length-prefixed payload
+_SHAPE_OPEN = r'\s*(<)(?![^<]*/>)(?!\s(?:<\S|[^<>/\s][^<>/]*<))'
+_SHAPE_CLOSE = r'\s*(/>)'
+
+
+class _ShapePattern:
+    """A token shape as one regex; read() returns the same tokens as read_shape()."""
+
+    __slots__ = ('pattern', 'kinds')
+
+    def __init__(self, pattern: str, kinds: List[int]):
+        self.pattern = Pattern(pattern)
+        self.kinds = kinds
+
+    def read(self, content, pos: int) -> Optional[List[Token]]:
+        m = self.pattern.match(content, pos)
+        if m is None:
+            return None
+        tokens: List[Token] = []
+        group = 1
+        for kind in self.kinds:
+            if kind == TOK_ATOM:
+                tokens.append((TOK_ATOM, as_text(m.group(group + 1)), m.start(group), m.end(group)))
+                group += 2
+            else:
+                start = m.start(group)
+                tokens.append((kind, '<' if kind == TOK_OPEN else '/>', start, m.end(group)))
+                group += 1
+        return tokens
+
+
+def _compile_shape(shape) -> Optional[_ShapePattern]:
+    """
+    The shape as one regex, when every token is an OPEN, a CLOSE or an ATOM
+    whose pattern cannot match whitespace, '<' or '/' (so the atom text it
+    matches is the whole atom); None for other shapes.
+    """
+    parts = []
+    for kind, pattern in shape:
+        if kind == TOK_OPEN:
+            parts.append(_SHAPE_OPEN)
+        elif kind == TOK_CLOSE:
+            parts.append(_SHAPE_CLOSE)
+        elif kind == TOK_ATOM and pattern is not None and isinstance(pattern.pattern, str) \
+                and pattern.groups == 0 and not any(pattern.search(c) for c in (' ', '\t', '\n', '<', '/')):
+            parts.append(r'\s*(<\s*(' + pattern.pattern + r')\s*/>)')
+        else:
+            return None
+    return _ShapePattern(''.join(parts), [kind for kind, _ in shape])
+
+
+def read_shape(content, pos: int,
+               shape: Tuple[Tuple[int, Optional['re.Pattern']], ...]) -> Optional[List[Token]]:
+    """
+    Read tokens from ``pos`` while they match ``shape``: a sequence of
+    (kind, pattern) pairs where pattern is a compiled regex the token text must
+    fullmatch, or None. Stops at the first mismatch and returns None, so a
+    failed shape only costs the tokens read up to that point.
+
+    Shapes of plain lists and atoms (coordinate blocks, pin labels) are
+    matched as one compiled regex instead of token by token.
+    """
+    if shape not in _SHAPE_PATTERNS:
+        _SHAPE_PATTERNS[shape] = _compile_shape(shape)
+    compiled = _SHAPE_PATTERNS[shape]
+    if compiled is not None:
+        return compiled.read(content, pos)
+
+    tokens: List[Token] = []
+    prev = None
+    for kind, pattern in shape:
+        token = next_token(content, pos, prev)
+        if token is None or token[0] != kind:
+            return None
+        if pattern is not None and not pattern.fullmatch(token[1]):
+            return None
+        tokens.append(token)
+        pos = token[3]
+        prev = token
+    return tokens
+
+
+def tokenize(content, pos: int = 0, endpos: Optional[int] = None) -> List[Token]:
+    """
+    Tokenize SDAX content into a flat list of (kind, text, start, end) tuples.
+
+    This materializes every token and is meant for callers that need the whole
+    stream (or a record's worth of it); page phases should prefer PageWalker
+    triggers.
+    """
+    if endpos is None:
+        endpos = len(content)
+    tokens: List[Token] = []
+    append = tokens.append
+    prev = None
+
+    while True:
+        resume = None
+        for m in _TOKEN_RE.finditer(content, pos, endpos):
+            group = m.lastgroup
+            kind = _GROUP_KINDS.get(group)
+            if kind is not None:
+                prev = (kind, as_text(m.group(group)), m.start(), m.end())
+            elif group == 'open':
+                prev = (TOK_OPEN, '<', m.start(), m.end())
+            elif group == 'close':
+                prev = (TOK_CLOSE, '/>', m.start(), m.end())
+            else:
+                prev = _read_length_prefixed(content, m.start(), m.end(), prev)
+                append(prev)
+                resume = prev[3]
+                break
+            append(prev)
+        if resume is None:
+            return tokens
+        pos = resume
+
+
+# =============================================================================
+# RECORD TREE
+# =============================================================================
+# Structural tokens. OPEN is a '<' followed by a nested token (or starting an
+# ``<e ... e/>`` list); CLOSE is a '/>' that follows another token's '/>'
+# with only whitespace, an ``e`` or bare text in between. Table cells carry a
+# bare-text markup payload prefixed by its length
+# (``< 9 /> ROW COL LENGTH <!DOCTYPE ...``) which must be skipped.
+_OPEN_RE = Pattern(r'<(?=\s*<[\s<n]|e\s)')
+_CLOSE_RE = Pattern(r'/>\s+(?:e|[^<\s/][^<]*?\s)?(?=/>)')
+_CELL_RE = Pattern(r'/>\s+\d+\s+\d+\s+(\d+)\s(?=<)')
+_CLOSE_AFTER_RE = Pattern(r'\s*/>')
+
+
+class Record:
+    """
+    A nested list ``< ... />`` of an SDAX file.
+
+    ``tag`` is the code of the atom directly before the list, so
+    ``< 45 />  <  < 0 />  < X />  < 0 />  < Y />  />`` is a Tag 45 record;
+    ``start``/``end`` is its byte span. Records are light views into their
+    RecordTree.
+    """
+
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree: 'RecordTree', index: int):
+        self.tree = tree
+        self.index = index
+
+    def __repr__(self):
+        return f'Record(tag={self.tag}, span=({self.start}, {self.end}))'
+
+    def __eq__(self, other):
+        return isinstance(other, Record) and other.tree is self.tree and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    @property
+    def start(self) -> int:
+        return self.tree.starts[self.index]
+
+    @property
+    def end(self) -> int:
+        return self.tree.ends[self.index]
+
+    @property
+    def tag(self) -> Optional[int]:
+        return self.tree.tag(self.index)
+
+    @property
+    def text(self) -> str:
+        return as_text(self.tree.content[self.start:self.end])
+
+    @property
+    def parent(self) -> Optional['Record']:
+        return self.tree.record(self.tree.parents[self.index])
+
+    def ancestors(self):
+        """Yield the enclosing records, innermost first."""
+        record = self.parent
+        while record is not None:
+            yield record
+            record = record.parent
+
+    def children(self) -> List['Record']:
+        """Direct child records, in file order."""
+        return self.tree.children(self.index)
+
+    def find(self, tag: int) -> List['Record']:
+        """Direct child records with the given tag code."""
+        return [child for child in self.children() if child.tag == tag]
+
+    def next_sibling(self) -> Optional['Record']:
+        tree = self.tree
+        following = bisect_left(tree.starts, self.end, self.index + 1)
+        if following < len(tree.starts) and tree.parents[following] == tree.parents[self.index]:
+            return tree.record(following)
+        return None
+
+    def previous_sibling(self) -> Optional['Record']:
+        parents = self.tree.parents
+        parent = parents[self.index]
+        previous = self.index - 1
+        while previous > parent and parents[previous] != parent:
+            previous = parents[previous]
+        return self.tree.record(previous) if previous > parent else None
+
+    def tokens(self) -> List[Token]:
+        """
+        This record's own tokens. Each child record appears as a single OPEN
+        token spanning the whole child.
+        """
+        content = self.tree.content
+        tokens: List[Token] = []
+        pos = self.start + 1
+        for child in self.children():
+            tokens.extend(tokenize(content, pos, child.start))
+            tokens.append((TOK_OPEN, '<', child.start, child.end))
+            pos = child.end
+        tokens.extend(tokenize(content, pos, self.end - 2))
+        return tokens
+
+    def properties(self) -> Dict[str, str]:
+        """
+        Name/value properties held directly in this record, e.g.
+        ``< 40 />  < 8 />  <n rotation n/>  < 1 />  < 1 />  <v 0 v/>``.
+        The first value wins when a name repeats. The bag is parsed once per
+        record and shared; callers must not modify it.
+        """
+        return self.tree.properties(self.index)
+
+
+class RecordTree:
+    """
+    Record tree of one SDAX page, block or symbol file.
+
+    Built with a single structural scan into parallel arrays indexed in file
+    order (start offset, end offset, parent index), so record_at() is a
+    bisect plus a short walk up the parents and sibling lookups are O(log n).
+    The scan runs on the first lookup, not when the tree is created.
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self._tags: Dict[int, Optional[int]] = {}
+        self._properties: Dict[int, Dict[str, str]] = {}
+        self._property_index: Optional[PropertyIndex] = None
+
+    def __getattr__(self, name):
+        # starts/ends/parents are built on first use, so a page whose
+        # consumers never look up a record is not scanned for them
+        if name in ('starts', 'ends', 'parents'):
+            self._build()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    def _build(self) -> None:
+        content = self.content
+        # Events are offsets shifted left one bit, the low bit set for CLOSE,
+        # so one integer sort puts them in file order
+        events = [m.start() << 1 for m in _OPEN_RE.finditer(content)]
+        events += [(m.end() << 1) | 1 for m in _CLOSE_RE.finditer(content)]
+        payloads = []
+        for cell in _CELL_RE.finditer(content):
+            payload_end = cell.end() + int(cell.group(1))
+            payloads.append((cell.end() << 1, payload_end << 1))
+            close = _CLOSE_AFTER_RE.match(content, payload_end)
+            if close:
+                events.append(((close.end() - 2) << 1) | 1)
+        if payloads:
+            payload_starts = [start for start, _ in payloads]
+            events = [e for e in events
+                      if e < payload_starts[0]
+                      or e >= payloads[bisect_right(payload_starts, e) - 1][1]]
+        events.sort()
+
+        starts: List[int] = []
+        ends: List[int] = []
+        parents: List[int] = []
+        end_of_file = len(content)
+        stack = [-1]
+        for event in events:
+            if event & 1:
+                if len(stack) > 1:
+                    ends[stack.pop()] = (event >> 1) + 2
+            else:
+                parents.append(stack[-1])
+                stack.append(len(starts))
+                starts.append(event >> 1)
+                ends.append(end_of_file)
+        self.starts, self.ends, self.parents = starts, ends, parents
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def record(self, index: int) -> Optional[Record]:
+        return Record(self, index) if index >= 0 else None
+
+    def tag(self, index: int) -> Optional[int]:
+        if index not in self._tags:
+            prev = previous_token(self.content, self.starts[index])
+            self._tags[index] = int(prev[1]) if prev and prev[0] == TOK_ATOM and prev[1].isdigit() else None
+        return self._tags[index]
+
+    def properties(self, index: int) -> Dict[str, str]:
+        props = self._properties.get(index)
+        if props is None:
+            props = {}
+            name = None
+            for kind, text, _, _ in Record(self, index).tokens():
+                if kind == TOK_NAME:
+                    name = text
+                elif kind == TOK_VALUE and name is not None:
+                    props.setdefault(name, text)
+                    name = None
+            self._properties[index] = props
+        return props
+
+    def property_index(self) -> 'PropertyIndex':
+        """The file's PropertyIndex, built on first use and shared by consumers."""
+        if self._property_index is None:
+            self._property_index = PropertyIndex(self.content)
+        return self._property_index
+
+    def roots(self) -> List[Record]:
+        """Top-level records, in file order."""
+        return self.children(-1)
+
+    def children(self, index: int) -> List[Record]:
+        starts, ends = self.starts, self.ends
+        end = ends[index] if index >= 0 else len(self.content)
+        children = []
+        child = index + 1
+        while child < len(starts) and starts[child] < end:
+            children.append(Record(self, child))
+            child = bisect_left(starts, ends[child], child + 1)
+        return children
+
+    def record_at(self, pos: int) -> Optional[Record]:
+        """
+        The innermost record containing offset ``pos``. A record that starts
+        exactly at ``pos`` is not included, so record_at(r.start) is r's parent.
+        """
+        index = bisect_left(self.starts, pos) - 1
+        while index >= 0 and self.ends[index] <= pos:
+            index = self.parents[index]
+        return self.record(index)
+
+
+class OffsetIndex:
+    """
+    Matches of one pattern over a whole file, in file order, as sorted offset
+    arrays. "The last match inside [lo, hi)" or "the first match inside
+    [lo, hi)" is then a bisect instead of a regex scan of the window.
+
+    Only non-overlapping patterns (whole tokens or token runs) are indexed,
+    so a match lies inside a window exactly when a scan of that window alone
+    would have found it.
+    """
+
+    def __init__(self, entries: List[Tuple[int, int, Any]]):
+        self.starts = [entry[0] for entry in entries]
+        self.ends = [entry[1] for entry in entries]
+        self.values = [entry[2] for entry in entries]
+
+    @classmethod
+    def scan(cls, pattern: 'Pattern', content, value=None) -> 'OffsetIndex':
+        """Index every match of ``pattern``; ``value(match)`` defaults to its groups."""
+        if value is None:
+            value = lambda m: m.groups()
+        return cls([(m.start(), m.end(), value(m)) for m in pattern.finditer(content)])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def last_within(self, lo: int, hi: int) -> Any:
+        """Value of the last match lying in [lo, hi), or None."""
+        i = bisect_right(self.ends, hi) - 1
+        if i >= 0 and self.starts[i] >= lo:
+            return self.values[i]
+        return None
+
+    def first_within(self, lo: int, hi: int) -> Any:
+        """Value of the first match lying in [lo, hi), or None."""
+        i = bisect_left(self.starts, lo)
+        if i < len(self.starts) and self.ends[i] <= hi:
+            return self.values[i]
+        return None
+
+
+# A simple named property: the name, one or two length/type atoms, and a
+# value without '<' (rich-text values are never looked up by offset)
+#   < 40 />  < 8 />  <n rotation n/>  < 1 />  < 1 />  <v 0 v/>
+#   < 37 />  < 4 />  <n just n/>  < 1 />  <v 3 v/>
+_PROPERTY_RE = Pattern(r'<n\s+(\S+?)\s+n/>((?:\s*<\s*\d+\s*/>){1,2})\s*<v\s*([^<]*?)\s*v/>')
+
+
+# The same property with a given name, compiled on first use (by name)
+_PROPERTY_PATTERNS: Dict[str, Pattern] = {}
+
+
+def _property_pattern(name: str) -> Pattern:
+    pattern = _PROPERTY_PATTERNS.get(name)
+    if pattern is None:
+        pattern = _PROPERTY_PATTERNS[name] = Pattern(
+            _PROPERTY_RE.pattern.replace(r'(\S+?)', re.escape(name), 1))
+    return pattern
+
+
+class PropertyIndex:
+    """
+    Offsets and values of the named properties of a file. index(name) gives
+    an OffsetIndex of that property, so "the nearest rotation/just/zValue/...
+    around offset X" is a bisect instead of a regex over a window of text.
+    Each name is scanned for once, on its first lookup.
+
+    ``atoms`` is the number of atoms between name and value: 2 for Tag 40
+    properties (``< 1 />  < len />``), 1 for Tag 37 ones (``< 1 />``).
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self._entries: Dict[str, List[Tuple[int, int, int, str]]] = {}
+        self._indexes: Dict[Tuple, OffsetIndex] = {}
+
+    def _scan(self, name: str) -> List[Tuple[int, int, int, str]]:
+        entries = self._entries.get(name)
+        if entries is None:
+            content = self.content
+            close = _literal(content, '/>')
+            entries = self._entries[name] = [
+                (m.start(), m.end(), m.group(1).count(close), as_text(m.group(2)))
+                for m in _property_pattern(name).finditer(content)]
+        return entries
+
+    def index(self, name: str, parse=None, atoms: Optional[int] = None) -> OffsetIndex:
+        """
+        OffsetIndex of the values of property ``name``. ``parse(value)`` turns
+        the value text into the stored value; entries it returns None for are
+        left out, as are entries whose atom count differs from ``atoms``.
+        """
+        key = (name, parse, atoms)
+        index = self._indexes.get(key)
+        if index is None:
+            entries = []
+            for start, end, count, text in self._scan(name):
+                if atoms is not None and count != atoms:
+                    continue
+                value = parse(text) if parse is not None else text
+                if value is not None:
+                    entries.append((start, end, value))
+            index = self._indexes[key] = OffsetIndex(entries)
+        return index
+
+
+class TokenConsumer:
+    """
+    Base class for page consumers driven by a PageWalker.
+
+    ``triggers`` maps a trigger name to a regex fragment (without capturing
+    groups) matching the single token that starts a record of interest.
+    on_token() is called with the trigger name and the token's span, in page
+    order, and reads whatever neighbouring tokens it needs from self.content
+    or whatever records it needs from self.records, the page's RecordTree.
+    """
+
+    triggers: Dict[str, str] = {}
+
+    def begin_page(self, content, records: 'RecordTree') -> None:
+        """Reset per-page state before the walk starts."""
+        self.content = content
+        self.records = records
+
+    def on_token(self, trigger: str, start: int, end: int) -> None:
+        """Handle a trigger token."""
+        raise NotImplementedError
+
+    def end_page(self) -> Any:
+        """Return the consumer's result for the page just walked."""
+        return None
+
+
+class PageWalker:
+    """Walks each page once and dispatches trigger tokens to consumers."""
+
+    def __init__(self):
+        self.consumers: Dict[str, TokenConsumer] = {}
+        self._scanner = None
+        self._dispatch: Dict[str, Tuple[TokenConsumer, str]] = {}
+
+    def register(self, name: str, consumer: TokenConsumer) -> None:
+        """Register a consumer; its end_page() result is returned under name."""
+        self.consumers[name] = consumer
+        self._scanner = None
+
+    def _compile(self) -> None:
+        """Compile every consumer trigger into one alternation."""
+        fragments = []
+        self._dispatch = {}
+        for c_idx, consumer in enumerate(self.consumers.values()):
+            for t_idx, (trigger, fragment) in enumerate(consumer.triggers.items()):
+                group = f'c{c_idx}t{t_idx}'
+                fragments.append((group, fragment))
+                self._dispatch[group] = (consumer, trigger)
+
+        if not fragments:
+            self._scanner = Pattern(r'(?!)')
+        elif all(fragment.startswith('<') for _, fragment in fragments):
+            # Every token starts with '<': factor it out so the scanner only
+            # tries the alternatives at candidate positions
+            self._scanner = Pattern('<(?:' + '|'.join(
+                f'(?P<{group}>{fragment[1:]})' for group, fragment in fragments) + ')')
+        else:
+            self._scanner = Pattern('|'.join(
+                f'(?P<{group}>{fragment})' for group, fragment in fragments))
+
+    def walk(self, content) -> Dict[str, Any]:
+        """
+        Walk one page and return {consumer_name: result}. ``content`` is the
+        decoded page or its raw ``bytes``/``mmap`` buffer.
+        """
+        if self._scanner is None:
+            self._compile()
+
+        records = RecordTree(content)
+        for consumer in self.consumers.values():
+            consumer.begin_page(content, records)
+
+        dispatch = self._dispatch
+        for m in self._scanner.finditer(content):
+            consumer, trigger = dispatch[m.lastgroup]
+            consumer.on_token(trigger, m.start(), m.end())
+
+        return {name: consumer.end_page() for name, consumer in self.consumers.items()}
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Compiled Symbol Library
+=======================
+A project's ``cache/`` folder (the symbols and styles System Capture copied
+from the part libraries) only changes when the cache is refreshed, but
+extract_symbol_graphics() and load_styles() used to parse all of it on
+every run. SymbolLibrary keeps the parsed result in one binary file:
+
+    SDAXSYMLIB1\\n <key>\\n <pickle of {'symbols': {...}, 'styles': {...}}>
+
+holding each cache symbol's lines, labels, pins, text positions and
+bounding box, and each cache style file's styles, by file name. Loading it
+takes a few milliseconds.
+
+The key (library_key()) covers cache/cacheVersion.txt, the checksum of
+cache.pac (from its central directory CRCs, see cache_pac.py), the names,
+sizes and mtimes of the cache symbol and style files and the parser
+version. When any of them changes the library is stale: the files are
+parsed as before and the library is written again.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from cache_pac import open_cache_pac
+
+_MAGIC = b'SDAXSYMLIB1\n'
+
+# Cache files compiled into the library
+_SUFFIXES = ('.ascii', '.style')
+
+
+def library_key(root_dir: Path, version: str) -> str:
+    """Key of the cache/ folder of ``root_dir`` for parser ``version``."""
+    digest = hashlib.sha1(version.encode('utf-8'))
+    cache_dir = root_dir / 'cache'
+    try:
+        digest.update(hashlib.sha1((cache_dir / 'cacheVersion.txt').read_bytes()).digest())
+    except OSError:
+        digest.update(b'-')
+    try:
+        digest.update(open_cache_pac(root_dir / 'cache.pac').checksum().encode('ascii'))
+    except (OSError, zipfile.BadZipFile):
+        digest.update(b'-')
+    if cache_dir.is_dir():
+        for entry in sorted(os.scandir(cache_dir), key=lambda e: e.name):
+            if entry.name.endswith(_SUFFIXES) and entry.is_file():
+                st = entry.stat()
+                digest.update(f'{entry.name}\0{st.st_size}\0{st.st_mtime_ns}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SymbolLibrary:
+    """
+    Compiled cache symbols and styles of one project, stored at ``path``.
+
+    load() reads the library if it matches the project's current cache
+    (``symbols`` and ``styles`` then map cache file names to their parsed
+    records); save() writes a new one. Both are safe to call from phases
+    running on several threads.
+    """
+
+    def __init__(self, path, root_dir, version: str):
+        self.path = Path(path)
+        self.root_dir = Path(root_dir)
+        self.version = version
+        self.symbols: Dict[str, Dict] = {}
+        self.styles: Dict[str, Dict] = {}
+        self.loaded = False
+        self._key: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """True if the stored library is current (read once, on the first call)."""
+        with self._lock:
+            if self._key is not None:
+                return self.loaded
+            self._key = library_key(self.root_dir, self.version)
+            try:
+                with open(self.path, 'rb') as f:
+                    if f.readline() != _MAGIC or f.readline().decode('ascii').strip() != self._key:
+                        return False
+                    contents = pickle.load(f)
+                self.symbols = contents['symbols']
+                self.styles = contents['styles']
+                self.loaded = True
+            except (OSError, EOFError, KeyError, ValueError, pickle.UnpicklingError):
+                pass
+            return self.loaded
+
+    def save(self, symbols: Dict[str, Dict], styles: Dict[str, Dict]) -> bool:
+        """
+        Store parsed cache symbols and styles (by file name); False if the
+        cache changed since load(), so the records may not match it.
+        """
+        with self._lock:
+            key = library_key(self.root_dir, self.version)
+            if self._key is not None and key != self._key:
+                return False
+            tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(_MAGIC)
+                f.write(f'{key}\n'.encode('ascii'))
+                pickle.dump({'symbols': symbols, 'styles': styles}, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            self._key = key
+            self.symbols, self.styles = symbols, styles
+            self.loaded = True
+            return True
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Extraction Mode Checks
+======================
+Focused checks of extraction changes that must agree with (or degrade
+like) a plain full run:
+
+- placements:  page instance placements are the component/port placements
+  of the pre-series whole-page scan, plus the component/port transforms
+  it missed by reading rotation from a +-300 character window instead of
+  the placement's own record; no text, graphics or wire transforms,
+- jobs:        a run with --jobs 2 writes the same full_design.json as a
+  serial run,
+- batch:       a batch of two copies of the project writes each the same
+  full_design.json as a single run, and a second batch with a parse cache
+  reads none of the unchanged symbol and style files,
+- job queue:   a job whose lease expired is requeued and finished by the
+  next worker, without losing it or its payload, and a page-unit
+  distributed run rerun under the same run id after a page edit writes
+  the same full_design.json as a full run and leaves no results behind,
+- isolated pool: a task that times out, crashes its worker or hits the
+  memory cap comes back as that status, and a page walk that does is
+  returned as a DegradedFile and listed in statistics.degraded_files,
+- parse cache: a cold and a warm run with a parse cache write the same
+  full_design.json as a run without one (apart from the cache's own hit
+  counts, which a run without a cache leaves out), the warm run loading
+  every page, block and symbol file from the cache,
+- incremental: after a page edit, an --incremental run over the previous
+  output re-extracts only the edited block and writes the same
+  full_design.json as a full run,
+- watch:       the update a watcher writes after a page edit is the
+  full_design.json of a full run of the edited project,
+- symbol library: a run that builds the library and one that loads it
+  write the same full_design.json as a run without one,
+- cache.pac:   a project read from its cache.pac (without a cache/, and
+  with --cache-pac next to one) writes the same full_design.json as with
+  the archive unpacked to cache/.
+
+Outputs go to a temporary directory (projects a check edits are copied
+there first); nothing is written next to the script.
+
+Usage: python verify_extraction_modes.py [ROOT]
+"""
+
+import contextlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from batch_extract import run_batch
+from bench_page_scan import LEGACY_PATTERNS
+from cache_pac import open_cache_pac
+from distributed_extract import run_coordinator, run_worker
+from forensic_extractor import (
+    DegradedFile, ForensicExtractor, PlacementConsumer, _record_properties, open_parse_cache,
+    open_symbol_library, page_walk_pool, walk_pages_with,
+)
+from isolated_pool import CRASHED, MEMORY, OK, TIMEOUT, IsolatedPool
+from job_queue import JobQueue
+from phase_scheduler import PhaseScheduler
+from watch_extract import Watcher
+from sdax_parser import RecordTree
+
+# Page instances are keyed by the offset of their transform; dx.json
+# instances by refdes
+PAGE_INSTANCE_ID_RE = re.compile(r'inst_(.+)_p(\d+)_(\d+)')
+TRANSFORM_RE = re.compile(r'<n transform n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*([^v]+)\s*v/>')
+ROTATION_RE = re.compile(r'<n rotation n/>\s*<[^>]+>\s*<[^>]+>\s*<v\s*(-?\d+)\s*v/>')
+IDENTITY = '1,0,0,0,1,0,0,0,1'
+# The first LP value of a page: its leading digit is changed in place
+LP_VALUE_RE = re.compile(rb'<n LP n/>\s*<\s*\d+\s*/>\s*<\s*\d+\s*/>\s*<v ([1-8])')
+BATCH_READ_RE = re.compile(r'Symbol/style files: \d+ \([\d.]+ MB\), read: (\d+)')
+
+# Memory cap of the isolated pool check, and what the task tries to allocate
+POOL_MEMORY = 512 << 20
+POOL_ALLOCATION = 2 << 30
+
+
+def copy_project(root: Path, target: Path) -> Path:
+    """worklib/ and cache/ of ``root`` under ``target``."""
+    for name in ('worklib', 'cache'):
+        shutil.copytree(root / name, target / name, symlinks=True)
+    return target
+
+
+def extract(root: Path, output_path: Path, jobs: int = 1, **options) -> dict:
+    """Run every phase into ``output_path``; the parsed output."""
+    with open(output_path.with_suffix('.log'), 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log):
+        extractor = ForensicExtractor(root, **options)
+        scheduler = PhaseScheduler(extractor.phases(jobs=jobs, output_path=str(output_path)))
+        if not scheduler.run():
+            raise RuntimeError(f'extraction failed, see {output_path.with_suffix(".log")}')
+    return load_output(output_path)
+
+
+def load_output(output_path: Path) -> dict:
+    """A full_design.json without its extraction_date."""
+    with open(output_path, encoding='utf-8') as f:
+        data = json.load(f)
+    data.pop('extraction_date', None)
+    return data
+
+
+def full_output(root: Path, work: Path) -> dict:
+    """Output of a plain serial run of ``root``, extracted once per work dir."""
+    output_path = work / 'full.json'
+    if not output_path.exists():
+        return extract(root, output_path)
+    return load_output(output_path)
+
+
+def edit_page(root: Path) -> Path:
+    """Change one wire coordinate digit of the first page that has a wire."""
+    for page_file in sorted(root.glob('worklib/*/tbl_1/page_file_*.ascii')):
+        data = page_file.read_bytes()
+        m = LP_VALUE_RE.search(data)
+        if m:
+            digit = str(int(m.group(1)) + 1).encode('ascii')
+            page_file.write_bytes(data[:m.start(1)] + digit + data[m.end(1):])
+            return page_file
+    raise RuntimeError('no page with a wire to edit')
+
+
+def pre_series_placements(root: Path):
+    """
+    The pre-series page scan: every transform followed by a < 45 />
+    coordinate block anywhere later on the page, kept if the transform is
+    not the identity or the first rotation within 300 characters is not 0.
+
+    Returns the kept placements as a map of (block, page number, transform
+    offset) to the tag of the object holding the transform.
+    """
+    kept = {}
+    for page_file, content, records in _pages(root):
+        for match in LEGACY_PATTERNS['transform_pattern'].finditer(content):
+            transform = match.group(1).strip()
+            rotation = ROTATION_RE.search(content[max(0, match.start() - 300):match.end() + 300])
+            if transform != IDENTITY or (rotation and int(rotation.group(1)) != 0):
+                kept[_page_key(page_file) + (match.start(),)] = _object_tag(records, match.start())
+    return kept
+
+
+def component_placements(root: Path):
+    """
+    Transforms on component (Tag 12) and port (Tag 7) objects that have an
+    origin and are rotated or not the identity in their own record, keyed
+    like pre_series_placements().
+    """
+    expected = set()
+    for page_file, content, records in _pages(root):
+        for match in TRANSFORM_RE.finditer(content):
+            bag = records.record_at(match.start())
+            obj = bag.parent if bag is not None else None
+            if obj is None or obj.tag not in PlacementConsumer.OBJECT_TAGS or not obj.find(45):
+                continue
+            props, _ = _record_properties(records, match.start())
+            if match.group(1).strip() != IDENTITY or props.get('rotation', '0') != '0':
+                expected.add(_page_key(page_file) + (match.start(),))
+    return expected
+
+
+def _pages(root: Path):
+    for page_file in sorted(root.glob('worklib/*/tbl_1/page_file_*.ascii')):
+        content = page_file.read_bytes().decode('utf-8', errors='ignore')
+        yield page_file, content, RecordTree(content)
+
+
+def _page_key(page_file: Path):
+    return page_file.parts[-3], re.search(r'page_file_(\d+)', page_file.name).group(1)
+
+
+def _object_tag(records: RecordTree, pos: int):
+    bag = records.record_at(pos)
+    obj = bag.parent if bag is not None else None
+    return obj.tag if obj is not None else None
+
+
+# =============================================================================
+# CHECKS
+# =============================================================================
+
+def check_placements(root: Path, work: Path) -> None:
+    data = full_output(root, work)
+    emitted = set()
+    for primitive in data['primitives']:
+        m = PAGE_INSTANCE_ID_RE.fullmatch(primitive['element_id'])
+        if primitive['type'] == 'instance' and m:
+            emitted.add((m.group(1), m.group(2), int(m.group(3))))
+
+    kept = pre_series_placements(root)
+    by_tag = {}
+    for tag in kept.values():
+        by_tag[tag] = by_tag.get(tag, 0) + 1
+    print(f"    pre-series page instances: {len(kept)} "
+          f"({', '.join(f'Tag {tag}: {n}' for tag, n in sorted(by_tag.items()))}), now {len(emitted)}")
+    # Every pre-series component/port placement is still emitted ...
+    kept_objects = {key for key, tag in kept.items() if tag in PlacementConsumer.OBJECT_TAGS}
+    assert kept_objects <= emitted, \
+        f'pre-series placements no longer emitted: {sorted(kept_objects - emitted)[:5]}'
+    # ... no text, graphics or wire transform is ...
+    others = {key for key, tag in kept.items() if tag not in PlacementConsumer.OBJECT_TAGS}
+    assert not others & emitted, f'text/graphics/wire placements emitted: {sorted(others & emitted)[:5]}'
+    # ... and the rest are component/port transforms the +-300 character
+    # rotation window read from a neighbouring record
+    expected = component_placements(root)
+    assert emitted == expected, \
+        f'{len(emitted - expected)} placements not on a rotated component/port, ' \
+        f'{len(expected - emitted)} rotated component/port placements missing'
+
+
+def check_jobs(root: Path, work: Path) -> None:
+    parallel = extract(root, work / 'jobs.json', jobs=2)
+    assert parallel == full_output(root, work), '--jobs 2 output differs from a serial run'
+
+
+def check_batch(root: Path, work: Path) -> None:
+    projects = [copy_project(root, work / 'batch' / name) for name in ('a', 'b')]
+    reads = []
+    for run in range(2):
+        with open(work / f'batch_{run}.log', 'w', encoding='utf-8') as log, \
+                contextlib.redirect_stdout(log):
+            results = run_batch(projects, workers=2, parse_cache=work / 'batch_cache')
+        assert all(summary['ok'] for summary in results), results
+        reads.append(int(BATCH_READ_RE.search((work / f'batch_{run}.log').read_text()).group(1)))
+    for project in projects:
+        output = load_output(project / 'full_design.json')
+        # Hits and misses of this run's parse cache
+        output['statistics'].pop('parse_cache')
+        assert output == full_output(root, work), f'batch output of {project.name} differs from a single run'
+    assert reads[0] > 0 and reads[1] == 0, f'symbol/style files read per batch: {reads}'
+
+
+def check_expired_lease(work: Path) -> None:
+    queue = JobQueue(work / 'queue', lease_seconds=0.2, max_attempts=3)
+    queue.put('page_1', {'file': 'page_file_1.ascii'})
+
+    claimed = queue.claim('host-a:1')
+    assert claimed == ('page_1', {'file': 'page_file_1.ascii'}), claimed
+    # host-a stops heartbeating
+    time.sleep(0.4)
+    assert queue.requeue_expired() == 1
+    assert not queue.heartbeat('page_1'), 'expired lease could still be renewed'
+
+    claimed = queue.claim('host-b:1')
+    assert claimed == ('page_1', {'file': 'page_file_1.ascii'}), claimed
+    queue.complete('page_1', {'walked': True})
+    assert queue.is_done('page_1') and queue.result('page_1') == {'walked': True}
+    counts = queue.counts()
+    assert counts == {'pending': 0, 'leased': 0, 'results': 1, 'failed': 0}, counts
+
+
+def check_distributed_rerun(root: Path, work: Path) -> None:
+    project = copy_project(root, work / 'distributed')
+    queue_dir = work / 'distributed_queue'
+    for run in range(2):
+        if run:
+            page_file = edit_page(project)
+        with open(work / f'distributed_{run}.log', 'w', encoding='utf-8') as log, \
+                contextlib.redirect_stdout(log):
+            # The previous run stopped the worker. One worker thread: the
+            # worker keeps one page walker per process
+            JobQueue(queue_dir).clear_stop()
+            worker = threading.Thread(target=run_worker, args=(queue_dir,),
+                                      kwargs={'poll_seconds': 0.05})
+            worker.start()
+            ok = run_coordinator(queue_dir, [project], unit='page', output_dir=work / 'distributed_out',
+                                 run_id='rerun', stop_workers=True)
+            worker.join()
+        assert ok, f'distributed run {run} failed'
+        counts = JobQueue(queue_dir).counts()
+        assert counts == {'pending': 0, 'leased': 0, 'results': 0, 'failed': 0}, counts
+    output = load_output(work / 'distributed_out' / project.name / 'full_design.json')
+    assert output == extract(project, work / 'distributed_full.json'), \
+        f'rerun after editing {page_file.name} differs from a full run'
+
+
+def _pool_task(kind: str):
+    if kind == 'hang':
+        time.sleep(60)
+    elif kind == 'crash':
+        os._exit(3)
+    elif kind == 'memory':
+        return len(bytearray(POOL_ALLOCATION))
+    return kind
+
+
+def check_isolated_pool(root: Path, work: Path) -> None:
+    with IsolatedPool(2, timeout=2, max_memory=POOL_MEMORY, retries=1) as pool:
+        results = pool.map(_pool_task, ['ok', 'hang', 'crash', 'memory'])
+    statuses = [result.status for result in results]
+    assert statuses == [OK, TIMEOUT, CRASHED, MEMORY], statuses
+    # Timeouts and crashes are retried once; MemoryError is the task's own
+    assert [result.attempts for result in results] == [1, 2, 2, 1], results
+
+    page_files = sorted(root.glob('worklib/*/tbl_1/page_file_*.ascii'))[:2]
+    with page_walk_pool(None, False, 2, timeout=1e-3, retries=0) as pool:
+        scans = walk_pages_with(pool, page_files)
+    assert all(isinstance(scan, DegradedFile) for scan in scans), scans
+
+    data = extract(root, work / 'degraded.json', file_timeout=1e-3, file_retries=0)
+    degraded = {entry['file'] for entry in data['statistics']['degraded_files']}
+    pages = {page.relative_to(root).as_posix()
+             for page in root.glob('worklib/*/tbl_1/page_file_*.ascii')}
+    assert pages <= degraded, sorted(pages - degraded)
+
+
+def check_parse_cache(root: Path, work: Path) -> None:
+    full = full_output(root, work)
+    assert 'parse_cache' not in full['statistics'], 'run without a cache reports parse_cache'
+    stats = []
+    for run in ('cold', 'warm'):
+        output = extract(root, work / f'parse_cache_{run}.json',
+                         parse_cache=open_parse_cache(work / 'parse_cache'))
+        stats.append(output['statistics'].pop('parse_cache'))
+        assert output == full, f'{run} parse cache run differs from a run without a cache'
+    assert stats[0]['writes'] > 0, stats[0]
+    assert stats[1]['hits'] > 0 and stats[1]['misses'] == 0, stats[1]
+
+
+def check_incremental(root: Path, work: Path) -> None:
+    project = copy_project(root, work / 'incremental')
+    output = work / 'incremental.json'
+    before = extract(project, output, incremental=True)
+
+    page_file = edit_page(project)
+    after = extract(project, output, incremental=True)
+    full = extract(project, work / 'incremental_full.json')
+
+    assert after != before, f'editing {page_file.name} did not change the output'
+    log = output.with_suffix('.log').read_text(encoding='utf-8')
+    assert f'Re-extracting: {page_file.parts[-3]}\n' in log, \
+        f'incremental run did not re-extract only {page_file.parts[-3]}'
+    assert after == full, 'incremental output differs from a full run'
+
+
+def check_watch(root: Path, work: Path) -> None:
+    project = copy_project(root, work / 'watch')
+    output = work / 'watch.json'
+    watcher = Watcher(project, output, debounce=0.1, poll=0.1)
+    with open(work / 'watch_run.log', 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log):
+        thread = threading.Thread(target=watcher.run, kwargs={'max_updates': 1}, daemon=True)
+        thread.start()
+        try:
+            # Edit once the initial extraction is written
+            deadline = time.monotonic() + 60
+            while not output.exists() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            page_file = edit_page(project)
+            thread.join(60)
+        finally:
+            watcher.close()
+    assert not thread.is_alive(), f'no update within 60s after editing {page_file.name}'
+    assert watcher.updates == 1, watcher.updates
+    updated = load_output(output)
+    # Hits and misses of the watcher's parse cache
+    updated['statistics'].pop('parse_cache')
+    assert updated == extract(project, work / 'watch_full.json'), \
+        f'update after editing {page_file.name} differs from a full run'
+
+
+def check_symbol_library(root: Path, work: Path) -> None:
+    full = full_output(root, work)
+    for run, expected in (('cold', 'Symbol library rebuilt: '),
+                          ('warm', 'Symbols from symbol library: ')):
+        output_path = work / f'symbol_library_{run}.json'
+        output = extract(root, output_path,
+                         symbol_library=open_symbol_library(work / 'symbols.lib', root))
+        assert expected in output_path.with_suffix('.log').read_text(encoding='utf-8'), \
+            f'{run} run did not log {expected.strip()!r}'
+        assert output == full, f'{run} symbol library run differs from a run without one'
+
+
+def check_cache_pac(root: Path, work: Path) -> None:
+    # cache/ here is another snapshot than cache.pac: compare against the
+    # archive unpacked instead
+    project = work / 'cache_pac'
+    shutil.copytree(root / 'worklib', project / 'worklib', symlinks=True)
+    shutil.copy2(root / 'cache.pac', project / 'cache.pac')
+    packed = extract(project, work / 'cache_pac_only.json')
+
+    pac = open_cache_pac(project / 'cache.pac')
+    (project / 'cache').mkdir()
+    for suffix in ('.ascii', '.style'):
+        for name in pac.names(suffix):
+            (project / 'cache' / name).write_bytes(pac.read(name))
+    unpacked = extract(project, work / 'cache_pac_unpacked.json')
+    assert packed == unpacked, 'output from cache.pac differs from the unpacked cache'
+    forced = extract(project, work / 'cache_pac_forced.json', cache_pac=True)
+    assert forced == unpacked, '--cache-pac output differs from the unpacked cache'
+
+
+def main():
+    root = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent
+    print("=" * 60)
+    print("EXTRACTION MODE CHECKS")
+    print("=" * 60)
+
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix='extraction_modes_') as tmp:
+        work = Path(tmp)
+        checks = [
+            ('page placements are the pre-series component/port ones', lambda: check_placements(root, work)),
+            ('--jobs 2 output equals a serial run', lambda: check_jobs(root, work)),
+            ('batch output equals a single run, unchanged files are not re-read',
+             lambda: check_batch(root, work)),
+            ('expired lease is requeued without losing the job', lambda: check_expired_lease(work)),
+            ('distributed rerun after a page edit equals a full run',
+             lambda: check_distributed_rerun(root, work)),
+            ('pool timeout/crash/memory give degraded files', lambda: check_isolated_pool(root, work)),
+            ('cold and warm parse cache runs equal a run without one',
+             lambda: check_parse_cache(root, work)),
+            ('incremental run equals a full run after an edit', lambda: check_incremental(root, work)),
+            ('watch update after an edit equals a full run', lambda: check_watch(root, work)),
+            ('building and loading the symbol library equal a run without it',
+             lambda: check_symbol_library(root, work)),
+            ('cache.pac output equals the unpacked cache', lambda: check_cache_pac(root, work)),
+        ]
+        for name, check in checks:
+            started = time.perf_counter()
+            try:
+                check()
+            except Exception as e:
+                failed += 1
+                print(f"  [FAIL] {name}: {type(e).__name__}: {e}")
+                continue
+            print(f"  [OK] {name} ({time.perf_counter() - started:.1f}s)")
+
+    print(f"\n  {len(checks) - failed} of {len(checks)} checks passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
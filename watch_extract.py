@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Watch Mode
+==========
+Keeps full_design.json up to date while a design is edited: every save in
+System Capture is picked up and the output rewritten, so a viewer reading
+it follows the schematic.
+
+    python watch_extract.py [ROOT] [--output full_design.json]
+
+The block directories under ``worklib/`` (tbl_1, sym_*, variant; not the
+thumbnails), ``cache/`` and ``cache.pac`` are watched with inotify where the
+platform has it, otherwise polled every --poll seconds. A change starts the debounce:
+the update waits until nothing has changed for --debounce seconds, so a
+save that touches several files (page, xcon, dx.json, master.tag) costs one
+update.
+
+Each update is a complete extraction that only parses the touched files:
+untouched page, block and symbol files come from the parse cache (see
+parse_cache.py; a temporary one unless --parse-cache is given) and parsed
+symbols and styles stay in memory between updates. The output is replaced
+atomically, and the extractor's console output goes to a log file next to
+it.
+"""
+
+import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from forensic_extractor import DEFAULT_PARSE_CACHE_BYTES, ForensicExtractor, open_parse_cache
+from phase_scheduler import PhaseScheduler
+
+# Path -> (size, mtime_ns) of every watched file
+Snapshot = Dict[Path, Tuple[int, int]]
+
+# Block subdirectories that are not extractor input
+_UNWATCHED = {'thumbnails'}
+
+# Input files directly in the project root. The root itself is not
+# snapshotted: the output and its log are usually written there.
+_ROOT_FILES = ('cache.pac',)
+
+
+# =============================================================================
+# CHANGE DETECTION
+# =============================================================================
+
+class _Inotify:
+    """
+    Minimal inotify binding (Linux, through libc): wait() returns once any
+    watched directory reports a change. Which files changed is read from a
+    Snapshot afterwards, so events are only a wake-up.
+    """
+
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    # | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._libc = libc
+
+    def watch(self, directories: List[Path]) -> None:
+        """Watch ``directories`` (adding a directory twice is harmless)."""
+        for directory in directories:
+            self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """True once events arrived (all pending ones are consumed), False on timeout."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _open_inotify() -> Optional[_Inotify]:
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        return _Inotify()
+    except (OSError, AttributeError):
+        # No libc inotify, or out of instances
+        return None
+
+
+def watched_dirs(root: Path) -> List[Path]:
+    """worklib/, every block directory and its input subdirectories, and cache/."""
+    worklib = root / 'worklib'
+    dirs = [worklib, root / 'cache']
+    if worklib.is_dir():
+        for block_dir in sorted(worklib.iterdir()):
+            if not block_dir.is_dir() or block_dir.name in ForensicExtractor.IGNORE_DIRS:
+                continue
+            dirs.append(block_dir)
+            dirs.extend(sub for sub in sorted(block_dir.iterdir())
+                        if sub.is_dir() and sub.name not in _UNWATCHED)
+    return [d for d in dirs if d.is_dir()]
+
+
+def watched_files(root: Path) -> List[Path]:
+    """Input files outside the watched directories (cache.pac), present or not."""
+    return [root / name for name in _ROOT_FILES]
+
+
+def snapshot(dirs: List[Path], extra: List[Path] = ()) -> Snapshot:
+    """Size and mtime of every file directly in ``dirs`` and of the ``extra`` files."""
+    files: Snapshot = {}
+    for path in extra:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        files[path] = (st.st_size, st.st_mtime_ns)
+    for directory in dirs:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    st = entry.stat()
+                    files[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                # Removed while scanning; the next snapshot sees it gone
+                continue
+    return files
+
+
+def touched_files(before: Snapshot, after: Snapshot) -> List[Path]:
+    """Files added, removed or rewritten between two snapshots."""
+    return sorted(path for path in before.keys() | after.keys()
+                  if before.get(path) != after.get(path))
+
+
+# =============================================================================
+# WATCHER
+# =============================================================================
+
+class Watcher:
+    """Re-extracts ``root`` into ``output_path`` whenever its files change."""
+
+    def __init__(self, root: Path, output_path: Path, debounce: float = 0.25,
+                 poll: float = 0.5, use_inotify: bool = True,
+                 parse_cache: Optional[Path] = None,
+                 parse_cache_bytes: int = DEFAULT_PARSE_CACHE_BYTES,
+                 options: Optional[Dict[str, Any]] = None):
+        self.root = root
+        self.output_path = output_path
+        self.log_path = output_path.with_suffix('.log')
+        self.debounce = debounce
+        self.poll = poll
+        self.options = dict({'mmap': False, 'io_threads': 1, 'xcon_net_labels': False,
+                             'phase_threads': 1, 'cache_pac': False}, **(options or {}))
+        self._inotify = _open_inotify() if use_inotify else None
+        self._temp_cache = None if parse_cache else tempfile.mkdtemp(prefix='parse_cache_')
+        self._cache_dir = parse_cache or Path(self._temp_cache)
+        self._cache_bytes = parse_cache_bytes
+        # Parsed symbol and style files by content, kept across updates
+        self.parsed_files: Dict[Tuple[str, str], Any] = {}
+        self.updates = 0
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+        if self._temp_cache is not None:
+            shutil.rmtree(self._temp_cache, ignore_errors=True)
+
+    def extract(self) -> bool:
+        """One full extraction into output_path; False if it failed."""
+        try:
+            with open(self.log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+                extractor = ForensicExtractor(
+                    self.root, mmap_pages=self.options['mmap'], parsed_files=self.parsed_files,
+                    parse_cache=open_parse_cache(self._cache_dir, self._cache_bytes),
+                    cache_pac=self.options['cache_pac'])
+                scheduler = PhaseScheduler(extractor.phases(
+                    io_threads=self.options['io_threads'],
+                    xcon_net_labels=self.options['xcon_net_labels'],
+                    output_path=str(self.output_path)))
+                return scheduler.run(workers=self.options['phase_threads'])
+        except Exception as e:
+            print(f"  [WARN] Extraction failed: {type(e).__name__}: {e}")
+            return False
+
+    def _update(self, touched: List[Path], since: float) -> None:
+        names = [path.relative_to(self.root).as_posix() for path in touched]
+        shown = ', '.join(names[:3]) + (f' (+{len(names) - 3} more)' if len(names) > 3 else '')
+        print(f"  Changed: {shown}")
+        ok = self.extract()
+        self.updates += 1
+        if ok:
+            print(f"  [{time.strftime('%H:%M:%S')}] Updated {self.output_path} "
+                  f"({time.monotonic() - since:.2f}s after the last change)")
+        else:
+            print(f"  [WARN] Update failed, {self.output_path} left as it was; see {self.log_path}")
+
+    def _snapshot(self, dirs: List[Path]) -> Snapshot:
+        return snapshot(dirs, watched_files(self.root))
+
+    def _watch(self, dirs: List[Path]) -> None:
+        # The root is watched for cache.pac; the output written there wakes
+        # the watcher too, but only a changed input counts (see _snapshot)
+        self._inotify.watch(dirs + [self.root])
+
+    def _wait_for_change(self, dirs: List[Path], current: Snapshot) -> Tuple[Snapshot, List[Path]]:
+        """Block until a watched file changes; the new snapshot and the changed files."""
+        while True:
+            if self._inotify is not None:
+                self._watch(dirs)
+                # The timeout also catches changes inotify cannot see (network mounts)
+                self._inotify.wait(max(self.poll, 5.0))
+            else:
+                time.sleep(self.poll)
+            latest = self._snapshot(dirs)
+            touched = touched_files(current, latest)
+            if touched:
+                return latest, touched
+
+    def _settle(self, latest: Snapshot) -> Tuple[Snapshot, float]:
+        """Wait until nothing changed for ``debounce`` seconds; the settled snapshot and when it last changed."""
+        last_change = time.monotonic()
+        while True:
+            if self._inotify is not None:
+                quiet = not self._inotify.wait(self.debounce)
+            else:
+                time.sleep(self.debounce)
+                quiet = True
+            dirs = watched_dirs(self.root)
+            if self._inotify is not None:
+                self._watch(dirs)
+            settled = self._snapshot(dirs)
+            if quiet and settled == latest:
+                return settled, last_change
+            if settled != latest:
+                last_change = time.monotonic()
+                latest = settled
+
+    def run(self, max_updates: Optional[int] = None) -> int:
+        """Extract once, then after every settled change; returns the number of updates."""
+        mode = 'inotify' if self._inotify is not None else f'polling every {self.poll:g}s'
+        print("=" * 60)
+        print(f"WATCHING: {self.root} -> {self.output_path} ({mode}, "
+              f"debounce {self.debounce:g}s)")
+        print("=" * 60)
+
+        dirs = watched_dirs(self.root)
+        current = self._snapshot(dirs)
+        started = time.monotonic()
+        if self.extract():
+            print(f"  Initial extraction: {time.monotonic() - started:.2f}s")
+        else:
+            print(f"  [WARN] Initial extraction failed; see {self.log_path}")
+
+        while max_updates is None or self.updates < max_updates:
+            latest, touched = self._wait_for_change(dirs, current)
+            settled, last_change = self._settle(latest)
+            touched = touched_files(current, settled)
+            current = settled
+            dirs = watched_dirs(self.root)
+            if touched:
+                self._update(touched, last_change)
+        return self.updates
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Keep full_design.json up to date while a Cadence SDAX project is edited')
+    parser.add_argument('root', nargs='?', type=Path, default=Path(__file__).parent,
+                        help='project root (default: the directory of this script)')
+    parser.add_argument('--output', type=Path, default=Path('full_design.json'), metavar='PATH',
+                        help='output file (default: full_design.json)')
+    parser.add_argument('--debounce', type=float, default=0.25, metavar='SECONDS',
+                        help='update once nothing changed for this long (default: 0.25)')
+    parser.add_argument('--poll', type=float, default=0.5, metavar='SECONDS',
+                        help='polling interval without inotify (default: 0.5)')
+    parser.add_argument('--no-inotify', action='store_true',
+                        help='poll even where inotify is available')
+    parser.add_argument('--parse-cache', type=Path, metavar='DIR',
+                        help='parse cache directory to use and keep (default: a temporary one)')
+    parser.add_argument('--parse-cache-mb', type=int, default=DEFAULT_PARSE_CACHE_BYTES >> 20,
+                        metavar='MB', help='size limit of the parse cache (default: '
+                                           f'{DEFAULT_PARSE_CACHE_BYTES >> 20})')
+    parser.add_argument('--mmap', action='store_true',
+                        help='scan page files as memory-mapped bytes instead of decoded text')
+    parser.add_argument('--xcon-net-labels', action='store_true',
+                        help='detect net labels by lookup against XCON net names')
+    parser.add_argument('--cache-pac', action='store_true',
+                        help='read cache symbols and styles from cache.pac even where '
+                             'cache/ is unpacked')
+    parser.add_argument('--max-updates', type=int, metavar='N',
+                        help='exit after N updates (default: run until interrupted)')
+    args = parser.parse_args()
+
+    watcher = Watcher(args.root, args.output, debounce=args.debounce, poll=args.poll,
+                      use_inotify=not args.no_inotify, parse_cache=args.parse_cache,
+                      parse_cache_bytes=args.parse_cache_mb << 20,
+                      options={'mmap': args.mmap, 'xcon_net_labels': args.xcon_net_labels,
+                               'cache_pac': args.cache_pac})
+    # Stopped by a service manager: still remove the temporary parse cache
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        watcher.run(max_updates=args.max_updates)
+    except KeyboardInterrupt:
+        print(f"\n  Stopped after {watcher.updates} updates")
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())